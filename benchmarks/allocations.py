@@ -0,0 +1,102 @@
+"""
+Values each engine makes to run three programs, and the time of a recursive fib(18) on each engine. Copies of
+values, e.g. on every variable read, show up as extra allocations.
+
+    python benchmarks/allocations.py [engine ...]
+"""
+import sys
+import time
+
+import common  # noqa: F401 (puts eel on the path)
+
+from eel import main as eel_main
+from eel import values
+
+PROGRAMS = {
+    "fib16": "FN fib(n, f) -> IF n < 2 THEN n ELSE f(n - 1, f) + f(n - 2, f)\nfib(16, fib)",
+    "loop": "VAR t = 0\nFOR i = 0 TO 20000 THEN\nVAR t = t + i * 2\nIF t > 100 THEN VAR t = t - 100\nEND\nt",
+    "reads": (
+        'VAR a = 1\nVAR b = "s"\nVAR l = [1, 2]\nVAR n = 0\nWHILE n < 5000 THEN\nVAR x = [a, b, l, a, b, l]\n'
+        'VAR n = n + a\nEND\nn'
+    ),
+}
+FIB = "FN fib(n, f) -> IF n < 2 THEN n ELSE f(n - 1, f) + f(n - 2, f)\nfib(18, fib)"
+
+allocated = 0
+
+
+def count_allocations():
+    """
+    Counts every value made, through the __init__ its class runs or, where the compiled engines skip it,
+    object.__new__
+    """
+    classes, found = [], [values.BaseType]
+    while found:
+        cls = found.pop()
+        classes.append(cls)
+        found.extend(cls.__subclasses__())
+    # The class whose __init__ each class runs; only that one counts, as it may call those it overrides
+    owners = {cls: next(base for base in cls.__mro__ if "__init__" in vars(base)) for cls in classes}
+
+    for owner in set(owners.values()):
+        if owner is object:
+            continue
+
+        def counted_init(self, *args, _init=owner.__init__, _owner=owner, **kwargs):
+            global allocated
+            if owners.get(self.__class__) is _owner:
+                allocated += 1
+            _init(self, *args, **kwargs)
+
+        owner.__init__ = counted_init
+    for cls, owner in owners.items():
+        if owner is object:
+            # Made with no args, e.g. Null()
+            def counted_init(self):
+                global allocated
+                allocated += 1
+
+            cls.__init__ = counted_init
+
+    def counted_new(cls):
+        global allocated
+        allocated += 1
+        return object.__new__(cls)
+
+    for name, module in list(sys.modules.items()):
+        if name.startswith("eel.") and getattr(module, "new", None) is object.__new__:
+            module.new = counted_new
+
+
+def main(engines):
+    global allocated
+    eel_main.cache.enabled = False
+    engines = [engine for engine in engines if engine in eel_main.ENGINES]
+    for engine in engines:
+        # Imports every engine's modules before new is counted in them
+        eel_main.run("<bench>", "1", engine=engine)
+
+    fib_times = []
+    for engine in engines:
+        best = float("inf")
+        for _ in range(5):
+            start = time.process_time()
+            eel_main.run("<bench>", FIB, engine=engine)
+            best = min(best, time.process_time() - start)
+        fib_times.append(best)
+
+    count_allocations()
+    print(f"{'':10}" + "".join(f"{engine:>10}" for engine in engines))
+    for name, program in PROGRAMS.items():
+        counts = []
+        for engine in engines:
+            allocated = 0
+            _, error = eel_main.run("<bench>", program, engine=engine)
+            assert error is None, error.as_string()
+            counts.append(allocated)
+        print(f"{name:10}" + "".join(f"{count:>10}" for count in counts))
+    print(f"{'fib(18)':10}" + "".join(f"{seconds * 1000:>8.0f}ms" for seconds in fib_times))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or eel_main.ENGINES)
@@ -0,0 +1,47 @@
+"""
+Setup shared by the benchmarks. Each one imports eel from the checkout it is in, or from EEL_PATH if that is set,
+so the same script can time an older checkout too, e.g. one made with `git worktree add ../before <commit>`.
+"""
+import os
+import sys
+import time
+
+ROOT = os.environ.get("EEL_PATH") or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def best_of(runs, func):
+    """
+    :return: The shortest time, in seconds, func took over runs calls
+    """
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def rules_script(rules=800):
+    """
+    :return: A generated script of rules, each a function with arithmetic, branches, a loop and literals, like
+             the machine-written rule files that are the largest scripts eel is given (288 KB for 800 rules)
+    """
+    lines = []
+    for i in range(rules):
+        lines += [
+            f'FN rule_{i}(a, b, c)',
+            f'    VAR total_{i} = a + b * 2 - (c / 3) ^ 2 % 7',
+            f'    IF total_{i} >= {i} AND a != b THEN',
+            f'        PRINT("rule {i} matched: " + total_{i})  # note',
+            '    ELIF NOT c == 0 THEN',
+            f'        VAR items = [1, 2.5, "x", {{"k": {i}}}]',
+            '    END',
+            f'    FOR j = 0 TO {i % 10} STEP 1 THEN',
+            f'        VAR total_{i} = total_{i} + j * 1.5',
+            '    END',
+            f'    RETURN total_{i}',
+            'END',
+            f'rule_{i}(1, 2, 3)',
+        ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,44 @@
+"""
+Time of the tree engine, whose every visit returns an RTResult, against engines that return values directly and
+raise for RETURN, BREAK, CONTINUE and errors, on a deep expression, recursive calls and a loop.
+
+    python benchmarks/control_flow.py [engine ...]
+"""
+import sys
+
+from common import best_of
+
+from eel import main as eel_main
+
+
+def deep_expression(levels):
+    expr = "x"
+    for k in range(levels):
+        expr = f"(x {'+-*'[k % 3]} {expr})" if k % 2 else f"({expr} {'+-'[k % 2]} 1)"
+    return expr
+
+
+PROGRAMS = {
+    "deep expression (120 levels, 2000 times)":
+        f"VAR x = 1\nVAR t = 0\nFOR i = 0 TO 2000 THEN\nVAR t = {deep_expression(120)}\nEND\nt",
+    "recursive fib(18), function passed along":
+        "FN fib(f, n) -> IF n < 2 THEN n ELSE f(f, n - 1) + f(f, n - 2)\nfib(fib, 18)",
+    "loop of 100000 iterations":
+        "VAR t = 0\nFOR i = 0 TO 100000 THEN\nVAR t = t + i * 2 - 1\nEND\nt",
+}
+
+
+def main(engines):
+    eel_main.cache.enabled = False
+    # Engines an older checkout does not have are left out
+    engines = [engine for engine in engines if engine in eel_main.ENGINES]
+    print(f"{'':42}" + "".join(f"{engine:>10}" for engine in engines))
+    for name, program in PROGRAMS.items():
+        node, error = eel_main.parse("<bench>", program)
+        assert error is None, error
+        times = [best_of(5, lambda: eel_main.execute(node, engine=engine)) for engine in engines]
+        print(f"{name:42}" + "".join(f"{seconds * 1000:8.0f}ms" for seconds in times))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["tree", "direct", "closures"])
@@ -0,0 +1,43 @@
+"""
+Cost of Interpreter.visit finding a node's visit method: the time visit() adds over calling the method directly,
+and the time of a FOR loop of about 900k node visits on the tree engine.
+
+    python benchmarks/dispatch.py
+"""
+import timeit
+
+import common  # noqa: F401 (puts eel on the path)
+
+from eel import main as eel_main
+from eel.interpreter import Interpreter
+
+LOOP = """VAR x = 0
+FOR i = 0 TO 100000 THEN
+    VAR x = x + i * 2 - 1
+END
+"""
+CALLS = 200000
+
+
+class BareInterpreter(Interpreter):
+    # A visitor that does nothing, so only the dispatch to it is timed
+    def visit_NumberNode(self, node, context):
+        return None
+
+
+def main():
+    eel_main.cache.enabled = False
+    node, _ = eel_main.parse("<bench>", LOOP)
+    leaf = node.element_nodes[0].value_node
+
+    interpreter = BareInterpreter()
+    dispatched = min(timeit.repeat(lambda: interpreter.visit(leaf, None), number=CALLS, repeat=15)) / CALLS
+    direct = min(timeit.repeat(lambda: interpreter.visit_NumberNode(leaf, None), number=CALLS, repeat=15)) / CALLS
+    print(f"dispatch: {(dispatched - direct) * 1e9:.0f} ns per node")
+
+    loop = min(timeit.repeat(lambda: eel_main.execute(node), number=1, repeat=7))
+    print(f"FOR loop: {loop * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
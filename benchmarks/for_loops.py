@@ -0,0 +1,42 @@
+"""
+Time and peak memory of FOR loops of 300000 passes: with an empty multi-line body, with a body that never reads
+the loop variable, and with one that does.
+
+    python benchmarks/for_loops.py [engine ...]
+"""
+import sys
+import time
+import tracemalloc
+
+import common  # noqa: F401 (puts eel on the path)
+
+from eel import main as eel_main
+
+LOOPS = {
+    "empty multi-line body": "FOR i = 0 TO 300000 THEN\n 0\nEND",
+    "VAR x = x + 1 (never reads i)": "VAR x = 0\nFOR i = 0 TO 300000 THEN\n VAR x = x + 1\nEND",
+    "VAR x = x + i (reads i)": "VAR x = 0\nFOR i = 0 TO 300000 THEN\n VAR x = x + i\nEND",
+}
+MB = 1e6
+
+
+def main(engines):
+    eel_main.cache.enabled = False
+    engines = [engine for engine in engines if engine in eel_main.ENGINES]
+    for engine in engines:
+        for name, program in LOOPS.items():
+            best = float("inf")
+            for _ in range(3):
+                start = time.process_time()
+                eel_main.run("<bench>", program, engine=engine)
+                best = min(best, time.process_time() - start)
+
+            tracemalloc.start()
+            eel_main.run("<bench>", program, engine=engine)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{engine:8} {name:30} {best * 1000:6.0f} ms, {peak / MB:6.2f} MB peak")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["tree", "direct"])
@@ -0,0 +1,32 @@
+"""
+Time of a one-character edit near the top of a Document with many top-level statements, which has to account for
+every statement after it.
+
+    python benchmarks/incremental_edit.py [statements ...]
+"""
+import gc
+import sys
+import time
+
+import common  # noqa: F401 (puts eel on the path)
+
+from eel.incremental import Document
+
+EDITS = 200
+
+
+def main(sizes):
+    for size in sizes:
+        doc = Document("<bench>", "".join(f"VAR v{i} = {i} + 1\n" for i in range(size)))
+        # The garbage of the first parse would otherwise be collected during the edits
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(EDITS):
+            doc.edit(10, 0, "2")
+            doc.edit(10, 1, "")
+        per_edit = (time.perf_counter() - start) / (2 * EDITS)
+        print(f"{size:>7} statements: {per_edit * 1000:.3f} ms per edit")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000])
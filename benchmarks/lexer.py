@@ -0,0 +1,24 @@
+"""
+Throughput of the lexer on a generated rule script.
+
+    python benchmarks/lexer.py [rules]
+"""
+import sys
+
+from common import best_of, rules_script
+
+from eel.base import Lexer
+
+
+def main(rules):
+    text = rules_script(rules)
+    tokens, _ = Lexer("<bench>", text).make_tokens()
+    seconds = best_of(3, lambda: Lexer("<bench>", text).make_tokens())
+    print(
+        f"{len(text) / 1024:.0f} KB, {len(tokens)} tokens: {seconds * 1000:.0f} ms, "
+        f"{len(text) / seconds / 1e6:.2f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 800)
@@ -0,0 +1,41 @@
+"""
+Time of a call of a builtin or a library function: a FOR loop making the call 20000 times, less the same loop
+with a number in place of the call.
+
+    python benchmarks/natives.py [engine ...]
+"""
+import sys
+
+from common import best_of
+
+from eel import main as eel_main
+
+CALLS = 20000
+LOOP = "{setup}\nVAR t = 0\nFOR i = 0 TO %d THEN\n  VAR r = {call}\nEND" % CALLS
+CALLS_TIMED = {
+    "LEN builtin": ("VAR l = [1, 2]", "LEN(l)"),
+    "LS_APPEND builtin": ("VAR l = []", "LS_APPEND(l, i)"),
+    "math::sqrt": ('IMPORT "math"', "math::sqrt(i)"),
+}
+
+
+def run(program, engine):
+    _, error = eel_main.run("<bench>", program, engine=engine)
+    assert error is None, error.as_string()
+
+
+def main(engines):
+    eel_main.cache.enabled = False
+    engines = [engine for engine in engines if engine in eel_main.ENGINES]
+    print(f"{'':20}" + "".join(f"{engine:>10}" for engine in engines))
+    for name, (setup, call) in CALLS_TIMED.items():
+        times = []
+        for engine in engines:
+            with_call = best_of(5, lambda: run(LOOP.format(setup=setup, call=call), engine))
+            without = best_of(5, lambda: run(LOOP.format(setup=setup, call="1"), engine))
+            times.append((with_call - without) / CALLS)
+        print(f"{name:20}" + "".join(f"{seconds * 1e6:>8.2f}us" for seconds in times))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["tree", "closures"])
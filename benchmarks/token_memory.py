@@ -0,0 +1,47 @@
+"""
+Memory the tokens of a generated rule script hold once lexed, the time lexing it takes, and the peak memory of
+lexing and parsing it streamed from a file.
+
+    python benchmarks/token_memory.py [rules]
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from common import best_of, rules_script
+
+from eel.base import Lexer
+from eel.parser import Parser
+
+MIB = 2 ** 20
+
+
+def main(rules):
+    text = rules_script(rules)
+
+    tracemalloc.start()
+    tokens, _ = Lexer("<bench>", text).make_tokens()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{len(tokens)} tokens: {retained / MIB:.1f} MiB retained, {retained / len(tokens):.0f} bytes per token")
+    del tokens
+
+    seconds = best_of(3, lambda: Lexer("<bench>", text).make_tokens())
+    print(f"lex: {seconds * 1000:.0f} ms")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".eel", delete=False) as file:
+        file.write(text)
+    try:
+        with open(file.name) as f:
+            tracemalloc.start()
+            Parser(Lexer(file.name, f).iter_tokens()).parse()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        os.remove(file.name)
+    print(f"streamed lex and parse: {peak / MIB:.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 800)
@@ -1,4 +1,60 @@
-import eel
+import argparse
+import os
 import sys
 
-eel.run(sys.argv[1], open(sys.argv[1]).read())
+import eel
+from eel import cache, closures, main
+
+if sys.argv[1:2] == ["compile"]:
+    from eel import compileall
+    sys.exit(compileall.main(sys.argv[2:]))
+if sys.argv[1:2] == ["dis"]:
+    from eel import bytecode
+    sys.exit(bytecode.main(sys.argv[2:]))
+
+parser = argparse.ArgumentParser(
+    prog="eel", description="Runs an EEL script. Use `eel compile <dir>` to validate and cache a whole tree of them, "
+                            "and `eel dis <file>` to print the bytecode of one."
+)
+parser.add_argument("file", nargs="?", help="the script to run, or - to read it from stdin")
+parser.add_argument(
+    "--no-cache", action="store_true",
+    help=f"always parse the script and its imports from source, without reading or writing {cache.CACHE_DIR}"
+)
+parser.add_argument(
+    "--clear-cache", action="store_true",
+    help=f"first delete the {cache.CACHE_DIR} directories under the script's directory (or the current one)"
+)
+parser.add_argument(
+    "--engine", choices=main.ENGINES, default=main.default_engine,
+    help="run with the tree-walking interpreter (direct: without RTResults, raising errors and control flow as "
+         "exceptions), compile the program into Python closures first, compile it to bytecode for the virtual "
+         "machine, translate it into Python source (the compiled engines are faster), or walk the tree with an "
+         "explicit stack (stack: runs programs nested too deep for the others)"
+)
+parser.add_argument(
+    "--lookup-stats", action="store_true",
+    help="when the script ends, print how often call sites found the function they call in their lookup cache "
+         "(closures engine; calls inside functions always look the name up)"
+)
+args = parser.parse_args()
+
+if args.clear_cache:
+    directory = os.path.dirname(args.file) if args.file and args.file != "-" else ""
+    cache.clear(directory or ".")
+elif not args.file:
+    parser.error("the following arguments are required: file")
+
+if args.no_cache:
+    cache.enabled = False
+main.default_engine = args.engine
+if args.lookup_stats:
+    closures.lookup_stats.enabled = True
+
+if args.file == "-":
+    eel.run("<stdin>", sys.stdin)
+elif args.file:
+    eel.run_file(args.file)
+
+if args.lookup_stats:
+    print(f"Global lookups: {closures.lookup_stats}", file=sys.stderr)
@@ -8,32 +8,32 @@ from eel.values import Number, Null, String, BaseType, List
 class ColorsModule(EelModule):
     @staticmethod
     @eel_function
-    def rgb_to_yiq(r, g, b):
+    def rgb_to_yiq(r: Number, g: Number, b: Number):
         return RTResult().success(List(colorsys.rgb_to_yiq(r.value, g.value, b.value)))
 
     @staticmethod
     @eel_function
-    def yiq_to_rgb(y, i, q):
+    def yiq_to_rgb(y: Number, i: Number, q: Number):
         return RTResult().success(List(colorsys.yiq_to_rgb(y.value, i.value, q.value)))
 
     @staticmethod
     @eel_function
-    def rgb_to_hls(r, g, b):
+    def rgb_to_hls(r: Number, g: Number, b: Number):
         return RTResult().success(List(colorsys.rgb_to_hls(r.value, g.value, b.value)))
 
     @staticmethod
     @eel_function
-    def hls_to_rgb(h, l, s):
+    def hls_to_rgb(h: Number, l: Number, s: Number):
         return RTResult().success(List(colorsys.hls_to_rgb(h.value, l.value, s.value)))
 
     @staticmethod
     @eel_function
-    def rgb_to_hsv(r, g, b):
+    def rgb_to_hsv(r: Number, g: Number, b: Number):
         return RTResult().success(List(colorsys.rgb_to_hsv(r.value, g.value, b.value)))
 
     @staticmethod
     @eel_function
-    def hsv_to_rgb(h, s, v):
+    def hsv_to_rgb(h: Number, s: Number, v: Number):
         return RTResult().success(List(colorsys.hsv_to_rgb(h.value, s.value, v.value)))
 
 
@@ -14,7 +14,7 @@ class GraphicsModule(EelModule):
 
     @staticmethod
     @eel_function
-    def init_win(title):
+    def init_win(title: String):
         win = Window()
         win.title(title)
         GraphicsModule.main_win = win
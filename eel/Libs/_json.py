@@ -9,12 +9,12 @@ from eel.values import Number, Null, Dictionary, String, Boolean
 class JsonModule(EelModule):
     @staticmethod
     @eel_function
-    def load(text):
+    def load(text: String):
         return RTResult().success(Dictionary(json.loads(text)))
 
     @staticmethod
     @eel_function
-    def dump(dict_):
+    def dump(dict_: Dictionary):
         py_dict = {}
 
         for key, value in dict_.items.items():
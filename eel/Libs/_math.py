@@ -170,7 +170,7 @@ class MathModule(EelModule):
     @staticmethod
     @eel_function
     def hypot(*vals: Number):
-        return RTResult().success(Number(math.hypot(*vals)))
+        return RTResult().success(Number(math.hypot(*(val.value for val in vals))))
 
     @staticmethod
     @eel_function
@@ -191,7 +191,7 @@ class MathModule(EelModule):
 
     @staticmethod
     @eel_function
-    def isnan(val):
+    def isnan(val: Number):
         return RTResult().success(Number(math.isnan(val.value)))
 
     @staticmethod
@@ -256,7 +256,7 @@ class MathModule(EelModule):
 
     @staticmethod
     @eel_function
-    def root(r, val):
+    def root(r: Number, val: Number):
         return RTResult().success(Number(math.pow(val.value, (1 / r.value))))
 
     @staticmethod
@@ -21,7 +21,7 @@ class OSModule(EelModule):
 
     @staticmethod
     @eel_function
-    def system(command):
+    def system(command: String):
         return RTResult().success(String(os.system(command.value)))
 
 
@@ -13,7 +13,7 @@ class TimeModule(EelModule):
 
     @staticmethod
     @eel_function
-    def pause(duration_ms):
+    def pause(duration_ms: Number):
         time.sleep(duration_ms.value)
         return RTResult().success(Null())
 
@@ -8,7 +8,7 @@ from eel.values import Number, Null, String, BaseType, List, Boolean
 class WebBrowserModule(EelModule):
     @staticmethod
     @eel_function
-    def open(url: String, new=Number(0), autoraise=Boolean(True)):
+    def open(url: String, new: Number = Number(0), autoraise: Boolean = Boolean(True)):
         webbrowser.open(url.value, new.value, bool(autoraise.value))
         return RTResult().success(Null())
 
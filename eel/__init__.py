@@ -1,3 +1,4 @@
-from .main import shell, run
+from .main import shell, run, run_file
 from .base import Lexer
 from .parser import Parser
+from .incremental import Document
@@ -0,0 +1,284 @@
+"""
+Flat encoding of an AST.
+
+An Arena lists the nodes of a tree in post-order, children before their parent: `kinds` holds the kind of
+each node (see eel.nodes) and `code` its operands, one after the other. Child nodes are referred to by their
+index in that order, tokens by their index in a separate token table and positions by their offset, so an
+arena is made of plain ints and strings only. It is what the cache (see eel.cache) stores, and a tree can be
+scanned through it without following a single object reference.
+"""
+from array import array
+
+from .nodes import (
+    NODE_TYPES, NUMBER, STRING, LIST, DICT, BIN_OP, UNARY_OP, VAR_ASSIGN, VAR_ACCESS, IF, FOR, WHILE,
+    FUNC_DEF, CALL, RETURN, IMPORT, CONTINUE, BREAK, CONSTANT, Node
+)
+from .source import Position, Source
+from .tokens import Token
+from .values import Boolean, Number, String
+
+# Operand codes
+NODE = 0            # Index of a child node, -1 for None
+TOKEN = 1           # Index in the token table, -1 for None
+NODE_LIST = 2       # Count, then node indices
+TOKEN_LIST = 3      # Count, then token indices
+NODE_DICT = 4       # Count, then key and value node indices
+CASES = 5           # Count, then (condition, body, bool) triples
+ELSE_CASE = 6       # -1 for None, or body and bool
+BOOL = 7
+POSITION = 8        # Source index, offset, is_end
+VALUE = 9           # Index in VALUE_TYPES, value
+
+VALUE_TYPES = (Number, Boolean, String)
+
+# Set on the kind of a node whose positions are not the ones it works out from its tokens and children (see
+# eel.optimizer); the node's operands are then followed by its two positions
+MOVED = 0x80
+
+# The operands of each kind, in the order of the node's constructor arguments
+LAYOUTS = {
+    NUMBER: (("tok", TOKEN),),
+    STRING: (("tok", TOKEN),),
+    LIST: (("element_nodes", NODE_LIST), ("pos_start", POSITION), ("pos_end", POSITION), ("is_discarded", BOOL)),
+    DICT: (("items", NODE_DICT), ("pos_start", POSITION), ("pos_end", POSITION)),
+    BIN_OP: (("left_node", NODE), ("op_tok", TOKEN), ("right_node", NODE)),
+    UNARY_OP: (("op_tok", TOKEN), ("node", NODE)),
+    VAR_ASSIGN: (("var_name_tok", TOKEN), ("value_node", NODE)),
+    VAR_ACCESS: (("var_name_tok", TOKEN),),
+    IF: (("cases", CASES), ("else_case", ELSE_CASE)),
+    FOR: (
+        ("var_name_tok", TOKEN), ("start_value_node", NODE), ("end_value_node", NODE), ("step_value_node", NODE),
+        ("body_node", NODE), ("should_return_null", BOOL), ("uses_var", BOOL), ("is_discarded", BOOL)
+    ),
+    WHILE: (("condition_node", NODE), ("body_node", NODE), ("should_return_null", BOOL), ("is_discarded", BOOL)),
+    FUNC_DEF: (("var_name_tok", TOKEN), ("arg_name_toks", TOKEN_LIST), ("body_node", NODE), ("should_auto_return", BOOL)),
+    CALL: (("node_to_call", NODE), ("arg_nodes", NODE_LIST), ("is_tail", BOOL)),
+    RETURN: (("node_to_return", NODE), ("pos_start", POSITION), ("pos_end", POSITION)),
+    IMPORT: (("fn_node", NODE), ("pos_start", POSITION), ("pos_end", POSITION)),
+    CONTINUE: (("pos_start", POSITION), ("pos_end", POSITION)),
+    BREAK: (("pos_start", POSITION), ("pos_end", POSITION)),
+    CONSTANT: (("value", VALUE), ("pos_start", POSITION), ("pos_end", POSITION)),
+}
+
+# Kinds made from a single token
+LEAF_KINDS = frozenset((NUMBER, STRING, VAR_ACCESS))
+
+# Kinds whose positions are worked out from their tokens and children
+DERIVED_KINDS = frozenset(kind for kind, node_type in enumerate(NODE_TYPES) if hasattr(node_type, "find_pos_start"))
+
+
+def children(node):
+    """
+    :return: Iterator over the child nodes of node, in the order they are evaluated
+    """
+    for name, operand in LAYOUTS[node.kind]:
+        value = getattr(node, name)
+        if operand == NODE:
+            if value is not None:
+                yield value
+        elif operand == NODE_LIST:
+            yield from value
+        elif operand == NODE_DICT:
+            for key, child in value.items():
+                yield key
+                yield child
+        elif operand == CASES:
+            for condition, body, _ in value:
+                yield condition
+                yield body
+        elif operand == ELSE_CASE and value:
+            yield value[0]
+
+
+class Arena:
+    def __init__(self, kinds, code, tokens, sources):
+        """
+        :param kinds: array of node kinds, in post-order; the last node is the root
+        :param code: The operands of every node, in the same order
+        :param tokens: Flat token table, (type, value, start, end, source index) per token
+        :param sources: (fn, text, first_line) per source the tree was parsed from
+        """
+        self.kinds = kinds
+        self.code = code
+        self.tokens = tokens
+        self.sources = sources
+
+    @classmethod
+    def encode(cls, node):
+        encoder = Encoder()
+        encoder.encode(node)
+        return cls(encoder.kinds, encoder.code, encoder.tokens, [
+            (source.fn, source.text, source.first_line) for source in encoder.sources
+        ])
+
+    def decode(self):
+        """
+        :return: The root node, rebuilt with fresh tokens and sources
+        """
+        sources = [Source(fn, text, first_line) for fn, text, first_line in self.sources]
+        t = self.tokens
+        tokens = list(map(Token, t[0::5], t[1::5], t[2::5], t[3::5], map(sources.__getitem__, t[4::5])))
+
+        nodes = []
+        code = self.code
+        i = 0
+        for kind in self.kinds:
+            if kind in LEAF_KINDS:
+                # Numbers, strings and names, which are half of most trees
+                nodes.append(NODE_TYPES[kind](tokens[code[i]]))
+                i += 1
+                continue
+
+            moved = kind & MOVED
+            kind &= ~MOVED
+
+            args = []
+            for _, operand in LAYOUTS[kind]:
+                value = code[i]
+                i += 1
+                if operand == NODE:
+                    args.append(nodes[value] if value >= 0 else None)
+                elif operand == TOKEN:
+                    args.append(tokens[value] if value >= 0 else None)
+                elif operand == NODE_LIST:
+                    args.append([nodes[idx] for idx in code[i:i + value]])
+                    i += value
+                elif operand == TOKEN_LIST:
+                    args.append([tokens[idx] for idx in code[i:i + value]])
+                    i += value
+                elif operand == NODE_DICT:
+                    end = i + 2 * value
+                    args.append({nodes[code[idx]]: nodes[code[idx + 1]] for idx in range(i, end, 2)})
+                    i = end
+                elif operand == CASES:
+                    end = i + 3 * value
+                    args.append([(nodes[code[idx]], nodes[code[idx + 1]], code[idx + 2]) for idx in range(i, end, 3)])
+                    i = end
+                elif operand == ELSE_CASE:
+                    if value >= 0:
+                        args.append((nodes[value], code[i]))
+                        i += 1
+                    else:
+                        args.append(None)
+                elif operand == BOOL:
+                    args.append(value)
+                elif operand == VALUE:
+                    args.append(VALUE_TYPES[value](code[i]))
+                    i += 1
+                else:
+                    args.append(Position(code[i], sources[value], code[i + 1]))
+                    i += 2
+
+            node = NODE_TYPES[kind](*args)
+            if moved:
+                node.pos_start = Position(code[i + 1], sources[code[i]], code[i + 2])
+                node.pos_end = Position(code[i + 4], sources[code[i + 3]], code[i + 5])
+                i += 6
+            nodes.append(node)
+
+        return nodes[-1]
+
+    def count(self, kind):
+        return self.kinds.count(kind)
+
+    def __reduce__(self):
+        return Arena, (self.kinds, self.code, self.tokens, self.sources)
+
+
+class Encoder:
+    def __init__(self):
+        self.kinds = array("B")
+        self.code = []
+        self.tokens = []
+        self.sources = []
+
+        # Keyed by id(), as tokens and sources may be shared between several nodes
+        self.token_ids = {}
+        self.source_ids = {}
+
+    def encode(self, node):
+        """
+        Adds node and its children.
+
+        :return: The index of the node
+        """
+        operands = []
+        for name, operand in LAYOUTS[node.kind]:
+            value = getattr(node, name)
+            if operand == NODE:
+                operands.append(self.encode(value) if value is not None else -1)
+            elif operand == TOKEN:
+                operands.append(self.token(value) if value is not None else -1)
+            elif operand == NODE_LIST:
+                operands.append(len(value))
+                operands.extend([self.encode(child) for child in value])
+            elif operand == TOKEN_LIST:
+                operands.append(len(value))
+                operands.extend([self.token(tok) for tok in value])
+            elif operand == NODE_DICT:
+                operands.append(len(value))
+                for key, child in value.items():
+                    operands.append(self.encode(key))
+                    operands.append(self.encode(child))
+            elif operand == CASES:
+                operands.append(len(value))
+                for condition, body, flag in value:
+                    operands.append(self.encode(condition))
+                    operands.append(self.encode(body))
+                    operands.append(flag)
+            elif operand == ELSE_CASE:
+                if value:
+                    operands.append(self.encode(value[0]))
+                    operands.append(value[1])
+                else:
+                    operands.append(-1)
+            elif operand == BOOL:
+                operands.append(value)
+            elif operand == VALUE:
+                operands.append(VALUE_TYPES.index(type(value)))
+                operands.append(value.value)
+            else:
+                self.position(operands, value)
+
+        kind = node.kind
+        if kind in DERIVED_KINDS and self.moved(node):
+            kind |= MOVED
+            self.position(operands, node.pos_start)
+            self.position(operands, node.pos_end)
+
+        # Children were added while reading the operands, so they come first
+        self.kinds.append(kind)
+        self.code.extend(operands)
+        return len(self.kinds) - 1
+
+    def position(self, operands, pos):
+        operands.append(self.source(pos.source))
+        operands.append(pos.idx)
+        operands.append(pos.is_end)
+
+    @staticmethod
+    def moved(node):
+        # Positions a node has already worked out are left out, as decoding works them out again
+        for name, find_pos in (("pos_start", node.find_pos_start), ("pos_end", node.find_pos_end)):
+            pos = getattr(node, "_" + name, None)
+            if pos is not None:
+                found = find_pos()
+                if isinstance(found, Node):
+                    found = getattr(found, name)
+                if pos.idx != found.idx or pos.source is not found.source or pos.is_end != found.is_end:
+                    return True
+        return False
+
+    def token(self, tok):
+        idx = self.token_ids.get(id(tok))
+        if idx is None:
+            idx = self.token_ids[id(tok)] = len(self.tokens) // 5
+            self.tokens.extend((tok.type, tok.value, tok.start, tok.end, self.source(tok.source)))
+        return idx
+
+    def source(self, source):
+        idx = self.source_ids.get(id(source))
+        if idx is None:
+            idx = self.source_ids[id(source)] = len(self.sources)
+            self.sources.append(source)
+        return idx
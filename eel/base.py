@@ -1,7 +1,11 @@
 # region Imports
+import codecs
+import io
+import re
 import string
 
 from .errors import *
+from .source import Position, Source
 from .tokens import *
 
 # endregion
@@ -13,286 +17,207 @@ LETTERS = string.ascii_letters
 LETTERS_DIGITS = LETTERS + DIGITS
 IDENTIFIER_CHARS = LETTERS_DIGITS + "_"
 
+ESCAPE_CHARS = {
+    "n": "\n",
+    "t": "\t",
+    "r": "\r",
+    "b": "\b",
+    "f": "\f",
+}
+
+OPERATORS = {
+    "+": TT_PLUS,
+    "-": TT_MINUS,
+    "->": TT_ARROW,
+    "*": TT_MUL,
+    "**": TT_POW,
+    "/": TT_DIV,
+    "^": TT_POW,
+    "%": TT_MOD,
+    "(": TT_LPAREN,
+    ")": TT_RPAREN,
+    "[": TT_LBRACKET,
+    "]": TT_RBRACKET,
+    "{": TT_LCURLY,
+    "}": TT_RCURLY,
+    "=": TT_EQ,
+    "==": TT_EE,
+    "!=": TT_NE,
+    "<": TT_LT,
+    "<=": TT_LTE,
+    ">": TT_GT,
+    ">=": TT_GTE,
+    ",": TT_COMMA,
+    ":": TT_COLON,
+    "::": TT_DUBCOL,
+}
+
+# One alternative per kind of lexeme, so a single match consumes a whole run of characters
+TOKEN_PATTERN = re.compile(r"""
+      (?P<WHITESPACE>[ \t]+)
+    | (?P<COMMENT>\#[^\n]*\n?)
+    | (?P<STRING>"(?P<BODY>(?:[^"\\]|\\.?)*)(?P<CLOSE>"?))
+    | (?P<NUMBER>[0-9][0-9.]*)
+    | (?P<IDENTIFIER>[A-Za-z][A-Za-z0-9_]*)
+    | (?P<NEWLINE>[;\n])
+    | (?P<OPERATOR>->|\*\*|==|!=|<=|>=|::|[-+*/^%()\[\]{}=<>,:])
+""", re.VERBOSE | re.DOTALL)
+
+ESCAPE_PATTERN = re.compile(r"\\(.?)", re.DOTALL)
+
+CHUNK_SIZE = 64 * 1024
+
 # endregion
 
-# region Position
+# region Input
 
 
-class Position:
-    def __init__(self, idx, ln, col, fn, ftxt):
-        self.idx = idx
-        self.ln = ln
-        self.col = col
+def read_chunks(stream, chunk_size=CHUNK_SIZE):
+    """Yields the text of a string, file object, pipe or mmap in chunks of at most chunk_size characters."""
+    if isinstance(stream, str):
+        if stream:
+            yield stream
+        return
 
-        self.fn = fn
-        self.ftxt = ftxt
+    decoder = None
 
-    def advance(self, curr_char=None):
-        self.idx += 1
-        self.col += 1
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
 
-        if curr_char == "\n":
-            self.ln += 1
-            self.col = 0
+        if not isinstance(chunk, str):
+            # Binary streams (mmap, stdin.buffer, files opened with 'rb') are decoded as they are read
+            if decoder is None:
+                decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True)
+            chunk = decoder.decode(chunk)
 
-        return self
+        if chunk:
+            yield chunk
 
-    def copy(self):
-        return Position(self.idx, self.ln, self.col, self.fn, self.ftxt)
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
 
 # endregion
 
 # region Lexer
 
 
+def unescape(match):
+    return ESCAPE_CHARS.get(match.group(1), match.group(1))
+
+
 class Lexer:
-    def __init__(self, fn, text):
-        self.text = text
+    def __init__(self, fn, text, first_line=0, line_prefix=""):
+        """
+        :param fn: File name used in positions and errors
+        :param text: The source as a string, or a file object, pipe or mmap to read it from in chunks
+        :param first_line: Line number the text starts at, when lexing part of a file
+        :param line_prefix: Text on the first line before the part being lexed; kept in the source for
+                            columns and error rendering, but not lexed
+        """
         self.fn = fn
-        self.pos = Position(-1, 0, -1, fn, text)
-        self.current_char = None
-        self.advance()
-
-    def advance(self):
-        self.pos.advance(self.current_char)
-        self.current_char = self.text[self.pos.idx] if self.pos.idx < len(self.text) else None
+        self.text = text
+        self.source = Source(fn, line_prefix, first_line)
+        self.error = None
 
     def make_tokens(self):
-        tokens = []
-
-        while self.current_char is not None:
-            curr_char = self.current_char
-            match curr_char:
-                case curr_char if curr_char in " \t":
-                    self.advance()
-
-                case "#":
-                    self.skip_comment()
-
-                case '"':
-                    tokens.append(self.make_string())
-
-                case "+":
-                    tokens.append(Token(TT_PLUS, pos_start=self.pos))
-                    self.advance()
-
-                case "-":
-                    tok_type = TT_MINUS
-                    pos_start = self.pos.copy()
-                    self.advance()
-
-                    if self.current_char == ">":
-                        self.advance()
-                        tok_type = TT_ARROW
-
-                    tokens.append(Token(tok_type, pos_start=pos_start, pos_end=self.pos))
-
-                case "*":
-                    self.advance()
-                    if self.current_char == "*":
-                        tokens.append(Token(TT_POW, pos_start=self.pos))
-                    else:
-                        tokens.append(Token(TT_MUL, pos_start=self.pos))
-
-                    self.advance()
-
-                case "/":
-                    tokens.append(Token(TT_DIV, pos_start=self.pos))
-                    self.advance()
-
-                case "^":
-                    tokens.append(Token(TT_POW, pos_start=self.pos))
-                    self.advance()
-
-                case "%":
-                    tokens.append(Token(TT_MOD, pos_start=self.pos))
-                    self.advance()
-
-                case "(":
-                    tokens.append(Token(TT_LPAREN, pos_start=self.pos))
-                    self.advance()
-
-                case ")":
-                    tokens.append(Token(TT_RPAREN, pos_start=self.pos))
-                    self.advance()
-
-                case "[":
-                    tokens.append(Token(TT_LBRACKET, pos_start=self.pos))
-                    self.advance()
-
-                case "]":
-                    tokens.append(Token(TT_RBRACKET, pos_start=self.pos))
-                    self.advance()
-
-                case "{":
-                    tokens.append(Token(TT_LCURLY, pos_start=self.pos))
-                    self.advance()
-
-                case "}":
-                    tokens.append(Token(TT_RCURLY, pos_start=self.pos))
-                    self.advance()
-
-                case "!":
-                    tok, error = self.make_not_equals()
-                    if error:
-                        return [], error
-                    tokens.append(tok)
-
-                case "=":
-                    tokens.append(self.make_equals())
-
-                case "<":
-                    tokens.append(self.make_less_than())
-
-                case ">":
-                    tokens.append(self.make_greater_than())
-
-                case ",":
-                    tokens.append(Token(TT_COMMA, pos_start=self.pos))
-                    self.advance()
-
-                case ":":
-                    pos_start = self.pos
-                    self.advance()
-
-                    if self.current_char == ":":
-                        tokens.append(Token(TT_DUBCOL, pos_start=pos_start, pos_end=self.pos))
-                        self.advance()
-
-                    else:
-                        tokens.append(Token(TT_COLON, pos_start=pos_start))
-                        # return [], IllegalCharError(f"'{self.current_char}'", pos_start, self.pos)
-
-                case curr_char if curr_char in ";\n":
-                    tokens.append(Token(TT_NEWLINE, pos_start=self.pos))
-                    self.advance()
-
-                case curr_char if curr_char in DIGITS:
-                    tokens.append(self.make_number())
-
-                case curr_char if curr_char in LETTERS:
-                    tokens.append(self.make_identifier())
-
-                case other:
-                    pos_start = self.pos.copy()
-                    self.advance()
-                    return [], IllegalCharError(f"'{other}'", pos_start, self.pos)
-
-        tokens.append(Token(TT_EOF, pos_start=self.pos))
+        tokens = list(self.iter_tokens())
+        if self.error:
+            return [], self.error
         return tokens, None
 
-    def make_string(self):
-        str_ = ""
-        pos_start = self.pos.copy()
-        escape_char = False
-        self.advance()
-
-        escape_chars = {
-            "n": "\n",
-            "t": "\t",
-            "r": "\r",
-            "b": "\b",
-            "f": "\f",
-        }
-
-        while self.current_char is not None and (self.current_char != '"' or escape_char):
-            if escape_char:
-                str_ += escape_chars.get(self.current_char, self.current_char)
-                escape_char = False
-            else:
-                if self.current_char == "\\":
-                    escape_char = True
+    def iter_tokens(self):
+        """
+        Yields tokens as the text is read. On an illegal character the stream ends with an EOF token
+        at the offending position, and the error is left in self.error.
+        """
+        source = self.source
+        chunks = read_chunks(self.text)
+        match = TOKEN_PATTERN.match
+        keywords = frozenset(KEYWORDS)
+        operators = OPERATORS
+
+        buf = ""                    # Unconsumed text; buf[0] is at offset `base` in the source
+        base = len(source.text)
+        buf_len = 0
+        eof = False
+        idx = 0
+
+        while True:
+            m = match(buf, idx) if idx < buf_len else None
+
+            # A match that reaches the end of buf might continue in the next chunk
+            if not eof and (m is None or m.end() >= buf_len):
+                chunk = next(chunks, None)
+                if chunk is None:
+                    eof = True
                 else:
-                    str_ += self.current_char
-            self.advance()
+                    source.append(chunk)
+                    buf = buf[idx:] + chunk
+                    base += idx
+                    idx = 0
+                    buf_len = len(buf)
+                continue
 
-        self.advance()
-        return Token(TT_STRING, str_, pos_start, self.pos)
+            if m is None:
+                if idx < buf_len:
+                    self.error = self.make_illegal_char_error(buf, idx, base)
+                break
 
-    def make_number(self):
-        num_str = ""
-        dot_count = 0
-        pos_start = self.pos.copy()
+            kind = m.lastgroup
+            end = m.end()
 
-        while (self.current_char is not None and
-               self.current_char in DIGITS + "."):
-            if self.current_char == ".":
-                if dot_count == 1:
-                    raise Exception("Too many dots in number")
-                dot_count += 1
-                num_str += "."
-            else:
-                num_str += self.current_char
+            if kind == "IDENTIFIER":
+                id_str = m.group()
+                yield Token(TT_KEYWORD if id_str in keywords else TT_IDENTIFIER, id_str, base + idx, base + end, source)
 
-            self.advance()
-
-        if dot_count == 0:
-            return Token(TT_INT, int(num_str), pos_start, self.pos)
-        return Token(TT_FLOAT, float(num_str), pos_start, self.pos)
+            elif kind == "OPERATOR":
+                yield Token(operators[m.group()], None, base + idx, base + end, source)
 
-    def make_identifier(self):
-        id_str = ""
-        pos_start = self.pos.copy()
+            elif kind == "NEWLINE":
+                yield Token(TT_NEWLINE, None, base + idx, base + end, source)
 
-        while self.current_char is not None and self.current_char in IDENTIFIER_CHARS:
-            id_str += self.current_char
-            self.advance()
+            elif kind == "NUMBER":
+                yield self.make_number(m.group(), base + idx, base + end)
 
-        tok_type = TT_KEYWORD if id_str in KEYWORDS else TT_IDENTIFIER
-        return Token(tok_type, id_str, pos_start, self.pos)
+            elif kind == "STRING":
+                if not m.group("CLOSE"):
+                    # An unterminated string runs off the end of the text, one past the last character
+                    end += 1
 
-    def make_not_equals(self):
-        pos_start = self.pos.copy()
-        self.advance()
+                yield self.make_string(m.group("BODY"), base + idx, base + end)
 
-        if self.current_char == "=":
-            self.advance()
-            return Token(TT_NE, pos_start=pos_start, pos_end=self.pos), None
+            # Whitespace and comments produce no tokens; a comment also swallows its newline
+            idx = end
 
-        self.advance()
-        return None, ExpectedCharError("Expected '=' after '!'",
-                                       pos_start, self.pos)
+        yield Token(TT_EOF, None, base + idx, base + idx + 1, source)
 
-    def make_equals(self):
-        pos_start = self.pos.copy()
-        tok_type = TT_EQ
-        self.advance()
+    def make_string(self, str_, start, end):
+        if "\\" in str_:
+            str_ = ESCAPE_PATTERN.sub(unescape, str_)
 
-        if self.current_char == "=":  # Double Equals
-            self.advance()
-            tok_type = TT_EE
+        return Token(TT_STRING, str_, start, end, self.source)
 
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+    def make_number(self, num_str, start, end):
+        dot_count = num_str.count(".")
+        if dot_count > 1:
+            raise Exception("Too many dots in number")
 
-    def make_less_than(self):
-        pos_start = self.pos.copy()
-        tok_type = TT_LT
-        self.advance()
-
-        if self.current_char == "=":  # Less Than / Equals
-            self.advance()
-            tok_type = TT_LTE
-
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
-
-    def make_greater_than(self):
-        pos_start = self.pos.copy()
-        tok_type = TT_GT
-        self.advance()
-
-        if self.current_char == "=":  # Greater Than / Equals
-            self.advance()
-            tok_type = TT_GTE
-
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+        if dot_count == 0:
+            return Token(TT_INT, int(num_str), start, end, self.source)
+        return Token(TT_FLOAT, float(num_str), start, end, self.source)
 
-    def skip_comment(self):
-        self.advance()
+    def make_illegal_char_error(self, buf, idx, base):
+        char = buf[idx]
+        pos_start = Position(base + idx, self.source)
 
-        while self.current_char != "\n":
-            self.advance()
+        if char == "!":
+            return ExpectedCharError("Expected '=' after '!'", pos_start, Position(base + idx + 2, self.source))
 
-        self.advance()
+        return IllegalCharError(f"'{char}'", pos_start, Position(base + idx + 1, self.source))
 
 # endregion
 
@@ -371,4 +296,59 @@ class RTResult:
             self.loop_should_break
         )
 
+
+# The compiled engines (e.g. eel.closures) and the DirectInterpreter raise these instead of passing an RTResult up
+# through every node
+
+
+class RTException(Exception):
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+
+class ReturnSignal(Exception):
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+class BreakSignal(Exception):
+    pass
+
+
+class ContinueSignal(Exception):
+    pass
+
+
+def unwrap(res):
+    """
+    :return: The value of an RTResult from code that does not raise, raising whatever else it holds
+    """
+    if res.error:
+        raise RTException(res.error)
+    if res.func_return_value:
+        raise ReturnSignal(res.func_return_value)
+    if res.loop_should_continue:
+        raise ContinueSignal()
+    if res.loop_should_break:
+        raise BreakSignal()
+    return res.value
+
+
+class TailCall:
+    """
+    A call in tail position (see CallNode.is_tail), made by returning it from the function it is in, which then
+    runs the function called in place of its own call
+    """
+    __slots__ = ("function", "args", "context", "pos_start", "pos_end")
+
+    def __init__(self, function, args, context, pos_start, pos_end):
+        self.function = function
+        self.args = args
+        # Where the call was made from, for its errors
+        self.context = context
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
 # endregion
@@ -0,0 +1,487 @@
+"""
+Bytecode compiler, for the virtual machine in eel.vm.
+
+A program or function body is compiled into a Code object: a flat list of instructions, each an opcode and one
+integer argument, with a pool of constants and a table of the names it reads and writes. IF, WHILE and FOR become
+jumps. Names are looked up by their index in the names table, but still resolved in the context's symbol table
+at run time, as a function sees the variables of the context it is called from.
+
+Every instruction keeps the span of the node it was compiled from, so errors get the same arrows as under the
+Interpreter; operations also keep the spans of their operands, to place their errors (see
+eel.values.operation_error). Code objects hold nothing but ints, strings, values, positions and
+other Code objects, so they can be pickled; the cache (see eel.cache) stores them in .eelb files.
+
+`eel.py dis <file>` prints the bytecode of a script.
+"""
+import argparse
+import io
+import sys
+
+from .nodes import ListNode
+from .optimizer import KEYWORD_OPERATIONS, OPERATIONS
+from .source import Position
+from .tokens import *
+from .utils import gc_paused
+from .values import Number, String
+
+(
+    LOAD_CONST,             # consts[arg] itself, as values are shared (see eel.values.BaseType)
+    LOAD_NULL,
+    LOAD_NAME,              # names[arg], looked up in the context
+    STORE_NAME,             # Sets names[arg] to the top of the stack, which stays on it
+    POP_TOP,
+    BINARY_OP,              # OPERATORS[arg] on the two values on top
+    UNARY_NEGATIVE,
+    UNARY_NOT,
+    UNARY_POSITIVE,
+    BUILD_LIST,             # List of the top arg values
+    BUILD_DICT,             # Dictionary of the top arg key/value pairs
+    JUMP,                   # To instruction arg
+    POP_JUMP_IF_FALSE,
+    NEW_ELEMENTS,           # Pushes a list for the values of a loop's body, or None if arg is 0
+    FOR_PREP,               # NEW_ELEMENTS, from start, end and step values, then the loop's counter
+    FOR_ITER,               # Pushes the counter's next Number, or jumps to arg once it reaches the end
+    SETUP_LOOP,             # Enters a loop that BREAK leaves by jumping to arg, and CONTINUE by coming back here
+    POP_BLOCK,              # Leaves the innermost loop
+    LIST_APPEND,            # Adds the top value to the list arg places below it
+    END_LOOP,               # Turns the list of values into the loop's List, or None into null
+    BREAK,
+    CONTINUE,
+    MAKE_FUNCTION,          # Function of the Code consts[arg]
+    CALL,                   # Calls the value below the top arg arguments
+    RETURN_VALUE,
+    RETURN_NONE,            # Returns without a value, as falling off a function without auto-return does
+    IMPORT,
+    CALL_TAIL,              # Returns a call in tail position (see CallNode.is_tail) of a BytecodeFunction, which
+                            # the function running the code makes in its place; the CALL after it makes any other
+) = range(28)
+
+OPNAMES = (
+    "LOAD_CONST", "LOAD_NULL", "LOAD_NAME", "STORE_NAME", "POP_TOP", "BINARY_OP", "UNARY_NEGATIVE", "UNARY_NOT",
+    "UNARY_POSITIVE", "BUILD_LIST", "BUILD_DICT", "JUMP", "POP_JUMP_IF_FALSE", "NEW_ELEMENTS", "FOR_PREP", "FOR_ITER",
+    "SETUP_LOOP", "POP_BLOCK", "LIST_APPEND", "END_LOOP", "BREAK", "CONTINUE", "MAKE_FUNCTION", "CALL",
+    "RETURN_VALUE", "RETURN_NONE", "IMPORT", "CALL_TAIL",
+)
+
+# Opcodes whose argument is a jump target
+JUMPS = frozenset((JUMP, POP_JUMP_IF_FALSE, FOR_ITER, SETUP_LOOP))
+
+# BINARY_OP arguments, the token types and keywords of eel.optimizer.OPERATIONS and KEYWORD_OPERATIONS
+OPERATORS = tuple(OPERATIONS) + tuple(KEYWORD_OPERATIONS)
+
+NO_SPAN = (None, None)
+
+
+class Code:
+    def __init__(self, name, arg_names=(), should_auto_return=False, source=None, is_function=True):
+        """
+        :param name: The function's name, None for an anonymous function
+        :param source: The Source the code was compiled from
+        :param is_function: False for the code of a whole program
+        """
+        self.name = name
+        self.is_function = is_function
+        self.arg_names = list(arg_names)
+        self.should_auto_return = should_auto_return
+        self.source = source
+
+        self.ops = []
+        self.args = []
+        # (pos_start, pos_end) of each instruction
+        self.spans = []
+        # The spans of the operands of each BINARY_OP, UNARY_NEGATIVE and UNARY_NOT, and of the args of each CALL,
+        # by instruction index
+        self.operand_spans = {}
+        self.consts = []
+        self.names = []
+
+        self.const_ids = {}
+        self.name_ids = {}
+
+    def emit(self, op, arg=0, span=NO_SPAN):
+        """
+        :return: The index of the instruction
+        """
+        self.ops.append(op)
+        self.args.append(arg)
+        self.spans.append(span)
+        return len(self.ops) - 1
+
+    def patch(self, idx, target=None):
+        """
+        Points the jump at idx to target, the next instruction by default
+        """
+        self.args[idx] = len(self.ops) if target is None else target
+
+    def const(self, value):
+        # Equal numbers of different types (1, 1.0, true) or signs (0.0, -0.0) are different constants, so they are
+        # told apart by their repr rather than compared
+        key = (type(value), repr(value.value)) if isinstance(value, (Number, String)) else id(value)
+        idx = self.const_ids.get(key)
+        if idx is None:
+            idx = self.const_ids[key] = len(self.consts)
+            self.consts.append(value)
+        return idx
+
+    def name_idx(self, name):
+        idx = self.name_ids.get(name)
+        if idx is None:
+            idx = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return idx
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Only needed while compiling
+        del state["const_ids"], state["name_ids"]
+
+        # Operand spans go after the instructions' spans, which share their sources
+        operand_spans = [span for spans in self.operand_spans.values() for span in spans]
+        state["spans"], state["sources"] = encode_spans(self.spans + operand_spans)
+        state["operand_spans"] = [(idx, len(spans)) for idx, spans in self.operand_spans.items()]
+        return state
+
+    def __setstate__(self, state):
+        spans = decode_spans(state["spans"], state.pop("sources"))
+        state["spans"] = spans[:len(state["ops"])]
+        rest = iter(spans[len(state["ops"]):])
+        state["operand_spans"] = {idx: tuple(next(rest) for _ in range(count)) for idx, count in state["operand_spans"]}
+        self.__dict__.update(state)
+        self.const_ids = {}
+        self.name_ids = {}
+
+    def __repr__(self):
+        return f"<code {self.name or '<anonymous>'}, {len(self.ops)} instructions>"
+
+
+def encode_spans(spans):
+    """
+    Spans are stored as plain ints, like the positions of an arena (see eel.arena): the index of each position's
+    source, its offset and is_end, or -1 for an instruction without a span.
+
+    :return: (ints, the sources they index)
+    """
+    sources, source_ids, code = [], {}, []
+    for pos_start, pos_end in spans:
+        if pos_start is None:
+            code.append(-1)
+            continue
+        for pos in (pos_start, pos_end):
+            idx = source_ids.get(id(pos.source))
+            if idx is None:
+                idx = source_ids[id(pos.source)] = len(sources)
+                sources.append(pos.source)
+            code.extend((idx, pos.idx, pos.is_end))
+    return code, sources
+
+
+def decode_spans(code, sources):
+    spans = []
+    i = 0
+    while i < len(code):
+        if code[i] < 0:
+            spans.append(NO_SPAN)
+            i += 1
+        else:
+            spans.append((
+                Position(code[i + 1], sources[code[i]], code[i + 2]),
+                Position(code[i + 4], sources[code[i + 3]], code[i + 5])
+            ))
+            i += 6
+    return spans
+
+
+def compile(node):
+    """
+    :return: The Code of a whole program
+    """
+    # Compiling makes many objects and frees none of them, which would only make the collector run over and over
+    with gc_paused():
+        return Compiler().compile_program(node)
+
+
+class Compiler:
+    # Compile method of each node class, looked up by name like Interpreter.dispatch
+    dispatch = {}
+
+    def __init__(self):
+        self.code = None
+
+    def compile_program(self, node):
+        self.code = Code("<program>", source=node.pos_start.source, is_function=False)
+        self.compile(node)
+        self.code.emit(RETURN_VALUE)
+        return self.code
+
+    def compile_function(self, node):
+        code = Code(
+            node.var_name_tok.value if node.var_name_tok else None, [tok.value for tok in node.arg_name_toks],
+            node.should_auto_return, node.pos_start.source
+        )
+
+        outer, self.code = self.code, code
+        try:
+            if node.should_auto_return:
+                self.compile(node.body_node)
+                code.emit(RETURN_VALUE)
+            else:
+                self.compile_discarded(node.body_node)
+                code.emit(RETURN_NONE)
+        finally:
+            self.code = outer
+        return code
+
+    def compile(self, node):
+        """
+        Emits the instructions that push the node's value
+        """
+        method = self.dispatch.get(type(node))
+        if method is None:
+            method = getattr(Compiler, f'compile_{type(node).__name__}', None)
+            if method is None:
+                raise NotImplementedError(f"No compile method defined: 'compile_{type(node).__name__}'")
+            self.dispatch[type(node)] = method
+        method(self, node)
+
+    def compile_discarded(self, node):
+        """
+        Emits the instructions of a node whose value is not used, leaving nothing on the stack; a block of
+        statements does not build a List of their values.
+        """
+        for element_node in node.element_nodes if isinstance(node, ListNode) else (node,):
+            self.compile(element_node)
+            self.code.emit(POP_TOP)
+
+    def compile_NumberNode(self, node):
+        self.code.emit(LOAD_CONST, self.code.const(Number(node.tok.value)), (node.pos_start, node.pos_end))
+
+    def compile_StringNode(self, node):
+        self.code.emit(LOAD_CONST, self.code.const(String(node.tok.value)), (node.pos_start, node.pos_end))
+
+    def compile_ConstantNode(self, node):
+        self.code.emit(LOAD_CONST, self.code.const(node.value), (node.pos_start, node.pos_end))
+
+    def compile_ListNode(self, node):
+        if node.is_discarded:
+            self.compile_discarded(node)
+            self.code.emit(LOAD_NULL)
+            return
+
+        for element_node in node.element_nodes:
+            self.compile(element_node)
+        self.code.emit(BUILD_LIST, len(node.element_nodes), (node.pos_start, node.pos_end))
+
+    def compile_DictNode(self, node):
+        for k, v in node.items.items():
+            self.compile(k)
+            self.compile(v)
+        self.code.emit(BUILD_DICT, len(node.items), (node.pos_start, node.pos_end))
+
+    def compile_BinOpNode(self, node):
+        self.compile(node.left_node)
+        self.compile(node.right_node)
+        op = node.op_tok
+        idx = self.code.emit(
+            BINARY_OP, OPERATORS.index(op.value if op.type == TT_KEYWORD else op.type), (node.pos_start, node.pos_end)
+        )
+        self.code.operand_spans[idx] = (
+            (node.left_node.pos_start, node.left_node.pos_end), (node.right_node.pos_start, node.right_node.pos_end)
+        )
+
+    def compile_UnaryOpNode(self, node):
+        self.compile(node.node)
+        if node.op_tok.type == TT_MINUS:
+            op = UNARY_NEGATIVE
+        elif node.op_tok.matches(TT_KEYWORD, "NOT"):
+            op = UNARY_NOT
+        else:
+            op = UNARY_POSITIVE
+        idx = self.code.emit(op, 0, (node.pos_start, node.pos_end))
+        if op != UNARY_POSITIVE:
+            self.code.operand_spans[idx] = ((node.node.pos_start, node.node.pos_end),)
+
+    def compile_VarAccessNode(self, node):
+        self.code.emit(LOAD_NAME, self.code.name_idx(node.var_name_tok.value), (node.pos_start, node.pos_end))
+
+    def compile_VarAssignNode(self, node):
+        self.compile(node.value_node)
+        self.code.emit(STORE_NAME, self.code.name_idx(node.var_name_tok.value))
+
+    def compile_IfNode(self, node):
+        code = self.code
+        end_jumps = []
+
+        for condition, expr, should_return_null in node.cases:
+            self.compile(condition)
+            next_case = code.emit(POP_JUMP_IF_FALSE)
+            self.compile_case(expr, should_return_null)
+            end_jumps.append(code.emit(JUMP))
+            code.patch(next_case)
+
+        if node.else_case:
+            self.compile_case(*node.else_case)
+        else:
+            code.emit(LOAD_NULL)
+
+        for jump in end_jumps:
+            code.patch(jump)
+
+    def compile_case(self, expr, should_return_null):
+        if should_return_null:
+            self.compile_discarded(expr)
+            self.code.emit(LOAD_NULL)
+        else:
+            self.compile(expr)
+
+    def compile_ForNode(self, node):
+        code = self.code
+        self.compile(node.start_value_node)
+        self.compile(node.end_value_node)
+        if node.step_value_node:
+            self.compile(node.step_value_node)
+        else:
+            code.emit(LOAD_CONST, code.const(Number(1)))
+
+        discard = node.should_return_null or node.is_discarded
+        code.emit(FOR_PREP, int(not discard))
+        setup = code.emit(SETUP_LOOP)
+        loop = code.emit(FOR_ITER)
+        code.emit(STORE_NAME, code.name_idx(node.var_name_tok.value))
+        code.emit(POP_TOP)
+        # The counter is on top of the list of values
+        self.compile_body(node.body_node, discard, 2)
+        code.emit(JUMP, loop)
+
+        code.patch(setup)
+        code.patch(loop)
+        code.emit(POP_BLOCK)
+        code.emit(POP_TOP)
+        code.emit(END_LOOP, 0, (node.pos_start, node.pos_end))
+
+    def compile_WhileNode(self, node):
+        code = self.code
+        discard = node.should_return_null or node.is_discarded
+        code.emit(NEW_ELEMENTS, int(not discard))
+        setup = code.emit(SETUP_LOOP)
+        self.compile(node.condition_node)
+        exit_jump = code.emit(POP_JUMP_IF_FALSE)
+        self.compile_body(node.body_node, discard, 1)
+        code.emit(JUMP, setup + 1)
+
+        code.patch(setup)
+        code.patch(exit_jump)
+        code.emit(POP_BLOCK)
+        code.emit(END_LOOP, 0, (node.pos_start, node.pos_end))
+
+    def compile_body(self, body_node, should_return_null, depth):
+        if should_return_null:
+            self.compile_discarded(body_node)
+        else:
+            self.compile(body_node)
+            self.code.emit(LIST_APPEND, depth)
+
+    def compile_FuncDefNode(self, node):
+        code = self.code
+        code.emit(MAKE_FUNCTION, code.const(self.compile_function(node)), (node.pos_start, node.pos_end))
+        if node.var_name_tok:
+            code.emit(STORE_NAME, code.name_idx(node.var_name_tok.value))
+
+    def compile_CallNode(self, node):
+        self.compile(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.compile(arg_node)
+        if node.is_tail:
+            self.code.emit(CALL_TAIL, len(node.arg_nodes), (node.pos_start, node.pos_end))
+        idx = self.code.emit(CALL, len(node.arg_nodes), (node.pos_start, node.pos_end))
+        self.code.operand_spans[idx] = node.arg_spans
+
+    def compile_ReturnNode(self, node):
+        code = self.code
+        if not code.is_function:
+            # Returning from the program ends it without a value, as under the Interpreter
+            if node.node_to_return:
+                self.compile(node.node_to_return)
+                code.emit(POP_TOP)
+            code.emit(RETURN_NONE)
+            return
+
+        if node.node_to_return:
+            self.compile(node.node_to_return)
+        else:
+            code.emit(LOAD_NULL)
+        code.emit(RETURN_VALUE)
+
+    def compile_ContinueNode(self, node):
+        self.code.emit(CONTINUE)
+
+    def compile_BreakNode(self, node):
+        self.code.emit(BREAK)
+
+    def compile_ImportNode(self, node):
+        if node.fn_node:
+            self.compile(node.fn_node)
+        else:
+            self.code.emit(LOAD_NULL)
+        self.code.emit(IMPORT, 0, (node.pos_start, node.pos_end))
+
+
+def disassemble(code, file=None):
+    """
+    Prints the instructions of code, then of the functions it defines.
+    """
+    print(f"Disassembly of {code.name or '<anonymous>'}:", file=file)
+    targets = {arg for op, arg in zip(code.ops, code.args) if op in JUMPS}
+
+    last_ln = None
+    for idx, (op, arg, (pos_start, _)) in enumerate(zip(code.ops, code.args, code.spans)):
+        ln = pos_start.ln + 1 if pos_start else None
+        line = f"{ln:>4}" if ln is not None and ln != last_ln else "    "
+        if ln is not None:
+            last_ln = ln
+
+        marker = ">>" if idx in targets else "  "
+        text = f"{line} {marker} {idx:>4} {OPNAMES[op]:<18}"
+        if op in (LOAD_CONST, MAKE_FUNCTION):
+            text += f" {arg:>3} ({code.consts[arg]!r})"
+        elif op in (LOAD_NAME, STORE_NAME):
+            text += f" {arg:>3} ({code.names[arg]})"
+        elif op == BINARY_OP:
+            text += f" {arg:>3} ({OPERATORS[arg]})"
+        elif op in JUMPS:
+            text += f" {arg:>3} (to {arg})"
+        elif op in (BUILD_LIST, BUILD_DICT, CALL, CALL_TAIL, LIST_APPEND, NEW_ELEMENTS, FOR_PREP):
+            text += f" {arg:>3}"
+        print(text.rstrip(), file=file)
+
+    for const in code.consts:
+        if isinstance(const, Code):
+            print(file=file)
+            disassemble(const, file)
+
+
+def main(argv=None):
+    from .main import parse
+
+    parser = argparse.ArgumentParser(prog="eel dis", description="Prints the bytecode a script compiles to.")
+    parser.add_argument("file", help="the script to disassemble, or - to read it from stdin")
+    parser.add_argument(
+        "--python", action="store_true", help="print the Python source it translates to instead (see eel.transpiler)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.file == "-":
+        node, error = parse("<stdin>", sys.stdin)
+    else:
+        with open(args.file, "rb") as f:
+            node, error = parse(args.file, io.BytesIO(f.read()))
+
+    if error:
+        print(error.as_string(), file=sys.stderr)
+        return 1
+
+    if args.python:
+        from .transpiler import Transpiler
+        print(Transpiler().generate(node)[0])
+    else:
+        disassemble(compile(node))
+    return 0
@@ -0,0 +1,208 @@
+"""
+Cache of parsed files. The AST of each file that is run or imported is stored, as an arena (see eel.arena), in a
+__eelcache__ directory next to it, so scripts that have not changed since their last run skip the lexer and
+parser entirely. Files run on the bytecode engine have their Code (see eel.bytecode) stored there too, in a
+.eelb file, and also skip the compiler; files run on the Python engine their compiled Module (see eel.transpiler),
+in a .eelpy file.
+"""
+import hashlib
+import os
+import pickle
+import shutil
+import struct
+import time
+
+from .arena import Arena
+from .utils import gc_paused
+
+CACHE_DIR = "__eelcache__"
+CACHE_SUFFIX = ".eelc"
+CODE_SUFFIX = ".eelb"
+PYTHON_SUFFIX = ".eelpy"
+
+# Bump whenever the tokens, nodes, parser or bytecode change in a way that makes existing cache files unusable
+CACHE_VERSION = 11
+
+MAGIC = b"EELC"
+# magic, cache version, source mtime (ns), source size, sha256 of the source
+HEADER = struct.Struct("<4sHqq32s")
+
+# A source written this recently could change again without its mtime changing (coarse timestamps), so its
+# cache file is validated by hash until the source is older than this
+RACY_NS = 2 * 10**9
+
+# Set to False (e.g. by `eel.py --no-cache`) to always parse from source and leave cache files alone
+enabled = True
+
+
+class Format:
+    def __init__(self, suffix, encode, decode):
+        """
+        :param encode: Turns what is cached into the object that is pickled
+        :param decode: Called with the unpickled object and the file name, returning what was cached
+        """
+        self.suffix = suffix
+        self.encode = encode
+        self.decode = decode
+
+
+def decode_node(arena, fn):
+    node = arena.decode()
+    # The file may have been cached while it was run under another relative path
+    node.pos_start.source.fn = fn
+    return node
+
+
+def decode_code(code, fn):
+    # Every position in the code, and in the functions it defines, shares this source
+    code.source.fn = fn
+    return code
+
+
+def decode_module(module, fn):
+    for pos in module.line_positions:
+        if pos is not None:
+            pos.source.fn = fn
+            break
+    return module
+
+
+AST = Format(CACHE_SUFFIX, Arena.encode, decode_node)
+CODE = Format(CODE_SUFFIX, lambda code: code, decode_code)
+PYTHON = Format(PYTHON_SUFFIX, lambda module: module, decode_module)
+
+
+def cache_path(fn, suffix=CACHE_SUFFIX):
+    directory, name = os.path.split(os.path.abspath(fn))
+    return os.path.join(directory, CACHE_DIR, name + suffix)
+
+
+def parse_file(fn, parse, force=False):
+    """
+    Returns the AST of the file at fn, from its cache file if the source is unchanged.
+
+    The cache file is trusted when the source's mtime and size match the ones it was written for. Otherwise
+    the source is hashed, and only parsed again when its content changed.
+
+    :param parse: Called with the source bytes on a cache miss, returning (node, error)
+    :param force: Parse the source and rewrite the cache file even if it is up to date
+    :return: (node, error)
+    """
+    return load(fn, parse, AST, force)
+
+
+def compile_file(fn, compile, force=False):
+    """
+    Returns the bytecode of the file at fn, from its .eelb cache file if the source is unchanged, like parse_file.
+
+    :param compile: Called with the source bytes on a cache miss, returning (code, error)
+    :return: (code, error)
+    """
+    return load(fn, compile, CODE, force)
+
+
+def transpile_file(fn, transpile, force=False):
+    """
+    Returns the Module (see eel.transpiler) of the file at fn, from its .eelpy cache file if the source is
+    unchanged, like parse_file.
+
+    :param transpile: Called with the source bytes on a cache miss, returning (module, error). The module is None
+        for programs that cannot be translated, which are not cached.
+    :return: (module, error)
+    """
+    return load(fn, transpile, PYTHON, force)
+
+
+def load(fn, build, fmt, force=False):
+    stat = os.stat(fn)
+    path = cache_path(fn, fmt.suffix)
+    header = None if force else read_header(path)
+
+    if header and header[2] == stat.st_mtime_ns and header[3] == stat.st_size:
+        result = read(path, fn, fmt)
+        if result is not None:
+            return result, None
+
+    with open(fn, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).digest()
+
+    if header and header[4] == digest:
+        # Only the timestamp changed (e.g. a fresh checkout); record it so the next check is cheap again
+        result = read(path, fn, fmt)
+        if result is not None:
+            try:
+                with open(path, "r+b") as f:
+                    f.write(make_header(stat, digest))
+            except OSError:
+                pass
+            return result, None
+
+    result, error = build(data)
+    if result is not None:
+        write(path, stat, digest, fmt.encode, result)
+    return result, error
+
+
+def read_header(path):
+    try:
+        with open(path, "rb") as f:
+            header = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+
+    if header[0] != MAGIC or header[1] != CACHE_VERSION:
+        return None
+    return header
+
+
+def read(path, fn, fmt):
+    try:
+        with open(path, "rb") as f:
+            f.seek(HEADER.size)
+            data = f.read()
+        with gc_paused():
+            return fmt.decode(pickle.loads(data), fn)
+    except Exception:
+        # A truncated or otherwise unreadable file is treated like a missing one
+        return None
+
+
+def make_header(stat, digest):
+    mtime = stat.st_mtime_ns if time.time_ns() - stat.st_mtime_ns > RACY_NS else -1
+    return HEADER.pack(MAGIC, CACHE_VERSION, mtime, stat.st_size, digest)
+
+
+def write(path, stat, digest, encode, obj):
+    header = make_header(stat, digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            with gc_paused():
+                pickle.dump(encode(obj), f, pickle.HIGHEST_PROTOCOL)
+        # Readers never see a half-written file, even with several interpreters running the same script
+        os.replace(tmp_path, path)
+    except (OSError, pickle.PicklingError, RecursionError):
+        # Caching is best effort, e.g. the directory may be read-only or the tree too deep to encode
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def clear(directory="."):
+    """
+    Deletes every cache directory under directory.
+
+    :return: The number of cache directories deleted
+    """
+    count = 0
+    for root, dirs, _ in os.walk(directory):
+        if CACHE_DIR in dirs:
+            shutil.rmtree(os.path.join(root, CACHE_DIR), ignore_errors=True)
+            dirs.remove(CACHE_DIR)
+            count += 1
+    return count
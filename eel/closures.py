@@ -0,0 +1,681 @@
+"""
+Closure compilation, an engine that runs programs without the tree-walking Interpreter.
+
+Each node is compiled once into a Python closure that takes the context and returns the node's value, so
+running it skips visitor dispatch, RTResult objects and should_return() checks. Errors and RETURN, BREAK and
+CONTINUE are raised as exceptions (see eel.base) instead of being passed up through every node.
+
+Values, contexts and errors are the ones the Interpreter makes, so both engines print the same output and
+report the same errors and tracebacks. Functions defined here are CompiledFunctions, which the Interpreter (and
+anything else) can call through execute() like any other function.
+"""
+import operator
+
+from eel.base import BreakSignal, ContinueSignal, ReturnSignal, RTException, RTResult, TailCall, unwrap
+from eel.context import Context, FunctionContext
+from eel.errors import RTError
+from eel.interpreter import Interpreter, binary_op_error, unary_op_error
+from eel.module_utils import EelVariable
+from eel.nodes import ListNode, VarAccessNode
+from eel.optimizer import KEYWORD_OPERATIONS, OPERATIONS
+from eel.resolver import resolve
+from eel.tokens import *
+from eel.values import BaseFunction, Boolean, Dictionary, Function, List, Null, Number, String
+
+new = object.__new__
+
+NUMBER_TYPES = (Number, Boolean)
+
+
+class LookupStats:
+    """
+    How often the call sites of compiled programs found a function in their cache (see Compiler.global_lookup)
+    instead of looking it up by name. Only counted while enabled (see eel.py --lookup-stats), as the call sites of
+    programs compiled then are the only ones that pay for counting their lookups.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lookups = 0
+        self.misses = 0
+
+    @property
+    def hits(self):
+        return self.lookups - self.misses
+
+    def counted(self, lookup):
+        """
+        :return: lookup, counting each time it is made
+        """
+        def counted_lookup(context):
+            self.lookups += 1
+            return lookup(context)
+        return counted_lookup
+
+    def hit_rate(self):
+        """
+        :return: The share of lookups that were hits, None before any lookups
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def reset(self):
+        self.lookups = 0
+        self.misses = 0
+
+    def __repr__(self):
+        hit_rate = self.hit_rate()
+        rate = f"{hit_rate:.1%}" if hit_rate is not None else "n/a"
+        return f"{self.hits} hits, {self.misses} misses ({rate} hit rate)"
+
+
+lookup_stats = LookupStats()
+
+
+def run(node, context):
+    """
+    :return: (value, error), as from the Interpreter
+    """
+    body = Compiler(resolve(node)).compile(node)
+    try:
+        return body(context), None
+    except RTException as e:
+        return None, e.error
+    except (ReturnSignal, BreakSignal, ContinueSignal):
+        # Left over at the top level, where the Interpreter also drops them
+        return None, None
+
+
+def load(value, var_name, context, pos_start, pos_end):
+    """
+    :return: What accessing a variable whose value is not a plain Number gives, raising if it is not set
+    """
+    if not value:
+        raise RTException(RTError(f"'{var_name}' is not defined", pos_start, pos_end, context))
+
+    if isinstance(value, EelVariable):
+        return value()
+    return value
+
+
+def never(i, end):
+    return False
+
+
+def number(value):
+    """
+    Number(value), without going through the constructor
+    """
+    result = new(Number)
+    result.value = value
+    return result
+
+
+def boolean(value):
+    result = new(Boolean)
+    result.value = bool(value)
+    return result
+
+
+# What the Number methods of OPERATIONS work out, for operands that are both Numbers (or Booleans): the result
+# type and the function of the two values. Division and modulo by zero go through the methods, for the error.
+FAST_OPERATIONS = {
+    TT_PLUS: (number, operator.add),
+    TT_MINUS: (number, operator.sub),
+    TT_MUL: (number, operator.mul),
+    TT_DIV: (number, operator.truediv),
+    TT_MOD: (number, operator.mod),
+    TT_POW: (number, operator.pow),
+    TT_EE: (boolean, operator.eq),
+    TT_NE: (boolean, operator.ne),
+    TT_LT: (boolean, operator.lt),
+    TT_GT: (boolean, operator.gt),
+    TT_LTE: (boolean, operator.le),
+    TT_GTE: (boolean, operator.ge),
+}
+FAST_KEYWORD_OPERATIONS = {
+    "AND": (boolean, lambda a, b: a and b),
+    "OR": (boolean, lambda a, b: a or b),
+    "XOR": (boolean, lambda a, b: bool(a) + bool(b) == 1),
+}
+
+
+class CompiledFunction(Function):
+    def __init__(
+        self, name, body_node, arg_names, should_auto_return, body, slot_count, param_slots, slots, globals_
+    ):
+        """
+        :param body: body_node, compiled
+        :param slot_count: Number of locals in the frame of a call (see eel.resolver)
+        :param param_slots: Slot of each parameter
+        :param slots: Slot of each local, by name
+        :param globals_: Symbol table of the program the function was defined in
+        """
+        super().__init__(name, body_node, arg_names, should_auto_return)
+        self.body = body
+        self.slot_count = slot_count
+        self.param_slots = param_slots
+        self.slots = slots
+        self.globals = globals_
+
+    def call(self, args, context, pos_start, pos_end):
+        """
+        :return: The return value; errors are raised
+        """
+        function = self
+        # A tail call the body returns is made here, in place of this call, so in its place in tracebacks too
+        parent, parent_entry_pos = context, pos_start
+
+        while True:
+            if len(args) != len(function.arg_names):
+                raise RTException(function.check_args(function.arg_names, args, context, pos_start, pos_end).error)
+
+            frame = [None] * function.slot_count
+            exec_ctx = FunctionContext(
+                function.name, parent, parent_entry_pos, frame, function.globals, function.slots, context
+            )
+            if exec_ctx.depth > exec_ctx.recursion_limit:
+                raise RTException(function.check_depth(exec_ctx, pos_end))
+            for slot, arg in zip(function.param_slots, args):
+                frame[slot] = arg
+
+            try:
+                value = function.body(exec_ctx)
+                return_value = None
+            except ReturnSignal as signal:
+                value = None
+                return_value = signal.value
+
+            return_value = (value if function.should_auto_return else None) or return_value or Null()
+            if return_value.__class__ is not TailCall:
+                return return_value
+            function, args = return_value.function, return_value.args
+            context, pos_start, pos_end = return_value.context, return_value.pos_start, return_value.pos_end
+            # The call the tail call replaces is over, so its caller is no longer looked at; dropped, as the chain
+            # of callers would otherwise grow with every tail call
+            exec_ctx.caller = None
+
+    def execute(self, args, context, pos_start, pos_end, arg_spans=None):
+        res = RTResult()
+        try:
+            return res.success(self.call(args, context, pos_start, pos_end))
+        except RTException as e:
+            return res.failure(e.error)
+        except ContinueSignal:
+            return res.success_continue()
+        except BreakSignal:
+            return res.success_break()
+
+    def copy(self):
+        # A copy has exactly the same attributes
+        copy = new(CompiledFunction)
+        copy.__dict__.update(self.__dict__)
+        return copy
+
+
+class Compiler:
+    # Compile method of each node class, looked up by name like Interpreter.dispatch
+    dispatch = {}
+
+    def __init__(self, resolution):
+        """
+        :param resolution: Of the program to compile (see eel.resolver)
+        """
+        self.resolution = resolution
+        # Whether the node being compiled is in a function, rather than at the top level
+        self.in_function = False
+
+    def compile(self, node):
+        """
+        :return: A function of the context, returning the node's value
+        """
+        method = self.dispatch.get(type(node))
+        if method is None:
+            method = getattr(Compiler, f'compile_{type(node).__name__}', None)
+            if method is None:
+                raise NotImplementedError(f"No compile method defined: 'compile_{type(node).__name__}'")
+            self.dispatch[type(node)] = method
+        return method(self, node)
+
+    def compile_discarded(self, node):
+        """
+        Compiles a node whose value is not used, e.g. the body of a loop that returns null, so a block of
+        statements does not build a List of their values.
+        """
+        if not isinstance(node, ListNode):
+            return self.compile(node)
+
+        statements = [self.compile(element_node) for element_node in node.element_nodes]
+
+        def block(context):
+            for statement in statements:
+                statement(context)
+        return block
+
+    def compile_NumberNode(self, node):
+        value = node.tok.value
+
+        def number_(context):
+            return number(value)
+        return number_
+
+    def compile_StringNode(self, node):
+        value = node.tok.value
+
+        def string(context):
+            return String(value)
+        return string
+
+    def compile_ConstantNode(self, node):
+        value = node.value
+
+        def constant(context):
+            return value
+        return constant
+
+    def compile_ListNode(self, node):
+        if node.is_discarded:
+            block = self.compile_discarded(node)
+
+            def discarded(context):
+                block(context)
+                return Null()
+            return discarded
+
+        elements = [self.compile(element_node) for element_node in node.element_nodes]
+
+        def list_(context):
+            return List([element(context) for element in elements])
+        return list_
+
+    def compile_DictNode(self, node):
+        items = [(self.compile(k), self.compile(v)) for k, v in node.items.items()]
+
+        def dict_(context):
+            values = {}
+            for k, v in items:
+                k = k(context)
+                values[k] = v(context)
+            return Dictionary(values)
+        return dict_
+
+    def compile_BinOpNode(self, node):
+        left, right = self.compile(node.left_node), self.compile(node.right_node)
+        op = node.op_tok
+        if op.type == TT_KEYWORD:
+            method, (make, function) = KEYWORD_OPERATIONS[op.value], FAST_KEYWORD_OPERATIONS[op.value]
+        else:
+            method, (make, function) = OPERATIONS[op.type], FAST_OPERATIONS[op.type]
+        checks_zero = op.type in (TT_DIV, TT_MOD)
+
+        def bin_op(context):
+            left_value = left(context)
+            right_value = right(context)
+
+            if (
+                left_value.__class__ in NUMBER_TYPES and right_value.__class__ in NUMBER_TYPES
+                and not (checks_zero and right_value.value == 0)
+            ):
+                return make(function(left_value.value, right_value.value))
+
+            result, error = getattr(left_value, method)(right_value)
+            if error:
+                raise RTException(binary_op_error(node, error, context))
+            return result
+        return bin_op
+
+    def compile_UnaryOpNode(self, node):
+        operand = self.compile(node.node)
+
+        if node.op_tok.type == TT_MINUS:
+            def unary_op(context):
+                value = operand(context)
+                if value.__class__ in NUMBER_TYPES:
+                    return number(value.value * -1)
+
+                result, error = value.multiplied_by(Number(-1))
+                if error:
+                    raise RTException(unary_op_error(node, error, context))
+                return result
+
+        elif node.op_tok.matches(TT_KEYWORD, "NOT"):
+            def unary_op(context):
+                value = operand(context)
+                result, error = value.notted()
+                if error:
+                    raise RTException(unary_op_error(node, error, context))
+                return result
+
+        else:
+            unary_op = operand
+
+        return unary_op
+
+    def lookup(self, var_name):
+        """
+        :return: A function of the context, returning the variable's value or None if it is not set. In a function,
+            it looks among the names the call set outside its frame (e.g. with IMPORT), then among its caller's,
+            and no further, as a call's symbol table does under the other engines (see SymbolTable.get).
+        """
+        if not self.in_function:
+            def lookup(context):
+                return context.symbol_table.get(var_name)
+            return lookup
+
+        def lookup(context):
+            own_symbol_table = context.own_symbol_table
+            if own_symbol_table is not None:
+                value = own_symbol_table.symbols.get(var_name)
+                if value is not None:
+                    return value
+            # Most calls are made from the top level
+            caller = context.caller
+            if caller.__class__ is Context:
+                return caller.symbol_table.symbols.get(var_name)
+            return context.get_from_caller(var_name)
+        return lookup
+
+    def compile_VarAccessNode(self, node):
+        var_name = node.var_name_tok.value
+        pos_start, pos_end = node.pos_start, node.pos_end
+        slot = self.resolution.accesses[id(node)]
+
+        if not self.in_function:
+            def var_access(context):
+                value = context.symbol_table.get(var_name)
+                if value.__class__ is Number:
+                    return value
+                return load(value, var_name, context, pos_start, pos_end)
+
+        elif slot is not None:
+            # A local of the running function, the most common case, read straight from its frame
+            fallback = self.lookup(var_name)
+
+            def var_access(context):
+                value = context.frame[slot]
+                if value is None:
+                    value = fallback(context)
+                if value.__class__ is Number:
+                    return value
+                return load(value, var_name, context, pos_start, pos_end)
+
+        else:
+            lookup = self.lookup(var_name)
+
+            def var_access(context):
+                value = lookup(context)
+                if value.__class__ is Number:
+                    return value
+                return load(value, var_name, context, pos_start, pos_end)
+
+        return var_access
+
+    def compile_VarAssignNode(self, node):
+        var_name = node.var_name_tok.value
+        value_node = self.compile(node.value_node)
+        slot = self.resolution.stores[id(node)]
+
+        if slot is not None:
+            def var_assign(context):
+                value = value_node(context)
+                context.frame[slot] = value
+                return value
+            return var_assign
+
+        def var_assign(context):
+            value = value_node(context)
+            context.symbol_table.set(var_name, value)
+            return value
+        return var_assign
+
+    def compile_IfNode(self, node):
+        cases = [
+            (self.compile(condition), self.compile_discarded(expr) if should_return_null else self.compile(expr), should_return_null)
+            for condition, expr, should_return_null in node.cases
+        ]
+        else_case = None
+        if node.else_case:
+            expr, should_return_null = node.else_case
+            else_case = (self.compile_discarded(expr) if should_return_null else self.compile(expr), should_return_null)
+
+        def if_(context):
+            for condition, expr, should_return_null in cases:
+                if condition(context).is_true():
+                    value = expr(context)
+                    return Null() if should_return_null else value
+
+            if else_case:
+                expr, should_return_null = else_case
+                value = expr(context)
+                return Null() if should_return_null else value
+
+            return Null()
+        return if_
+
+    def compile_ForNode(self, node):
+        var_name = node.var_name_tok.value
+        slot = self.resolution.stores[id(node)]
+        start_value_node = self.compile(node.start_value_node)
+        end_value_node = self.compile(node.end_value_node)
+        step_value_node = self.compile(node.step_value_node) if node.step_value_node else None
+        should_return_null = node.should_return_null or node.is_discarded
+        body = self.compile_discarded(node.body_node) if should_return_null else self.compile(node.body_node)
+
+        def for_(context):
+            elements = None if should_return_null else []
+
+            start_value = start_value_node(context)
+            end_value = end_value_node(context)
+            step_value = step_value_node(context) if step_value_node else Number(1)
+
+            i = start_value.value
+
+            if step_value.value > 0:
+                condition = operator.lt
+            elif step_value.value < 0:
+                condition = operator.gt
+            else:
+                condition = never
+
+            if slot is None:
+                table = context.symbol_table
+                symbols, key = table.symbols, var_name
+                if key not in symbols:
+                    table.version += 1
+                # Setting a watched name bumps the version, as in SymbolTable.set
+                watched = table.watched
+            else:
+                symbols, key = context.frame, slot
+                watched = ()
+
+            while condition(i, end_value.value):
+                symbols[key] = number(i)
+                if key in watched:
+                    table.version += 1
+                i += step_value.value
+
+                try:
+                    value = body(context)
+                except ContinueSignal:
+                    continue
+                except BreakSignal:
+                    break
+
+                if elements is not None:
+                    elements.append(value)
+
+            return Null() if elements is None else List(elements)
+        return for_
+
+    def compile_WhileNode(self, node):
+        condition_node = self.compile(node.condition_node)
+        should_return_null = node.should_return_null or node.is_discarded
+        body = self.compile_discarded(node.body_node) if should_return_null else self.compile(node.body_node)
+
+        def while_(context):
+            elements = None if should_return_null else []
+
+            while condition_node(context).is_true():
+                try:
+                    value = body(context)
+                except ContinueSignal:
+                    continue
+                except BreakSignal:
+                    break
+
+                if elements is not None:
+                    elements.append(value)
+
+            return Null() if elements is None else List(elements)
+        return while_
+
+    def compile_FuncDefNode(self, node):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        body_node = node.body_node
+        should_auto_return = node.should_auto_return
+        arg_names = [arg_name.value for arg_name in node.arg_name_toks]
+        slot_count, param_slots, slots = self.resolution.functions[id(node)]
+        slot = self.resolution.stores.get(id(node))
+        in_function = self.in_function
+
+        self.in_function = True
+        try:
+            body = self.compile(body_node) if should_auto_return else self.compile_discarded(body_node)
+        finally:
+            self.in_function = in_function
+
+        def func_def(context):
+            func_value = CompiledFunction(
+                func_name, body_node, arg_names, should_auto_return, body, slot_count, param_slots, slots,
+                context.globals if in_function else context.symbol_table
+            )
+
+            if slot is not None:
+                context.frame[slot] = func_value
+            elif func_name:
+                context.symbol_table.set(func_name, func_value)
+
+            return func_value
+        return func_def
+
+    def compile_CallNode(self, node):
+        if isinstance(node.node_to_call, VarAccessNode) and self.resolution.accesses[id(node.node_to_call)] is None:
+            return self.compile_global_call(node)
+
+        node_to_call = self.compile(node.node_to_call)
+        arg_nodes = [self.compile(arg_node) for arg_node in node.arg_nodes]
+        pos_start, pos_end, arg_spans = node.pos_start, node.pos_end, node.arg_spans
+        is_tail = node.is_tail
+
+        def call(context):
+            value_to_call = node_to_call(context)
+
+            args = [arg_node(context) for arg_node in arg_nodes]
+
+            if type(value_to_call) is CompiledFunction:
+                if is_tail:
+                    return TailCall(value_to_call, args, context, pos_start, pos_end)
+                return value_to_call.call(args, context, pos_start, pos_end)
+            return unwrap(value_to_call.execute(args, context, pos_start, pos_end, arg_spans))
+        return call
+
+    def compile_global_call(self, node):
+        """
+        A call of a function by a name that is not a local, e.g. PRINT(x), math::sqrt(x) or a function defined at
+        the top level, which looks the function up through a cache kept by the call site (see global_lookup)
+        """
+        var_name = node.node_to_call.var_name_tok.value
+        var_start, var_end = node.node_to_call.pos_start, node.node_to_call.pos_end
+        lookup = self.global_lookup(var_name)
+        arg_nodes = [self.compile(arg_node) for arg_node in node.arg_nodes]
+        pos_start, pos_end, arg_spans = node.pos_start, node.pos_end, node.arg_spans
+        is_tail = node.is_tail
+
+        def call(context):
+            value = lookup(context)
+
+            if not isinstance(value, BaseFunction):
+                value = load(value, var_name, context, var_start, var_end)
+            args = [arg_node(context) for arg_node in arg_nodes]
+
+            if type(value) is CompiledFunction:
+                if is_tail:
+                    # Made by the CompiledFunction.call running this one, once it returns
+                    return TailCall(value, args, context, pos_start, pos_end)
+                return value.call(args, context, pos_start, pos_end)
+            return unwrap(value.execute(args, context, pos_start, pos_end, arg_spans))
+        return call
+
+    def global_lookup(self, var_name):
+        """
+        :return: A function returning the value of var_name, or None if it is not set. At the top level, the value
+            is kept with the versions of the symbol table (and its parent) it came from, and looked up again only
+            once one of them changes, which setting var_name does from then on (see SymbolTable.version).
+
+            In a function, the name is looked up every time (see lookup): there it is a single read of the names of
+            the caller, which a cache checked against the caller's table measured no faster than. The other engines
+            have no such cache.
+        """
+        if self.in_function:
+            lookup = self.lookup(var_name)
+            if not lookup_stats.enabled:
+                return lookup
+            uncached_lookup = lookup
+
+            def lookup(context):
+                lookup_stats.misses += 1
+                return uncached_lookup(context)
+            return lookup_stats.counted(lookup)
+
+        cached_table = cached_value = None
+        cached_version = cached_parent_version = -1
+
+        def lookup(context):
+            nonlocal cached_table, cached_value, cached_version, cached_parent_version
+            table = context.symbol_table
+            parent = table.parent
+
+            if (
+                table is cached_table and table.version == cached_version
+                and (parent is None or parent.version == cached_parent_version)
+            ):
+                return cached_value
+
+            if lookup_stats.enabled:
+                lookup_stats.misses += 1
+            table.watch(var_name)
+            if parent is not None:
+                parent.watch(var_name)
+
+            cached_table, cached_version = table, table.version
+            cached_parent_version = parent.version if parent is not None else -1
+            cached_value = table.get(var_name)
+            return cached_value
+
+        return lookup_stats.counted(lookup) if lookup_stats.enabled else lookup
+
+    def compile_ReturnNode(self, node):
+        node_to_return = self.compile(node.node_to_return) if node.node_to_return else None
+
+        def return_(context):
+            raise ReturnSignal(node_to_return(context) if node_to_return else Null())
+        return return_
+
+    def compile_ContinueNode(self, node):
+        def continue_(context):
+            raise ContinueSignal()
+        return continue_
+
+    def compile_BreakNode(self, node):
+        def break_(context):
+            raise BreakSignal()
+        return break_
+
+    def compile_ImportNode(self, node):
+        fn_node = self.compile(node.fn_node) if node.fn_node else None
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def import_(context):
+            value = fn_node(context) if fn_node else Null()
+            return unwrap(Interpreter().import_value(value, pos_start, pos_end, context, "closures"))
+        return import_
@@ -0,0 +1,157 @@
+"""
+Batch compilation, e.g. to validate every script of a repository before deploying it.
+
+`eel.py compile <dir>` finds the .eel files under dir and the .eel files they IMPORT, parses them across a pool
+of processes, reports syntax errors and per-file timings, and writes the cache files (see eel.cache) of the
+ones that parse, so running them afterwards skips the front end.
+"""
+import argparse
+import io
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from . import cache
+from .main import parse
+from .nodes import ImportNode, Node, StringNode
+
+LIBS_DIR = os.path.join(pathlib.Path(__file__).parent.resolve(), "Libs")
+
+
+class CompileResult:
+    def __init__(self, fn, error, imports, elapsed):
+        """
+        :param error: The rendered syntax error, or None if the file parsed
+        :param imports: Paths of the .eel files the file imports
+        :param elapsed: Seconds spent on the file
+        """
+        self.fn = fn
+        self.error = error
+        self.imports = imports
+        self.elapsed = elapsed
+
+
+def find_scripts(directory):
+    scripts = []
+    for root, dirs, files in os.walk(directory):
+        if cache.CACHE_DIR in dirs:
+            dirs.remove(cache.CACHE_DIR)
+        dirs.sort()
+        scripts.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".eel"))
+    return scripts
+
+
+def find_imports(node, fn):
+    """
+    :return: Paths of the .eel files imported by string literal in the tree, looked up next to the importing
+             file, in the current directory and in Libs. Python modules and computed names are left out.
+    """
+    imports = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ImportNode):
+            if isinstance(node.fn_node, StringNode):
+                for directory in (os.path.dirname(fn), os.curdir, LIBS_DIR):
+                    path = os.path.join(directory, node.fn_node.tok.value + ".eel")
+                    if os.path.isfile(path):
+                        imports.append(path)
+                        break
+            continue
+
+        # Nodes keep their children in attributes, lists, (condition, body, ...) tuples and dicts
+        values = [getattr(node, name) for name in type(node).__slots__] if isinstance(node, Node) else node
+        for value in values:
+            if isinstance(value, dict):
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            elif isinstance(value, (list, tuple, Node)):
+                stack.append(value)
+
+    return imports
+
+
+def compile_file(fn, force=False):
+    start = time.perf_counter()
+    try:
+        node, error = cache.parse_file(fn, lambda data: parse(fn, io.BytesIO(data)), force)
+    except (OSError, UnicodeDecodeError) as e:
+        return CompileResult(fn, f"Failed to read \"{fn}\"\n{e}", [], time.perf_counter() - start)
+
+    if error:
+        return CompileResult(fn, error.as_string(), [], time.perf_counter() - start)
+    return CompileResult(fn, None, find_imports(node, fn), time.perf_counter() - start)
+
+
+def compile_all(paths, jobs=None, force=False):
+    """
+    Compiles the given scripts and, transitively, the .eel files they import, across a pool of processes.
+
+    :param jobs: Number of worker processes, one per CPU by default
+    :return: A CompileResult per file, in the order the files finished
+    """
+    results = []
+    seen = set()
+
+    with ProcessPoolExecutor(jobs) as executor:
+        pending = set()
+
+        def submit(path):
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                pending.add(executor.submit(compile_file, os.path.normpath(path), force))
+
+        for path in paths:
+            submit(path)
+
+        # Imports are only known once a file is parsed, so they are queued as results come in
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                for path in result.imports:
+                    submit(path)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="eel compile",
+        description="Parses every .eel file under the given directories, and the files they import, in parallel. "
+                    "Syntax errors are reported, and the files that parse are cached so they start faster."
+    )
+    parser.add_argument("dirs", nargs="+", metavar="dir", help="directory (or single script) to compile")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("-f", "--force", action="store_true", help="parse every file, even if its cache file is up to date")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only report errors")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for directory in args.dirs:
+        paths.extend(find_scripts(directory) if os.path.isdir(directory) else [directory])
+
+    start = time.perf_counter()
+    results = compile_all(paths, args.jobs, args.force)
+    wall = time.perf_counter() - start
+
+    results.sort(key=lambda result: result.fn)
+    errors = [result for result in results if result.error]
+
+    for result in results:
+        if not args.quiet:
+            status = "ERROR" if result.error else "ok"
+            print(f"{result.elapsed * 1000:9.1f} ms  {status:5}  {result.fn}")
+    for result in errors:
+        print(f"\n{result.error}", file=sys.stderr)
+
+    cpu = sum(result.elapsed for result in results)
+    print(
+        f"\n{len(results)} files, {len(errors)} with errors, in {wall:.2f} s "
+        f"({cpu:.2f} s of compile time across workers)"
+    )
+    return 1 if errors else 0
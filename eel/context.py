@@ -1,15 +1,81 @@
 class Context:
-    def __init__(self, display_name, parent=None, parent_entry_pos=None):
+    # Deepest a context may be, i.e. the most nested calls a program can make; Python's own limit is raised to
+    # match while a program runs (see eel.main). A tail call takes the place of the call it is made from, so it
+    # is not one deeper.
+    recursion_limit = 1000
+
+    def __init__(self, display_name, parent=None, parent_entry_pos=None, symbol_table=None):
+        self.display_name = display_name
+        self.parent = parent
+        self.parent_entry_pos = parent_entry_pos
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.symbol_table: SymbolTable = symbol_table if symbol_table is not None else SymbolTable()
+
+
+class FunctionContext(Context):
+    """
+    Context of a call of a function with resolved slots (see eel.resolver). Its locals are in frame and the
+    program's top-level names in globals, so its own symbol table is only made if something asks for it, e.g. a
+    builtin or an IMPORT in the function.
+    """
+
+    def __init__(self, display_name, parent, parent_entry_pos, frame, globals_, slots, caller):
+        """
+        :param slots: The slot in frame of each local, by name
+        :param caller: The context the call was made from, whose names the function sees after its own (see
+                       get_from_caller). For a tail call, the function that made it, rather than parent.
+        """
         self.display_name = display_name
         self.parent = parent
         self.parent_entry_pos = parent_entry_pos
-        self.symbol_table: SymbolTable = SymbolTable()
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.frame = frame
+        self.globals = globals_
+        self.slots = slots
+        self.caller = caller
+        # The symbol table of the call, None until something asks for it
+        self.own_symbol_table = None
+
+    def get_from_caller(self, name):
+        """
+        :return: The value of name among the names of the caller, None if it has none. A lookup through the symbol
+                 tables of a call sees these after the function's own (see SymbolTable.get)
+        """
+        caller = self.caller
+        if caller is None:
+            return None
+        if caller.__class__ is not FunctionContext:
+            return caller.symbol_table.symbols.get(name)
+
+        slot = caller.slots.get(name)
+        value = caller.frame[slot] if slot is not None else None
+        if value is None and caller.own_symbol_table is not None:
+            value = caller.own_symbol_table.symbols.get(name)
+        return value
+
+    @property
+    def symbol_table(self):
+        if self.own_symbol_table is None:
+            self.own_symbol_table = SymbolTable(self.globals)
+        return self.own_symbol_table
+
+    @symbol_table.setter
+    def symbol_table(self, symbol_table):
+        self.own_symbol_table = symbol_table
 
 
 class SymbolTable:
-    def __init__(self, parent=None):
-        self.symbols = {}
+    def __init__(self, parent=None, symbols=None):
+        """
+        :param symbols: The dict to hold the table's names, e.g. the arguments of a call; a new one by default
+        """
+        self.symbols = symbols if symbols is not None else {}
         self.parent = parent
+        # Names whose values are cached by lookups (see eel.closures)
+        self.watched = set()
+        # Bumped whenever a name is added or removed, or a watched name is set, so a cached lookup is still valid
+        # while the version it saw is unchanged. Code that writes to symbols directly bumps it the same way.
+        self.version = 0
 
     def get(self, name):
         value = self.symbols.get(name, None)
@@ -18,10 +84,16 @@ class SymbolTable:
         return value
 
     def set(self, name, value):
+        if name in self.watched or name not in self.symbols:
+            self.version += 1
         self.symbols[name] = value
 
+    def watch(self, name):
+        self.watched.add(name)
+
     def remove(self, name):
         del self.symbols[name]
+        self.version += 1
 
     def copy(self):
         new = SymbolTable()
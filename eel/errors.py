@@ -8,19 +8,42 @@ __all__ = [
     "ExpectedCharError"
 ]
 
+# Times a line repeated in a row is shown in a traceback before the rest of its run is counted instead
+TRACEBACK_REPEATS = 3
+
 
 class Error:
     def __init__(self, pos_start, pos_end, error_name, details, terminate=True):
+        """
+        :param details: The message, or a function returning it for messages that are costly to build.
+                        Errors are often caught and never shown, so it is only called when needed.
+        """
         self.error_name = error_name
-        self.details = details
+        self._details = details
         self.pos_start = pos_start
         self.pos_end = pos_end
         self.terminate = terminate
+        self._string = None
+
+    @property
+    def details(self):
+        if callable(self._details):
+            self._details = self._details()
+        return self._details
 
     def as_string(self):
+        if self._string is None:
+            self._string = self.render()
+        return self._string
+
+    def positions_moved(self):
+        # Called when the source the positions point into is shifted, e.g. by an edit above it
+        self._string = None
+
+    def render(self):
         result = f"ERROR: {self.error_name}: {self.details}"
         result += f"\nFile: {self.pos_start.fn}, line: {self.pos_start.ln + 1}"
-        result += '\n\n' + string_with_arrows(self.pos_start.ftxt, self.pos_start, self.pos_end)
+        result += '\n\n' + string_with_arrows(self.pos_start, self.pos_end)
         return result
 
     def alert(self):
@@ -48,23 +71,36 @@ class RTError(Error):
 
         self.context = context
 
-    def as_string(self):
+    def render(self):
         result = self.generate_traceback()
         result += f'{self.error_name}: {self.details}\n'
-        result += '\n' + string_with_arrows(self.pos_start.ftxt, self.pos_start, self.pos_end)
+        result += '\n' + string_with_arrows(self.pos_start, self.pos_end)
         return result
 
     def generate_traceback(self):
-        result = ""
+        lines = []
         pos = self.pos_start
         ctx = self.context
 
         while ctx:
-            result = f'  File {pos.fn}, line {str(pos.ln + 1)}, in {ctx.display_name}\n' + result
+            lines.append(f'  File {pos.fn}, line {str(pos.ln + 1)}, in {ctx.display_name}\n')
             pos = ctx.parent_entry_pos
             ctx = ctx.parent
-
-        return "Traceback (most recent call last):\n" + result
+        lines.reverse()
+
+        # Runs of the same line, e.g. from deep recursion, are cut short like in Python's tracebacks
+        collapsed = []
+        i = 0
+        while i < len(lines):
+            run_end = i + 1
+            while run_end < len(lines) and lines[run_end] == lines[i]:
+                run_end += 1
+            collapsed.extend(lines[i:min(run_end, i + TRACEBACK_REPEATS)])
+            if run_end - i > TRACEBACK_REPEATS:
+                collapsed.append(f"  [Previous line repeated {run_end - i - TRACEBACK_REPEATS} more times]\n")
+            i = run_end
+
+        return "Traceback (most recent call last):\n" + "".join(collapsed)
 
 
 class ExpectedCharError(RTError):
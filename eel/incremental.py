@@ -0,0 +1,432 @@
+import weakref
+from collections.abc import Sequence
+from random import random
+
+from .base import Lexer
+from .errors import InvalidSyntaxError
+from .nodes import ListNode
+from .parser import Parser, starts_statement
+from .source import Source
+from .tokens import TT_EOF, TT_NEWLINE
+
+
+def last_line(text):
+    return text[text.rfind("\n") + 1:]
+
+
+class Segment:
+    """
+    The text of one top-level statement, plus the newlines and comments that follow it, with the positions its
+    parse gave the start and end of the text.
+
+    Segments are the nodes of a Segments tree, and only know where they are in the document through it: start
+    and first_line are worked out from the segments before them, so an edit never has to move the ones after it.
+    """
+    __slots__ = (
+        "text", "source", "node", "error", "pos_start", "pos_end", "newlines",
+        "left", "right", "parent", "priority", "count", "length", "lines"
+    )
+
+    def __init__(self, text, source, node, error=None, pos_start=None, pos_end=None):
+        self.text = text
+        self.source = source
+        self.node = node
+        self.error = error
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+        self.newlines = text.count("\n")
+
+        self.left = self.right = self.parent = None
+        self.priority = random()
+        self.update()
+        source.segment = self
+
+    def update(self):
+        # The segments, characters and lines of the subtree this segment is the root of
+        count, length, lines = 1, len(self.text), self.newlines
+        for child in (self.left, self.right):
+            if child:
+                count += child.count
+                length += child.length
+                lines += child.lines
+        self.count, self.length, self.lines = count, length, lines
+
+    def before(self):
+        """
+        :return: (segments, characters, lines) before this segment in the document
+        """
+        left = self.left
+        count, length, lines = (left.count, left.length, left.lines) if left else (0, 0, 0)
+        node = self
+        while node.parent:
+            parent = node.parent
+            if node is parent.right:
+                # The parent and everything left of it come first
+                count += parent.count - node.count
+                length += parent.length - node.length
+                lines += parent.lines - node.lines
+            node = parent
+        return count, length, lines
+
+    @property
+    def start(self):
+        return self.before()[1]
+
+    @property
+    def first_line(self):
+        return self.before()[2]
+
+
+class SegmentSource(Source):
+    """The Source of a segment, whose first line moves with the edits above the segment"""
+    segment = None
+
+    @property
+    def first_line(self):
+        if self.segment is None:
+            return self._first_line
+        return self.segment.first_line
+
+    @first_line.setter
+    def first_line(self, first_line):
+        self._first_line = first_line
+
+
+class Segments:
+    """
+    The segments of a Document in order, kept as a treap (a binary tree balanced by random priorities) of them,
+    so finding the segment at an offset, reaching one by index and replacing a run of them each take O(log n)
+    """
+
+    def __init__(self, segments):
+        self.root = None
+        for segment in segments:
+            self.root = merge(self.root, segment)
+
+    def __len__(self):
+        return self.root.count if self.root else 0
+
+    def __iter__(self):
+        node = self.first()
+        while node:
+            yield node
+            node = successor(node)
+
+    def __getitem__(self, key):
+        """
+        :param key: An index, or a slice of consecutive segments, which is returned as a list
+        """
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(len(self))
+            segments = []
+            node = self.at(start) if start < stop else None
+            for _ in range(stop - start):
+                segments.append(node)
+                node = successor(node)
+            return segments
+        return self.at(key + len(self) if key < 0 else key)
+
+    def first(self):
+        node = self.root
+        while node and node.left:
+            node = node.left
+        return node
+
+    def at(self, idx):
+        if not 0 <= idx < len(self):
+            raise IndexError("segment index out of range")
+        node = self.root
+        while True:
+            left_count = node.left.count if node.left else 0
+            if idx < left_count:
+                node = node.left
+            elif idx == left_count:
+                return node
+            else:
+                idx -= left_count + 1
+                node = node.right
+
+    def find(self, offset):
+        """
+        :return: The index of the last segment starting at or before offset, or 0 if there is none
+        """
+        node = self.root
+        idx = 0
+        while True:
+            left_length = node.left.length if node.left else 0
+            if node.left and offset < left_length:
+                node = node.left
+                continue
+            offset -= left_length
+            idx += node.left.count if node.left else 0
+            if node.right is None or offset < len(node.text):
+                return idx
+            offset -= len(node.text)
+            idx += 1
+            node = node.right
+
+    def replace(self, first, last, segments):
+        """
+        Replaces the segments first to last, inclusive, with segments
+        """
+        before, rest = split(self.root, first)
+        _, after = split(rest, last + 1 - first)
+        middle = None
+        for segment in segments:
+            middle = merge(middle, segment)
+        self.root = merge(merge(before, middle), after)
+        if self.root:
+            self.root.parent = None
+
+
+class StatementNodes(Sequence):
+    """
+    The statements of the AST of a Document, only read from its segments once something asks for them, so an
+    edit whose AST is never looked at costs nothing for the statements it left alone
+    """
+    __slots__ = ("segments", "nodes", "__weakref__")
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.nodes = None
+
+    def load(self):
+        if self.nodes is None:
+            self.nodes = [segment.node for segment in self.segments]
+        return self.nodes
+
+    def __len__(self):
+        return len(self.load())
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __iter__(self):
+        return iter(self.load())
+
+
+def successor(node):
+    if node.right:
+        node = node.right
+        while node.left:
+            node = node.left
+        return node
+    while node.parent and node is node.parent.right:
+        node = node.parent
+    return node.parent
+
+
+def merge(a, b):
+    """
+    :return: The root of a tree of the segments of a followed by those of b
+    """
+    if a is None or b is None:
+        root = a or b
+    elif a.priority > b.priority:
+        a.right = merge(a.right, b)
+        a.right.parent = a
+        a.update()
+        root = a
+    else:
+        b.left = merge(a, b.left)
+        b.left.parent = b
+        b.update()
+        root = b
+    if root:
+        root.parent = None
+    return root
+
+
+def split(node, count):
+    """
+    :return: The roots of trees of the first count segments under node, and of the rest
+    """
+    if node is None:
+        return None, None
+    left_count = node.left.count if node.left else 0
+    if count <= left_count:
+        a, node.left = split(node.left, count)
+        if node.left:
+            node.left.parent = node
+        node.update()
+        node.parent = None
+        return a, node
+    node.right, b = split(node.right, count - left_count - 1)
+    if node.right:
+        node.right.parent = node
+    node.update()
+    node.parent = None
+    return node, b
+
+
+class Document:
+    """
+    Keeps the parsed form of a file that is edited in place, e.g. from an editor or the REPL.
+
+    The text is split into segments, one per top-level statement. An edit only re-lexes and re-parses
+    the segments it touches, growing the region while the statement it contains continues past it
+    (e.g. a block that was just opened). Every other segment keeps its tokens and AST.
+    """
+
+    def __init__(self, fn, text=""):
+        self.fn = fn
+        self.segments = Segments(self.parse_segments(text, 0, ""))
+        # The statements of the last AST handed out, while anything still holds it; they are read before the next
+        # edit changes the segments, so that AST keeps the statements it was made with
+        self.statements = None
+
+    @property
+    def text(self):
+        return "".join(segment.text for segment in self.segments)
+
+    @property
+    def error(self):
+        # A segment that fails to parse always runs to the end of the document, so only the last can fail
+        return self.segments[-1].error
+
+    @property
+    def ast(self):
+        if self.error:
+            return None
+
+        statements = self.statements and self.statements()
+        if statements is None:
+            statements = StatementNodes(self.segments)
+            self.statements = weakref.ref(statements)
+        segments = self.segments
+        return ListNode(statements, segments.first().pos_start, segments[-1].pos_end)
+
+    def edit(self, offset, deleted, inserted):
+        """
+        Replaces `deleted` characters at `offset` with the `inserted` text.
+
+        :return: (ast, error) for the whole document, as after a full parse
+        """
+        segments = self.segments
+        first = self.segment_at(offset)
+        last = self.segment_at(offset + deleted - 1) if deleted else first
+
+        old_text = "".join(segment.text for segment in segments[first:last + 1])
+        local = offset - segments[first].start
+        text = old_text[:local] + inserted + old_text[local + deleted:]
+
+        while True:
+            at_end = last + 1 == len(segments)
+            new_segments = self.parse_segments(
+                text, segments[first].first_line, self.line_prefix(first), at_start=first == 0, at_end=at_end
+            )
+
+            if new_segments == []:
+                # Only blank lines and comments are left; they belong to the previous statement
+                first -= 1
+                old_text = segments[first].text + old_text
+                text = segments[first].text + text
+
+            elif new_segments is None or (not at_end and last_line(text) != last_line(old_text)):
+                # The statement runs on into the following segments, or the next one shares a line with
+                # the changed text; take them into the region and try again. The region doubles each time,
+                # so a block left open near the top of a file costs a few re-parses, not one per segment.
+                grow = segments[last + 1:last + 1 + max(last - first, 1)] if new_segments is None else segments[last + 1:last + 2]
+                last += len(grow)
+                grown = "".join(segment.text for segment in grow)
+                old_text += grown
+                text += grown
+
+            else:
+                break
+
+        statements = self.statements and self.statements()
+        if statements is not None:
+            statements.load()
+        self.statements = None
+
+        # Untouched segments after the edit work out their new offsets and lines from the tree
+        segments.replace(first, last, new_segments)
+
+        last_segment = segments[-1]
+        moved_lines = text.count("\n") - old_text.count("\n")
+        if last_segment.error and moved_lines and last_segment not in new_segments:
+            last_segment.error.positions_moved()
+
+        return self.ast, self.error
+
+    def segment_at(self, offset):
+        return self.segments.find(offset)
+
+    def line_prefix(self, idx):
+        # The text between the start of the line and the start of segment idx
+        prefix = ""
+        while idx > 0 and "\n" not in prefix:
+            idx -= 1
+            prefix = self.segments[idx].text + prefix
+        return last_line(prefix)
+
+    def parse_segments(self, text, first_line, prefix, at_start=True, at_end=True):
+        """
+        :return: The segments making up the text, [] if it holds no statement and should join the
+                 previous segment, or None if its last statement runs on into the next segment
+        """
+        lexer, parser, res, first_tok, ends_with_newline = self.parse_text(text, first_line, prefix)
+
+        if first_tok is None and not at_start:
+            return []
+
+        if not at_end and (lexer.error or res.error or not ends_with_newline):
+            return None
+
+        if lexer.error or res.error:
+            error = lexer.error or res.error
+            if not lexer.error and not at_start and not starts_statement(first_tok):
+                # In the full text the previous statement would end here, leaving this token unparsed
+                error = InvalidSyntaxError(
+                    "Token cannot appear after previous token",
+                    first_tok.pos_start, first_tok.pos_end
+                )
+            return [Segment(text, lexer.source, None, error)]
+
+        offsets = [offset - len(prefix) for offset in parser.statement_starts[1:]]
+        if not offsets:
+            return [Segment(text, lexer.source, res.node.element_nodes[0], None, res.node.pos_start, res.node.pos_end)]
+
+        # Each statement gets its own source, so that later edits can shift their lines independently
+        segments = []
+        bounds = [0] + offsets + [len(text)]
+        for seg_start, seg_end in zip(bounds, bounds[1:]):
+            seg_text = text[seg_start:seg_end]
+            seg_lexer, _, seg_res, _, _ = self.parse_text(seg_text, first_line, prefix)
+            seg_node = seg_res.node
+            segments.append(Segment(
+                seg_text, seg_lexer.source, seg_node.element_nodes[0], None, seg_node.pos_start, seg_node.pos_end
+            ))
+
+            first_line += seg_text.count("\n")
+            prefix = last_line(prefix + seg_text)
+
+        return segments
+
+    def parse_text(self, text, first_line, prefix):
+        lexer = Lexer(self.fn, text, first_line, prefix)
+        # Positions in the segment take their line from it (see SegmentSource)
+        lexer.source = SegmentSource(self.fn, prefix, first_line)
+        seen = {"first": None, "eof": None}
+
+        def tokens():
+            for tok in lexer.iter_tokens():
+                if tok.type == TT_EOF:
+                    seen["eof"] = tok.start
+                elif tok.type != TT_NEWLINE and seen["first"] is None:
+                    seen["first"] = tok
+                yield tok
+
+        stream = tokens()
+        parser = Parser(stream)
+        res = parser.parse()
+
+        if res.error:
+            # Lexing errors take precedence, as in a full parse (see eel.main.parse)
+            for _ in stream:
+                pass
+
+        # A statement that runs up to EOF (e.g. a block missing its END) would absorb the next segment
+        ends_with_newline = bool(parser.statement_ends) and parser.statement_ends[-1] != seen["eof"]
+        return lexer, parser, res, seen["first"], ends_with_newline
@@ -5,43 +5,98 @@ import pathlib
 import sys
 
 from eel.errors import RTError
-from eel.module_utils import EelModule, EelModuleMeta, EelVariable, EelFunction
-from eel.values import Number, Function, String, List, Null, Dictionary
+from eel.module_utils import EelModule, EelModuleMeta, EelVariable
+from eel.values import Number, Function, String, List, Null, Dictionary, operation_error
 from eel.tokens import *
-from eel.base import RTResult
+from eel.base import BreakSignal, ContinueSignal, ReturnSignal, RTException, RTResult, TailCall, unwrap
+from eel.optimizer import KEYWORD_OPERATIONS, OPERATIONS
+
+
+def binary_op_error(node, error, context):
+    """
+    :return: error, of a BinOpNode's operation, placed at its operands
+    """
+    left_node, right_node = node.left_node, node.right_node
+    return operation_error(
+        error, context, (left_node.pos_start, left_node.pos_end), (right_node.pos_start, right_node.pos_end)
+    )
+
+
+def unary_op_error(node, error, context):
+    """
+    :return: error, of a UnaryOpNode's operation, placed at its operand, which also stands in for the -1 of a minus
+    """
+    span = node.node.pos_start, node.node.pos_end
+    return operation_error(error, context, span, span)
+
+
+def loop_values(start, end, step):
+    """
+    :return: The values the variable of a FOR loop from start to end by step takes, as Python numbers; a range if
+             they are all ints. A step of 0 gives none, in every engine, as it did before loops ran over ranges.
+    """
+    if start.__class__ is int and end.__class__ is int and step.__class__ is int:
+        # range() rejects a step of 0
+        return range(start, end, step) if step else ()
+    return stepped(start, end, step)
+
+
+def stepped(i, end, step):
+    if step > 0:
+        while i < end:
+            yield i
+            i += step
+    elif step < 0:
+        while i > end:
+            yield i
+            i += step
 
 
 class Interpreter:
-    def visit(self, node, context):
-        method_name = f'visit_{type(node).__name__}'
-        method = getattr(self, method_name, self.no_visit_method)
-        return method(node, context)
+    # Visit method of each node class, looked up by name the first time a node of the class is visited. Shared
+    # by every Interpreter; they keep no other state, so calls run their bodies on the caller's.
+    dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch = {}
 
-    def no_visit_method(self, node, context):
-        raise NotImplementedError(f"No visit method defined: 'visit_{type(node).__name__}'")
+    def visit(self, node, context):
+        method = self.dispatch.get(type(node))
+        if method is None:
+            method = self.find_visit_method(type(node))
+        return method(self, node, context)
+
+    @classmethod
+    def find_visit_method(cls, node_type):
+        method = getattr(cls, f'visit_{node_type.__name__}', None)
+        if method is None:
+            raise NotImplementedError(f"No visit method defined: 'visit_{node_type.__name__}'")
+        cls.dispatch[node_type] = method
+        return method
 
     def visit_NumberNode(self, node, context):
-        return RTResult().success(
-            Number(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return RTResult().success(Number(node.tok.value))
 
     def visit_StringNode(self, node, context):
-        return RTResult().success(
-            String(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return RTResult().success(String(node.tok.value))
+
+    def visit_ConstantNode(self, node, context):
+        return RTResult().success(node.value)
 
     def visit_ListNode(self, node, context):
         res = RTResult()
-        elements = []
+        # A block whose value is not used is only run for its effects
+        elements = None if node.is_discarded else []
 
         for element_node in node.element_nodes:
-            elements.append(res.register(self.visit(element_node, context)))
+            value = res.register(self.visit(element_node, context))
             if res.should_return():
                 return res
+            if elements is not None:
+                elements.append(value)
 
-        return res.success(
-            List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return res.success(Null() if elements is None else List(elements))
 
     def visit_DictNode(self, node, context):
         res = RTResult()
@@ -53,14 +108,16 @@ class Interpreter:
             if res.should_return():
                 return res
 
-        return res.success(
-            Dictionary(items).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return res.success(Dictionary(items))
 
     def visit_BinOpNode(self, node, context):
         res = RTResult()
         left = res.register(self.visit(node.left_node, context))
+        if res.should_return():
+            return res
         right = res.register(self.visit(node.right_node, context))
+        if res.should_return():
+            return res
 
         result, error = None, None
 
@@ -111,34 +168,30 @@ class Interpreter:
             result, error = left.xor_with(right)
 
         if error:
-            return res.failure(error)
+            return res.failure(binary_op_error(node, error, context))
         else:
-            return res.success(
-                result.set_pos(node.pos_start, node.pos_end)
-            )
+            return res.success(result)
 
     def visit_UnaryOpNode(self, node, context):
         res = RTResult()
-        number = res.register(self.visit(node.node, context))
+        value = res.register(self.visit(node.node, context))
         if res.should_return():
             return res
 
-        error = None
+        number, error = value, None
 
         t = node.op_tok.type
         if t == TT_MINUS:
-            number, error = number.multiplied_by(Number(-1))
+            number, error = value.multiplied_by(Number(-1))
 
         elif node.op_tok.matches(TT_KEYWORD, "NOT"):
-            number, error = number.notted()
+            number, error = value.notted()
 
         if error:
-            return res.failure(error)
+            return res.failure(unary_op_error(node, error, context))
 
         else:
-            return res.success(
-                number.set_pos(node.pos_start, node.pos_end)
-            )
+            return res.success(number)
 
     def visit_VarAccessNode(self, node, context):
         res = RTResult()
@@ -154,10 +207,6 @@ class Interpreter:
         if isinstance(value, EelVariable):
             value = value()
 
-        if isinstance(value, EelFunction):
-            return res.success(value)
-
-        value = value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
         return res.success(value)
 
     def visit_VarAssignNode(self, node, context):
@@ -195,7 +244,7 @@ class Interpreter:
 
     def visit_ForNode(self, node, context):
         res = RTResult()
-        elements = []
+        elements = None if node.should_return_null or node.is_discarded else []
 
         start_value = res.register(self.visit(node.start_value_node, context))
         if res.should_return():
@@ -212,39 +261,37 @@ class Interpreter:
         else:
             step_value = Number(1)
 
-        i = start_value.value
-
-        if step_value.value > 0:
-            condition = lambda: i < end_value.value
-        elif step_value.value < 0:
-            condition = lambda: i > end_value.value
-        else:
-            condition = lambda: False
+        var_name = node.var_name_tok.value
+        symbol_table = context.symbol_table
+        i = None
 
-        while condition():
-            context.symbol_table.set(node.var_name_tok.value, Number(i))
-            i += step_value.value
+        try:
+            for i in loop_values(start_value.value, end_value.value, step_value.value):
+                if node.uses_var:
+                    symbol_table.set(var_name, Number(i))
 
-            value = res.register(self.visit(node.body_node, context))
-            if res.should_return() and res.loop_should_continue is False and res.loop_should_break is False:
-                return res
+                value = res.register(self.visit(node.body_node, context))
+                if res.should_return() and res.loop_should_continue is False and res.loop_should_break is False:
+                    return res
 
-            if res.loop_should_continue:
-                continue
+                if res.loop_should_continue:
+                    continue
 
-            if res.loop_should_break:
-                break
+                if res.loop_should_break:
+                    break
 
-            elements.append(value)
+                if elements is not None:
+                    elements.append(value)
+        finally:
+            if not node.uses_var and i is not None:
+                # Left with its value from the last time round, however the loop ends, as if set every time
+                symbol_table.set(var_name, Number(i))
 
-        return res.success(
-            Null() if node.should_return_null else
-            List(elements).set_pos(node.pos_start, node.pos_end).set_context(context)
-        )
+        return res.success(Null() if elements is None else List(elements))
 
     def visit_WhileNode(self, node, context):
         res = RTResult()
-        elements = []
+        elements = None if node.should_return_null or node.is_discarded else []
 
         while True:
             condition = res.register(self.visit(node.condition_node, context))
@@ -265,12 +312,10 @@ class Interpreter:
             if res.loop_should_break:
                 break
 
-            elements.append(value)
+            if elements is not None:
+                elements.append(value)
 
-        return res.success(
-            Null() if node.should_return_null else  # FIXME
-            List(elements).set_pos(node.pos_start, node.pos_end).set_context(context)
-        )
+        return res.success(Null() if elements is None else List(elements))
 
     def visit_FuncDefNode(self, node, context):
         res = RTResult()
@@ -278,7 +323,7 @@ class Interpreter:
         func_name = node.var_name_tok.value if node.var_name_tok else None
         body_node = node.body_node
         arg_names = [arg_name.value for arg_name in node.arg_name_toks]
-        func_value = Function(func_name, body_node, arg_names, node.should_auto_return).set_context(context).set_pos(node.pos_start, node.pos_end)
+        func_value = Function(func_name, body_node, arg_names, node.should_auto_return)
 
         if node.var_name_tok:
             context.symbol_table.set(func_name, func_value)
@@ -293,30 +338,28 @@ class Interpreter:
         if res.should_return():
             return res
 
-        if isinstance(value_to_call, EelFunction):
-            for arg_node in node.arg_nodes:
-                args.append(res.register(self.visit(arg_node, context)))
-                if res.should_return():
-                    return res
-
-            return_value = res.register(value_to_call(*args))
-            if res.should_return():
-                return res
-            return_value = return_value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-
-            return res.success(return_value)
-
-        value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end)
-
         for arg_node in node.arg_nodes:
             args.append(res.register(self.visit(arg_node, context)))
             if res.should_return():
                 return res
 
-        return_value = res.register(value_to_call.execute(args))
+        if value_to_call.__class__ is Function and not node.is_tail:
+            body_node = value_to_call.body_node
+            if body_node is not node.checked_body and len(args) == len(value_to_call.arg_names):
+                node.checked_body = body_node
+            if body_node is node.checked_body:
+                # Made here, by this interpreter, with its args already checked
+                return value_to_call.execute_at(self, args, context, node.pos_start, node.pos_end)
+
+        if node.is_tail and value_to_call.__class__ is Function:
+            # Made by the Function.execute_at running this one, once it returns
+            return res.success(TailCall(value_to_call, args, context, node.pos_start, node.pos_end))
+
+        return_value = res.register(
+            value_to_call.execute(args, context, node.pos_start, node.pos_end, node.arg_spans)
+        )
         if res.should_return():
             return res
-        return_value = return_value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
 
         return res.success(return_value)
 
@@ -348,8 +391,19 @@ class Interpreter:
         else:
             value = Null()
 
+        return self.import_value(value, node.pos_start, node.pos_end, context)
+
+    def import_value(self, value, pos_start, pos_end, context, engine=None):
+        """
+        Imports the module named by value, an evaluated IMPORT.
+
+        :param pos_start: Start of the IMPORT, for errors
+        :param engine: Engine to run an imported .eel file with (see eel.main.execute)
+        """
+        res = RTResult()
+
         if isinstance(value, String):
-            from eel import run
+            from eel.main import new_context, run_file
 
             fn = value.value + ".eel"
 
@@ -389,13 +443,15 @@ class Interpreter:
                         return res.success(value)
 
                 else:
-                    return res.failure(RTError(f"Import Error: No module or local file named '{value.value}'", node.pos_start, node.pos_end, context))
+                    return res.failure(RTError(f"Import Error: No module or local file named '{value.value}'", pos_start, pos_end, context))
 
-            result, error = run(fn, open(fn).read(), True)
+            module_context = new_context(True)
+            _, error = run_file(fn, True, engine, module_context)
+            if error:
+                return res.failure(error)
             prefix = value.value + "::"
-            for name, symbol_value in result.context.symbol_table.symbols.items():
-                c = symbol_value.copy()
-                context.symbol_table.set(prefix + name, c)
+            for name, symbol_value in module_context.symbol_table.symbols.items():
+                context.symbol_table.set(prefix + name, symbol_value)
                 """if isinstance(node, Function):
                     context.symbol_table.set(prefix + name, c)
                 elif isinstance(node, Number) or isinstance(node, String):
@@ -407,3 +463,255 @@ class Interpreter:
                     context.symbol_table.set(prefix + name, c)"""
 
         return res.success(value)
+
+
+class DirectInterpreter(Interpreter):
+    """
+    Walks the tree like the Interpreter, but each visit returns the node's value itself. Errors and RETURN, BREAK
+    and CONTINUE are raised as exceptions (see eel.base) instead, so evaluating a node allocates no RTResult and
+    checks no flags. Functions defined here are DirectFunctions, which anything else can still call through
+    execute().
+    """
+
+    def run(self, node, context):
+        """
+        :return: (value, error), as from visit() of the Interpreter
+        """
+        try:
+            return self.visit(node, context), None
+        except RTException as e:
+            return None, e.error
+        except (ReturnSignal, BreakSignal, ContinueSignal):
+            # Left over at the top level, where the Interpreter also drops them
+            return None, None
+
+    def visit_NumberNode(self, node, context):
+        return Number(node.tok.value)
+
+    def visit_StringNode(self, node, context):
+        return String(node.tok.value)
+
+    def visit_ConstantNode(self, node, context):
+        return node.value
+
+    def visit_ListNode(self, node, context):
+        if node.is_discarded:
+            for element_node in node.element_nodes:
+                self.visit(element_node, context)
+            return Null()
+
+        elements = [self.visit(element_node, context) for element_node in node.element_nodes]
+        return List(elements)
+
+    def visit_DictNode(self, node, context):
+        items = {}
+        for k, v in node.items.items():
+            k = self.visit(k, context)
+            items[k] = self.visit(v, context)
+        return Dictionary(items)
+
+    def visit_BinOpNode(self, node, context):
+        left = self.visit(node.left_node, context)
+        right = self.visit(node.right_node, context)
+
+        op_tok = node.op_tok
+        method = KEYWORD_OPERATIONS[op_tok.value] if op_tok.type == TT_KEYWORD else OPERATIONS[op_tok.type]
+        result, error = getattr(left, method)(right)
+        if error:
+            raise RTException(binary_op_error(node, error, context))
+        return result
+
+    def visit_UnaryOpNode(self, node, context):
+        value = self.visit(node.node, context)
+        number, error = value, None
+
+        if node.op_tok.type == TT_MINUS:
+            number, error = value.multiplied_by(Number(-1))
+        elif node.op_tok.matches(TT_KEYWORD, "NOT"):
+            number, error = value.notted()
+
+        if error:
+            raise RTException(unary_op_error(node, error, context))
+        return number
+
+    def visit_VarAccessNode(self, node, context):
+        var_name = node.var_name_tok.value
+        value = context.symbol_table.get(var_name)
+
+        if not value:
+            raise RTException(RTError(f"'{var_name}' is not defined", node.pos_start, node.pos_end, context))
+
+        if isinstance(value, EelVariable):
+            value = value()
+
+        return value
+
+    def visit_VarAssignNode(self, node, context):
+        value = self.visit(node.value_node, context)
+        context.symbol_table.set(node.var_name_tok.value, value)
+        return value
+
+    def visit_IfNode(self, node, context):
+        for condition, expr, should_return_null in node.cases:
+            if self.visit(condition, context).is_true():
+                expr_value = self.visit(expr, context)
+                return Null() if should_return_null else expr_value
+
+        if node.else_case:
+            expr, should_return_null = node.else_case
+            else_value = self.visit(expr, context)
+            return Null() if should_return_null else else_value
+
+        return Null()
+
+    def visit_ForNode(self, node, context):
+        elements = None if node.should_return_null or node.is_discarded else []
+
+        start_value = self.visit(node.start_value_node, context)
+        end_value = self.visit(node.end_value_node, context)
+        step_value = self.visit(node.step_value_node, context) if node.step_value_node else Number(1)
+
+        var_name = node.var_name_tok.value
+        symbol_table = context.symbol_table
+        body_node = node.body_node
+        uses_var = node.uses_var
+        i = None
+
+        # As in Interpreter.visit_ForNode
+        try:
+            for i in loop_values(start_value.value, end_value.value, step_value.value):
+                if uses_var:
+                    symbol_table.set(var_name, Number(i))
+
+                try:
+                    value = self.visit(body_node, context)
+                except ContinueSignal:
+                    continue
+                except BreakSignal:
+                    break
+
+                if elements is not None:
+                    elements.append(value)
+        finally:
+            if not uses_var and i is not None:
+                symbol_table.set(var_name, Number(i))
+
+        return Null() if elements is None else List(elements)
+
+    def visit_WhileNode(self, node, context):
+        elements = None if node.should_return_null or node.is_discarded else []
+
+        # A signal raised by the condition leaves the loop, as under the Interpreter
+        while self.visit(node.condition_node, context).is_true():
+            try:
+                value = self.visit(node.body_node, context)
+            except ContinueSignal:
+                continue
+            except BreakSignal:
+                break
+
+            if elements is not None:
+                elements.append(value)
+
+        return Null() if elements is None else List(elements)
+
+    def visit_FuncDefNode(self, node, context):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        arg_names = [arg_name.value for arg_name in node.arg_name_toks]
+        func_value = DirectFunction(
+            func_name, node.body_node, arg_names, node.should_auto_return
+        )
+
+        if node.var_name_tok:
+            context.symbol_table.set(func_name, func_value)
+
+        return func_value
+
+    def visit_CallNode(self, node, context):
+        value_to_call = self.visit(node.node_to_call, context)
+        args = [self.visit(arg_node, context) for arg_node in node.arg_nodes]
+
+        if value_to_call.__class__ is DirectFunction and not node.is_tail:
+            # The same inline cache as Interpreter.visit_CallNode's
+            body_node = value_to_call.body_node
+            if body_node is not node.checked_body and len(args) == len(value_to_call.arg_names):
+                node.checked_body = body_node
+            if body_node is node.checked_body:
+                return value_to_call.call_at(self, args, context, node.pos_start, node.pos_end)
+
+        if value_to_call.__class__ is DirectFunction:
+            if node.is_tail:
+                return TailCall(value_to_call, args, context, node.pos_start, node.pos_end)
+            return value_to_call.call(args, context, node.pos_start, node.pos_end)
+        return unwrap(value_to_call.execute(args, context, node.pos_start, node.pos_end, node.arg_spans))
+
+    def visit_ReturnNode(self, node, context):
+        raise ReturnSignal(self.visit(node.node_to_return, context) if node.node_to_return else Null())
+
+    def visit_ContinueNode(self, node, context):
+        raise ContinueSignal()
+
+    def visit_BreakNode(self, node, context):
+        raise BreakSignal()
+
+    def visit_ImportNode(self, node, context):
+        value = self.visit(node.fn_node, context) if node.fn_node else Null()
+        return unwrap(self.import_value(value, node.pos_start, node.pos_end, context, "direct"))
+
+
+class DirectFunction(Function):
+    def call(self, args, context, pos_start, pos_end):
+        """
+        :return: The return value; errors are raised
+        """
+        if len(args) != len(self.arg_names):
+            # A call too deep fails on its depth first, whatever its args
+            raise RTException(
+                self.check_depth(self.generate_new_context(context, pos_start), pos_end)
+                or self.check_args(self.arg_names, args, context, pos_start, pos_end).error
+            )
+        return self.call_at(DirectInterpreter(), args, context, pos_start, pos_end)
+
+    def call_at(self, interpreter, args, context, pos_start, pos_end):
+        """
+        Like Function.execute_at, returning the return value and raising errors
+        """
+        function = self
+        exec_ctx = self.new_frame(args, context, pos_start)
+        if exec_ctx.depth > exec_ctx.recursion_limit:
+            raise RTException(self.check_depth(exec_ctx, pos_end))
+
+        # Tail calls the body returns are made here, in place of this call, as in Function.execute_at
+        while True:
+            try:
+                value = interpreter.visit(function.body_node, exec_ctx)
+                return_value = None
+            except ReturnSignal as signal:
+                value = None
+                return_value = signal.value
+
+            return_value = (value if function.should_auto_return else None) or return_value or Null()
+            if return_value.__class__ is not TailCall:
+                return return_value
+
+            function, args = return_value.function, return_value.args
+            if len(args) != len(function.arg_names):
+                raise RTException(function.check_args(
+                    function.arg_names, args, return_value.context, return_value.pos_start, return_value.pos_end
+                ).error)
+            exec_ctx = function.generate_tail_context(exec_ctx, return_value.context)
+            function.populate_args(function.arg_names, args, exec_ctx)
+
+    def execute(self, args, context, pos_start, pos_end, arg_spans=None):
+        res = RTResult()
+        try:
+            return res.success(self.call(args, context, pos_start, pos_end))
+        except RTException as e:
+            return res.failure(e.error)
+        except ContinueSignal:
+            return res.success_continue()
+        except BreakSignal:
+            return res.success_break()
+
+    def copy(self):
+        return DirectFunction(self.name, self.body_node, self.arg_names, self.should_auto_return)
@@ -1,10 +1,26 @@
+import io
 import math
 
+from eel import bytecode, cache, closures, stack, transpiler, vm
 from eel.context import Context, SymbolTable
+from eel.utils import recursion_limit
 from eel.values import Number, BuiltInFunction, Null
 from .base import Lexer
 from .parser import Parser
-from .interpreter import Interpreter
+from .interpreter import DirectInterpreter, Interpreter
+from .optimizer import optimize
+
+# Engine that runs programs when none is given: "tree" for the Interpreter, "direct" for the DirectInterpreter,
+# "closures" for eel.closures, "bytecode" for eel.vm, "python" for eel.transpiler, "stack" for eel.stack
+ENGINES = ("tree", "direct", "closures", "bytecode", "python", "stack")
+default_engine = "tree"
+
+# Python frames a single EEL call takes on each engine, measured for a call made three blocks deep in a function
+# (the tree-walking engines take 7 for a call in a single-line function, 21 from three blocks deep). Python's
+# recursion limit is raised to this many per call Context.recursion_limit allows while a program runs, so deep
+# recursion fails with EEL's own error rather than a RecursionError. It is kept no higher than needed, as Python
+# can overflow the C stack of the main thread, and crash, before it reaches a limit much higher than these.
+PYTHON_FRAMES_PER_CALL = {"tree": 24, "direct": 24, "closures": 12, "bytecode": 3, "python": 4}
 
 global_symbol_table = SymbolTable()
 global_symbol_table.set("null", Number(0))
@@ -28,28 +44,139 @@ global_symbol_table.set("LEN", BuiltInFunction.len)
 global_symbol_table.set("RUN", BuiltInFunction.run)
 
 
-def run(fn, text, _import=False):
-    lexer = Lexer(fn, text)
-    tokens, error = lexer.make_tokens()
+def run(fn, text, _import=False, engine=None):
+    """
+    :param fn: File name used in errors and tracebacks
+    :param text: The source as a string, or a file object, pipe or mmap to stream it from
+    :param engine: One of ENGINES, default_engine if None
+    """
+    node, error = parse(fn, text)
+    if error:
+        return None, error
+    return execute(node, _import, engine)
+
+
+def run_file(fn, _import=False, engine=None, context=None):
+    """
+    Runs the script at path fn, reusing its cached AST if it has not changed since it was last parsed (see eel.cache)
+
+    :param context: Context to run it in, new_context(_import) if None; an IMPORT reads the names it defines from it
+    """
+    if context is None:
+        context = new_context(_import)
+
+    if cache.enabled and (engine or default_engine) == "bytecode":
+        # The bytecode is cached as well, so an unchanged script is not compiled again either
+        code, error = cache.compile_file(fn, lambda data: compile_source(fn, data))
+        if error:
+            return None, error
+        with python_stack("bytecode"):
+            return vm.execute(code, context)
+
+    if cache.enabled and (engine or default_engine) == "python":
+        module, error = cache.transpile_file(fn, lambda data: transpile_source(fn, data))
+        if error:
+            return None, error
+        if module:
+            with python_stack("python"):
+                return module.run(context)
+        # Cannot be translated, so runs on the closure engine from the AST (see eel.transpiler.run)
+        engine = "closures"
+
+    if cache.enabled:
+        node, error = cache.parse_file(fn, lambda data: parse(fn, io.BytesIO(data)))
+    else:
+        with open(fn) as f:
+            node, error = parse(fn, f)
 
     if error:
         return None, error
+    return execute(node, _import, engine, context)
+
 
-    # generate AST
+def parse(fn, text):
+    """
+    :return: (node, error) for the whole program, optimized (see eel.optimizer)
+    """
+    lexer = Lexer(fn, text)
+    tokens = lexer.iter_tokens()
+
+    # generate AST while the source is being lexed
     parser = Parser(tokens)
     ast = parser.parse()
+
+    if ast.error:
+        # Lexing errors take precedence, as they did when the whole file was lexed up front
+        for _ in tokens:
+            pass
+
+    if lexer.error:
+        return None, lexer.error
     if ast.error:
         return None, ast.error
+    return optimize(ast.node), None
+
+
+def compile_source(fn, data):
+    """
+    :param data: The source as bytes
+    :return: (code, error), the program compiled to bytecode (see eel.bytecode)
+    """
+    node, error = parse(fn, io.BytesIO(data))
+    if error:
+        return None, error
+    return bytecode.compile(node), None
+
+
+def transpile_source(fn, data):
+    """
+    :param data: The source as bytes
+    :return: (module, error), the program translated to Python (see eel.transpiler); module is None if it cannot be
+    """
+    node, error = parse(fn, io.BytesIO(data))
+    if error:
+        return None, error
+    return transpiler.transpile(node), None
 
-    # run program
-    interpreter = Interpreter()
+
+def new_context(_import=False):
     if _import:
         context = Context("<_importer_>")
         context.symbol_table = global_symbol_table.copy()
     else:
         context = Context("<program>")
         context.symbol_table = global_symbol_table
-    result = interpreter.visit(ast.node, context)
+    return context
+
+
+def python_stack(engine):
+    return recursion_limit(Context.recursion_limit * PYTHON_FRAMES_PER_CALL[engine])
+
+
+def execute(node, _import=False, engine=None, context=None):
+    engine = engine or default_engine
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}")
+
+    if context is None:
+        context = new_context(_import)
+
+    if engine == "stack":
+        # Needs no more Python stack than a shallow program, however deep the program recurses
+        return stack.execute(node, context)
+
+    with python_stack(engine):
+        if engine == "direct":
+            return DirectInterpreter().run(node, context)
+        if engine == "closures":
+            return closures.run(node, context)
+        if engine == "bytecode":
+            return vm.execute(bytecode.compile(node), context)
+        if engine == "python":
+            return transpiler.run(node, context)
+
+        interpreter = Interpreter()
+        result = interpreter.visit(node, context)
 
     return result.value, result.error
 
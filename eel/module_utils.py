@@ -1,3 +1,13 @@
+import inspect
+import types
+
+from eel.base import RTResult
+from eel.context import Context
+from eel.errors import RTError
+
+ORDINALS = ("First", "Second", "Third", "Fourth", "Fifth")
+
+
 class EelModuleMeta(type):
 
     def __new__(cls, name, bases, attrs):
@@ -46,15 +56,138 @@ def eel_variable(func):
     return func
 
 
+class NativeSignature:
+    """
+    The args a native function (an EelFunction, or a BuiltInFunction's execute_* method) takes, worked out once
+    from its Python signature: a parameter with a default is optional, *args takes any number more, and one
+    annotated with a value type, or a union of them (e.g. List | Dictionary), only takes values of that type
+    """
+
+    def __init__(self, func, skip=0, name=None):
+        """
+        :param skip: Leading parameters that are not args, e.g. self
+        :param name: The name the native's type errors give it, if not the one it is called by
+        """
+        self.name = name
+        # Annotations that are strings, e.g. of a class defined further down the module, are looked up by now
+        params = list(inspect.signature(func, eval_str=True).parameters.values())[skip:]
+        variadic = params.pop() if params and params[-1].kind is inspect.Parameter.VAR_POSITIONAL else None
+
+        self.param_count = len(params)
+        self.min_args = sum(param.default is inspect.Parameter.empty for param in params)
+        self.max_args = None if variadic else len(params)
+        # (index, types) of each parameter whose args are checked, and the types of the extra args *args takes
+        self.checks = [
+            (i, param_types) for i, param_types in enumerate(map(self.annotation_types, params)) if param_types
+        ]
+        self.variadic_types = self.annotation_types(variadic) if variadic else None
+
+    @staticmethod
+    def annotation_types(param):
+        """
+        :return: The tuple of types param's annotation allows, or None if it does not name types, e.g. if it is
+                 missing
+        """
+        annotation = param.annotation
+        if isinstance(annotation, types.UnionType):
+            return annotation.__args__
+        if isinstance(annotation, type) and annotation is not inspect.Parameter.empty:
+            return annotation,
+        return None
+
+    def check(self, name, args, context, pos_start, pos_end):
+        """
+        :return: An RTError if args do not fit the signature of the native called name from context at pos_start
+                 to pos_end, None otherwise
+        """
+        if len(args) < self.min_args:
+            details = f"Too few args ({self.min_args - len(args)}) passed into '{name}'"
+            return RTError(details, pos_start, pos_end, context)
+        if self.max_args is not None and len(args) > self.max_args:
+            details = f"Too many args ({len(args) - self.max_args}) passed into '{name}'"
+            return RTError(details, pos_start, pos_end, context)
+
+        for i, arg_types in self.checks:
+            if i < len(args) and not isinstance(args[i], arg_types):
+                return self.type_error(name, i, arg_types, context, pos_start, pos_end)
+        if self.variadic_types:
+            for i in range(self.param_count, len(args)):
+                if not isinstance(args[i], self.variadic_types):
+                    return self.type_error(name, i, self.variadic_types, context, pos_start, pos_end)
+        return None
+
+    def type_error(self, name, i, arg_types, context, pos_start, pos_end):
+        expected = " or ".join(arg_type.__name__.lower() for arg_type in arg_types)
+        arg_name = self.name or name
+        if self.max_args == 1:
+            details = f"Argument must be {expected}"
+        elif i < len(ORDINALS):
+            details = f"{ORDINALS[i]} argument of '{arg_name}' must be a {expected}"
+        else:
+            details = f"Argument {i + 1} of '{arg_name}' must be a {expected}"
+        # Placed in the native's own context, as an error it reported itself would be
+        return RTError(details, pos_start, pos_end, Context(name, context, pos_start))
+
+    def call(self, name, func, args, context, pos_start, pos_end, arg_spans=None):
+        """
+        Calls func, the native called name, with args from context at pos_start to pos_end, once they fit the
+        signature
+
+        :param arg_spans: (pos_start, pos_end) of the node each arg came from, if the caller has them
+        :return: RTResult. An error func reports without a position, as values make them, is placed at the call,
+                 or, for an operation on its args (see eel.values.operand_error), at those args.
+        """
+        error = self.check(name, args, context, pos_start, pos_end)
+        if error:
+            return RTResult().failure(error)
+        res = func(*args)
+        if res.error and res.error.pos_start is None:
+            spans = self.operand_spans(res.error, args, arg_spans)
+            if spans:
+                # In the caller's context, as if the operation had been written there
+                res.error.pos_start, res.error.pos_end = spans[0][0], spans[1][1]
+                res.error.context = context
+            else:
+                res.error.pos_start, res.error.pos_end = pos_start, pos_end
+                # In the native's own context, like the type errors of check
+                res.error.context = Context(name, context, pos_start)
+        return res
+
+    @staticmethod
+    def operand_spans(error, args, arg_spans):
+        """
+        :return: The spans in arg_spans of the first and last operand of error, or None if error is not of an
+                 operation or its operands are not both args
+        """
+        values = getattr(error, "values", None)
+        if values is None or arg_spans is None:
+            return None
+        spans = []
+        for i in error.operands:
+            value = values[i]
+            span = next((span for arg, span in zip(args, arg_spans) if arg is value), None)
+            if span is None:
+                return None
+            spans.append(span)
+        return spans
+
+
 class EelFunction:
     def __init__(self, func):
         self.func = func
+        self.name = func.__name__
+        self.signature = NativeSignature(func)
 
     def __call__(self, *args, **kwargs):
         return self.func(*args, **kwargs)
 
-    def set_context(self, _):
-        pass
+    def execute(self, args, context, pos_start, pos_end, arg_spans=None):
+        """
+        Calls the function with args from context at pos_start to pos_end (see NativeSignature.call)
+
+        :return: RTResult
+        """
+        return self.signature.call(self.name, self.func, args, context, pos_start, pos_end, arg_spans)
 
 
 class EelVariable:
@@ -1,34 +1,121 @@
-class NumberNode:
+"""
+AST nodes. Each class has a small integer `kind` (its index in NODE_TYPES) and keeps its fields in __slots__.
+
+Positions are not stored up front: a node works out pos_start/pos_end from its tokens or children the first
+time they are asked for (an error, a value being created) and keeps them from then on, so a freshly parsed
+tree holds no Position objects at all.
+"""
+
+(
+    NUMBER, STRING, LIST, DICT, BIN_OP, UNARY_OP, VAR_ASSIGN, VAR_ACCESS, IF, FOR, WHILE, FUNC_DEF, CALL,
+    RETURN, IMPORT, CONTINUE, BREAK, CONSTANT
+) = range(18)
+
+
+class Node:
+    __slots__ = ("_pos_start", "_pos_end")
+    kind = None
+
+    # find_pos_start/find_pos_end return a Position, or the child node the position is taken from. The chain of
+    # children is followed with a loop, as a deeply nested tree would overflow the stack if each node asked the next
+
+    @property
+    def pos_start(self):
+        try:
+            return self._pos_start
+        except AttributeError:
+            return find_pos(self, "_pos_start", "find_pos_start")
+
+    @pos_start.setter
+    def pos_start(self, pos):
+        self._pos_start = pos
+
+    @property
+    def pos_end(self):
+        try:
+            return self._pos_end
+        except AttributeError:
+            return find_pos(self, "_pos_end", "find_pos_end")
+
+    @pos_end.setter
+    def pos_end(self, pos):
+        self._pos_end = pos
+
+
+def find_pos(node, name, method):
+    """
+    :return: The position `name` of node, which is kept on node and on every node it was found through
+    """
+    path = []
+    pos = node
+    while isinstance(pos, Node):
+        try:
+            pos = getattr(pos, name)
+            break
+        except AttributeError:
+            path.append(pos)
+            pos = getattr(pos, method)()
+
+    for child in path:
+        setattr(child, name, pos)
+    return pos
+
+
+class NumberNode(Node):
+    __slots__ = ("tok",)
+    kind = NUMBER
+
     def __init__(self, tok):
         self.tok = tok
 
-        self.pos_start = self.tok.pos_start
-        self.pos_end = self.tok.pos_end
+    def find_pos_start(self):
+        return self.tok.pos_start
+
+    def find_pos_end(self):
+        return self.tok.pos_end
 
     def __repr__(self):
         return f'{self.tok}'
 
 
-class StringNode:
+class StringNode(Node):
+    __slots__ = ("tok",)
+    kind = STRING
+
     def __init__(self, tok):
         self.tok = tok
 
-        self.pos_start = self.tok.pos_start
-        self.pos_end = self.tok.pos_end
+    def find_pos_start(self):
+        return self.tok.pos_start
+
+    def find_pos_end(self):
+        return self.tok.pos_end
 
     def __repr__(self):
         return f'{self.tok}'
 
 
-class ListNode:
-    def __init__(self, element_nodes, pos_start, pos_end):
+class ListNode(Node):
+    __slots__ = ("element_nodes", "is_discarded")
+    kind = LIST
+
+    def __init__(self, element_nodes, pos_start, pos_end, is_discarded=False):
+        """
+        :param is_discarded (bool): Is the value never used, e.g. of the block of statements of a loop whose value
+                                    is null? The engines then only run the elements for their effects. Set by
+                                    eel.optimizer, like the same flag of ForNode and WhileNode
+        """
         self.element_nodes = element_nodes
+        self.is_discarded = is_discarded
 
         self.pos_start = pos_start
         self.pos_end = pos_end
 
 
-class DictNode:
+class DictNode(Node):
+    __slots__ = ("items",)
+    kind = DICT
+
     def __init__(self, items, pos_start, pos_end):
         self.items = items
 
@@ -36,81 +123,141 @@ class DictNode:
         self.pos_end = pos_end
 
 
-class BinOpNode:
+class BinOpNode(Node):
+    __slots__ = ("left_node", "op_tok", "right_node")
+    kind = BIN_OP
+
     def __init__(self, left_node, op_tok, right_node):
         self.left_node = left_node
         self.op_tok = op_tok
         self.right_node = right_node
 
-        self.pos_start = self.left_node.pos_start
-        self.pos_end = self.right_node.pos_end
+    def find_pos_start(self):
+        return self.left_node
+
+    def find_pos_end(self):
+        return self.right_node
 
     def __repr__(self):
         return f'({self.left_node}, {self.op_tok}, {self.right_node})'
 
 
-class UnaryOpNode:
+class UnaryOpNode(Node):
+    __slots__ = ("op_tok", "node")
+    kind = UNARY_OP
+
     def __init__(self, op_tok, node):
         self.op_tok = op_tok
         self.node = node
 
-        self.pos_start = self.op_tok.pos_start
-        self.pos_end = self.node.pos_end
+    def find_pos_start(self):
+        return self.op_tok.pos_start
+
+    def find_pos_end(self):
+        return self.node
 
     def __repr__(self):
         return f'({self.op_tok} {self.node})'
 
 
-class VarAssignNode:
+class VarAssignNode(Node):
+    __slots__ = ("var_name_tok", "value_node")
+    kind = VAR_ASSIGN
+
     def __init__(self, var_name_tok, value_node):
         self.var_name_tok = var_name_tok
         self.value_node = value_node
 
-        self.pos_start = var_name_tok.pos_start
-        self.pos_end = value_node.pos_end
+    def find_pos_start(self):
+        return self.var_name_tok.pos_start
+
+    def find_pos_end(self):
+        return self.value_node
+
 
+class VarAccessNode(Node):
+    __slots__ = ("var_name_tok",)
+    kind = VAR_ACCESS
 
-class VarAccessNode:
     def __init__(self, var_name_tok):
         self.var_name_tok = var_name_tok
 
-        self.pos_start = var_name_tok.pos_start
-        self.pos_end = var_name_tok.pos_end
+    def find_pos_start(self):
+        return self.var_name_tok.pos_start
 
+    def find_pos_end(self):
+        return self.var_name_tok.pos_end
+
+
+class IfNode(Node):
+    __slots__ = ("cases", "else_case")
+    kind = IF
 
-class IfNode:
     def __init__(self, cases, else_case):
         self.cases = cases
         self.else_case = else_case
 
-        self.pos_start = cases[0][0].pos_start
-        self.pos_end = (else_case if else_case else cases[-1])[0].pos_end
+    def find_pos_start(self):
+        return self.cases[0][0]
+
+    def find_pos_end(self):
+        return (self.else_case if self.else_case else self.cases[-1])[0]
 
 
-class ForNode:
-    def __init__(self, var_name_tok, start_value_node, end_value_node, step_value_node, body_node, should_return_null):
+class ForNode(Node):
+    __slots__ = (
+        "var_name_tok", "start_value_node", "end_value_node", "step_value_node", "body_node", "should_return_null",
+        "uses_var", "is_discarded"
+    )
+    kind = FOR
+
+    def __init__(
+        self, var_name_tok, start_value_node, end_value_node, step_value_node, body_node, should_return_null,
+        uses_var=True, is_discarded=False
+    ):
+        """
+        :param uses_var (bool): Can the body read or set the loop's variable while it runs? If not, the tree-walking
+                                engines only set it once, after the loop. Set by eel.optimizer
+        """
         self.var_name_tok = var_name_tok
         self.start_value_node = start_value_node
         self.end_value_node = end_value_node
         self.step_value_node = step_value_node
         self.body_node = body_node
         self.should_return_null = should_return_null
+        self.uses_var = uses_var
+        # Is the loop's value never used? Then it does not keep the values of its body (see ListNode)
+        self.is_discarded = is_discarded
 
-        self.pos_start = self.var_name_tok.pos_start
-        self.pos_end = self.body_node.pos_end
+    def find_pos_start(self):
+        return self.var_name_tok.pos_start
 
+    def find_pos_end(self):
+        return self.body_node
 
-class WhileNode:
-    def __init__(self, condition_node, body_node, should_return_null):
+
+class WhileNode(Node):
+    __slots__ = ("condition_node", "body_node", "should_return_null", "is_discarded")
+    kind = WHILE
+
+    def __init__(self, condition_node, body_node, should_return_null, is_discarded=False):
         self.condition_node = condition_node
         self.body_node = body_node
         self.should_return_null = should_return_null
+        # As for ForNode
+        self.is_discarded = is_discarded
+
+    def find_pos_start(self):
+        return self.condition_node
 
-        self.pos_start = self.condition_node.pos_start
-        self.pos_end = self.body_node.pos_end
+    def find_pos_end(self):
+        return self.body_node
 
 
-class FuncDefNode:
+class FuncDefNode(Node):
+    __slots__ = ("var_name_tok", "arg_name_toks", "body_node", "should_auto_return")
+    kind = FUNC_DEF
+
     def __init__(self, var_name_tok, arg_name_toks, body_node, should_auto_return):
         """
         :param var_name_tok:
@@ -123,30 +270,57 @@ class FuncDefNode:
         self.body_node = body_node
         self.should_auto_return = should_auto_return
 
+    def find_pos_start(self):
         if self.var_name_tok:
-            self.pos_start = self.var_name_tok.pos_start
+            return self.var_name_tok.pos_start
         elif len(self.arg_name_toks) > 0:
-            self.pos_start = self.arg_name_toks[0].pos_start
-        else:
-            self.pos_start = self.body_node.pos_Start
+            return self.arg_name_toks[0].pos_start
+        return self.body_node
+
+    def find_pos_end(self):
+        return self.body_node
 
-        self.pos_end = self.body_node.pos_end
 
+class CallNode(Node):
+    __slots__ = ("node_to_call", "arg_nodes", "is_tail", "checked_body", "_arg_spans")
+    kind = CALL
 
-class CallNode:
-    def __init__(self, node_to_call, arg_nodes):
+    def __init__(self, node_to_call, arg_nodes, is_tail=False):
+        """
+        :param is_tail (bool): Is the call's value what the function it is in returns? Set by eel.optimizer
+        """
         self.node_to_call = node_to_call
         self.arg_nodes = arg_nodes
+        self.is_tail = is_tail
+        # The call's inline cache in eel.interpreter: the body of the last function it called, whose arity is
+        # known to match its args
+        self.checked_body = None
 
-        self.pos_start = self.node_to_call.pos_start
+    def find_pos_start(self):
+        return self.node_to_call
 
+    def find_pos_end(self):
         if len(self.arg_nodes) > 0:
-            self.pos_end = self.arg_nodes[-1].pos_end
-        else:
-            self.pos_end = self.node_to_call.pos_end
+            return self.arg_nodes[-1]
+        return self.node_to_call
+
+    @property
+    def arg_spans(self):
+        """
+        (pos_start, pos_end) of each arg node, which a native places an error of an operation on its args by
+        (see eel.module_utils.NativeSignature.call); worked out when first asked for, like positions
+        """
+        try:
+            return self._arg_spans
+        except AttributeError:
+            self._arg_spans = tuple((arg_node.pos_start, arg_node.pos_end) for arg_node in self.arg_nodes)
+            return self._arg_spans
+
 
+class ReturnNode(Node):
+    __slots__ = ("node_to_return",)
+    kind = RETURN
 
-class ReturnNode:
     def __init__(self, node_to_return, pos_start, pos_end):
         self.node_to_return = node_to_return
 
@@ -154,7 +328,10 @@ class ReturnNode:
         self.pos_end = pos_end
 
 
-class ImportNode:
+class ImportNode(Node):
+    __slots__ = ("fn_node",)
+    kind = IMPORT
+
     def __init__(self, fn_node, pos_start, pos_end):
         self.fn_node = fn_node
 
@@ -162,13 +339,43 @@ class ImportNode:
         self.pos_end = pos_end
 
 
-class ContinueNode:
+class ContinueNode(Node):
+    __slots__ = ()
+    kind = CONTINUE
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
 
 
-class BreakNode:
+class BreakNode(Node):
+    __slots__ = ()
+    kind = BREAK
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
+
+
+class ConstantNode(Node):
+    """An expression worked out before the program runs (see eel.optimizer)."""
+    __slots__ = ("value",)
+    kind = CONSTANT
+
+    def __init__(self, value, pos_start, pos_end):
+        """
+        :param value: The Number, Boolean or String the expression evaluates to
+        """
+        self.value = value
+
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+NODE_TYPES = (
+    NumberNode, StringNode, ListNode, DictNode, BinOpNode, UnaryOpNode, VarAssignNode, VarAccessNode, IfNode,
+    ForNode, WhileNode, FuncDefNode, CallNode, ReturnNode, ImportNode, ContinueNode, BreakNode, ConstantNode
+)
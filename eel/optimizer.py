@@ -0,0 +1,308 @@
+"""
+Optimizations applied to the AST between parsing and running it.
+
+Operations whose operands are all literals are worked out once, with the same value methods the interpreter
+uses (Number.added_to and friends), and replaced by a ConstantNode. An operation that fails, e.g. a division
+by zero, is left in the tree so that it still fails at run time, at the same position.
+
+Identities such as `x * 1` are only simplified when x can only be a Number, e.g. the result of a division, as
+`"ab" * 1` or `[1] * 1` are not x itself. Names are never folded: even `true` and `false` are ordinary
+variables, which a script can assign to.
+
+Calls whose value is what the function they are in returns are marked as tail calls (CallNode.is_tail), which
+the tree-walking and closure engines make in place of the call that returns them, without a deeper stack.
+
+FOR loops whose body cannot see their variable are marked (ForNode.uses_var), so the variable is not set every
+time round. A call or IMPORT in the body could read it, as a function sees the variables of its caller.
+
+Last, blocks of statements and loops whose value is never used, e.g. the body of a multi-line loop or of a
+function that does not return it, are marked (ListNode.is_discarded and the same flag of ForNode and WhileNode),
+so they are run for their effects without building a List of the values of every statement and time round.
+"""
+from .arena import CASES, ELSE_CASE, LAYOUTS, NODE, NODE_DICT, NODE_LIST, children
+from .nodes import (
+    BinOpNode, CallNode, ConstantNode, ForNode, FuncDefNode, IfNode, ImportNode, ListNode, NumberNode, ReturnNode,
+    StringNode, UnaryOpNode, VarAccessNode, VarAssignNode, WhileNode
+)
+from .tokens import *
+from .values import Boolean, Number, String
+
+# Folded values are kept in the tree (and in cache files), and are worked out even when the code never runs,
+# so operations that could produce a huge value are left for run time
+MAX_STR_SIZE = 4096
+MAX_INT_BITS = 128
+
+OPERATIONS = {
+    TT_PLUS: "added_to",
+    TT_MINUS: "subtracted_by",
+    TT_MUL: "multiplied_by",
+    TT_DIV: "divided_by",
+    TT_MOD: "mod_div_by",
+    TT_POW: "powered_by",
+    TT_EE: "get_comparison_eq",
+    TT_NE: "get_comparison_ne",
+    TT_LT: "get_comparison_lt",
+    TT_GT: "get_comparison_gt",
+    TT_LTE: "get_comparison_lte",
+    TT_GTE: "get_comparison_gte",
+}
+KEYWORD_OPERATIONS = {"AND": "and_with", "OR": "or_with", "XOR": "xor_with"}
+
+# Operations that only succeed on a Number, and then always give a value of this type
+RESULT_TYPES = {TT_DIV: Number, TT_MOD: Number}
+RESULT_TYPES.update((t, Boolean) for t in (TT_EE, TT_NE, TT_LT, TT_GT, TT_LTE, TT_GTE))
+KEYWORD_RESULT_TYPES = {"AND": Boolean, "OR": Boolean, "XOR": Boolean}
+
+# Nodes without child nodes
+LEAF_TYPES = {NumberNode, StringNode, VarAccessNode, ConstantNode}
+
+
+def optimize(node):
+    """
+    :return: The optimized tree; node itself may be modified
+    """
+    try:
+        node = Optimizer().visit(node)
+    except RecursionError:
+        # Every replacement made so far leaves a valid tree, the rest is simply not optimized
+        pass
+    mark_discarded(node)
+    return node
+
+
+class Optimizer:
+    def visit(self, node):
+        if type(node) in LEAF_TYPES:
+            return node
+
+        # Children first, so that nested constant expressions fold from the inside out
+        visit = self.visit
+        for name, operand in LAYOUTS[node.kind]:
+            value = getattr(node, name)
+            if operand == NODE:
+                if value is not None:
+                    setattr(node, name, visit(value))
+            elif operand == NODE_LIST:
+                setattr(node, name, [visit(child) for child in value])
+            elif operand == NODE_DICT:
+                setattr(node, name, {visit(key): visit(child) for key, child in value.items()})
+            elif operand == CASES:
+                setattr(node, name, [(visit(condition), visit(body), flag) for condition, body, flag in value])
+            elif operand == ELSE_CASE and value:
+                setattr(node, name, (visit(value[0]), value[1]))
+
+        if isinstance(node, BinOpNode):
+            return self.visit_BinOpNode(node)
+        if isinstance(node, UnaryOpNode):
+            return self.visit_UnaryOpNode(node)
+        if isinstance(node, FuncDefNode):
+            mark_tail_calls(node)
+        elif isinstance(node, ForNode):
+            node.uses_var = uses_var(node)
+        return node
+
+    def visit_BinOpNode(self, node):
+        left, right = constant(node.left_node), constant(node.right_node)
+        op = node.op_tok
+
+        if left is not None and right is not None:
+            method = KEYWORD_OPERATIONS.get(op.value) if op.type == TT_KEYWORD else OPERATIONS.get(op.type)
+            if method and not too_large(op.type, left.value, right.value):
+                return fold(node, lambda: getattr(left, method)(right))
+            return node
+
+        # Identities, where the other operand can only be a Number (or a Boolean for the logical ones)
+        if op.type == TT_MUL:
+            if is_int(right, 1) and type_of(node.left_node) is Number:
+                return replace(node, node.left_node)
+            if is_int(left, 1) and type_of(node.right_node) is Number:
+                return replace(node, node.right_node)
+
+        elif op.type in (TT_MINUS, TT_POW):
+            if is_int(right, 0 if op.type == TT_MINUS else 1) and type_of(node.left_node) is Number:
+                return replace(node, node.left_node)
+
+        elif op.type == TT_KEYWORD and op.value in KEYWORD_OPERATIONS:
+            # true AND b, false OR b and false XOR b are all b
+            keeps = (lambda value: value.is_true()) if op.value == "AND" else (lambda value: not value.is_true())
+            if isinstance(right, Number) and keeps(right) and type_of(node.left_node) is Boolean:
+                return replace(node, node.left_node)
+            if isinstance(left, Number) and keeps(left) and type_of(node.right_node) is Boolean:
+                return replace(node, node.right_node)
+
+        return node
+
+    def visit_UnaryOpNode(self, node):
+        operand = constant(node.node)
+        op = node.op_tok
+
+        if operand is not None:
+            if op.type == TT_MINUS:
+                return fold(node, lambda: operand.multiplied_by(Number(-1)))
+            if op.matches(TT_KEYWORD, "NOT"):
+                return fold(node, operand.notted)
+            return fold(node, lambda: (operand, None))
+
+        # NOT NOT b is b
+        if (
+            op.matches(TT_KEYWORD, "NOT") and isinstance(node.node, UnaryOpNode)
+            and node.node.op_tok.matches(TT_KEYWORD, "NOT") and type_of(node.node.node) is Boolean
+        ):
+            return replace(node, node.node.node)
+
+        return node
+
+
+def mark_tail_calls(node):
+    """
+    Marks the calls in tail position in the body of the FuncDefNode node: the body itself, for a function that
+    returns its value, and the value of every RETURN in it
+    """
+    if node.should_auto_return:
+        mark_tail(node.body_node)
+
+    stack = [node.body_node]
+    while stack:
+        child = stack.pop()
+        if isinstance(child, ReturnNode) and child.node_to_return:
+            mark_tail(child.node_to_return)
+        # Nested functions are marked when they are visited
+        if not isinstance(child, FuncDefNode):
+            stack.extend(children(child))
+
+
+def mark_tail(node):
+    if isinstance(node, CallNode):
+        node.is_tail = True
+    elif isinstance(node, IfNode):
+        # The value of a single-line IF is the value of the branch taken
+        for _, expr, should_return_null in node.cases:
+            if not should_return_null:
+                mark_tail(expr)
+        if node.else_case and not node.else_case[1]:
+            mark_tail(node.else_case[0])
+
+
+def uses_var(node):
+    """
+    :return: Whether the body of the ForNode node names its variable, or makes a call or IMPORT, which could see it
+    """
+    name = node.var_name_tok.value
+    stack = [node.body_node]
+    while stack:
+        child = stack.pop()
+        if isinstance(child, (CallNode, ImportNode)):
+            return True
+        if isinstance(child, (VarAccessNode, VarAssignNode, ForNode, FuncDefNode)):
+            if child.var_name_tok and child.var_name_tok.value == name:
+                return True
+        stack.extend(children(child))
+    return False
+
+
+def mark_discarded(node):
+    """
+    Sets is_discarded on every ListNode, ForNode and WhileNode in the tree, the root being used
+    """
+    stack = [(node, False)]
+    while stack:
+        node, discarded = stack.pop()
+        if isinstance(node, (ListNode, ForNode, WhileNode)):
+            node.is_discarded = discarded
+
+        if isinstance(node, ListNode):
+            stack.extend((child, discarded) for child in node.element_nodes)
+        elif isinstance(node, (ForNode, WhileNode)):
+            stack.extend((child, False) for child in children(node) if child is not node.body_node)
+            stack.append((node.body_node, discarded or node.should_return_null))
+        elif isinstance(node, IfNode):
+            # The value of a single-line IF is the value of the branch taken, the value of a block is not used
+            for condition, expr, should_return_null in node.cases:
+                stack.append((condition, False))
+                stack.append((expr, discarded or should_return_null))
+            if node.else_case:
+                stack.append((node.else_case[0], discarded or node.else_case[1]))
+        elif isinstance(node, FuncDefNode):
+            stack.append((node.body_node, not node.should_auto_return))
+        else:
+            stack.extend((child, False) for child in children(node))
+
+
+def constant(node):
+    """
+    :return: The value of a literal or folded node, None for any other node
+    """
+    if isinstance(node, NumberNode):
+        return Number(node.tok.value)
+    if isinstance(node, StringNode):
+        return String(node.tok.value)
+    if isinstance(node, ConstantNode):
+        return node.value
+    return None
+
+
+def type_of(node):
+    """
+    :return: The type node always evaluates to (when it does not fail), or None if it is not known
+    """
+    if isinstance(node, (NumberNode, StringNode, ConstantNode)):
+        return type(constant(node))
+
+    if isinstance(node, BinOpNode):
+        op = node.op_tok
+        if op.type == TT_KEYWORD:
+            return KEYWORD_RESULT_TYPES.get(op.value)
+        if op.type in RESULT_TYPES:
+            return RESULT_TYPES[op.type]
+        if type_of(node.left_node) in (Number, Boolean) and type_of(node.right_node) in (Number, Boolean):
+            return Number
+
+    if isinstance(node, UnaryOpNode):
+        if node.op_tok.matches(TT_KEYWORD, "NOT"):
+            return Boolean
+        operand_type = type_of(node.node)
+        if node.op_tok.type == TT_MINUS and operand_type in (Number, Boolean):
+            return Number
+        if node.op_tok.type == TT_PLUS:
+            return operand_type
+
+    return None
+
+
+def is_int(value, n):
+    return isinstance(value, Number) and type(value.value) is int and value.value == n
+
+
+def too_large(op_type, left, right):
+    if op_type == TT_POW and type(left) is int and type(right) is int:
+        return right > 0 and left.bit_length() * right > MAX_INT_BITS
+    if op_type == TT_MUL:
+        if type(left) is int and type(right) is int:
+            return left.bit_length() + right.bit_length() > MAX_INT_BITS
+        if isinstance(left, str) and isinstance(right, int):
+            return len(left) * right > MAX_STR_SIZE
+    return False
+
+
+def fold(node, operation):
+    """
+    :param operation: Returns (value, error), like the value methods
+    :return: A ConstantNode with the value, or node if the operation fails
+    """
+    try:
+        value, error = operation()
+    except Exception:
+        # e.g. an OverflowError, which is left to happen at run time too
+        return node
+
+    if error or not isinstance(value, (Number, String)):
+        return node
+    return ConstantNode(value, node.pos_start, node.pos_end)
+
+
+def replace(node, operand):
+    # The operand stands in for the whole operation, so an error placed at it (e.g. of an operation it is an
+    # operand of) points at the same source
+    operand.pos_start = node.pos_start
+    operand.pos_end = node.pos_end
+    return operand
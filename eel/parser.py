@@ -2,30 +2,93 @@ from eel.nodes import NumberNode, BinOpNode, UnaryOpNode, VarAccessNode, VarAssi
     FuncDefNode, CallNode, StringNode, ListNode, ReturnNode, ContinueNode, BreakNode, ImportNode, DictNode
 from .tokens import *
 from .errors import *
+from .utils import gc_paused
+
+
+# Binding powers of the binary operators; an operator binds its operands tighter the higher its power
+LOGIC_POWER = 1
+COMP_POWER = 2
+POW_POWER = 5
+
+BINARY_POWERS = {
+    TT_EE: COMP_POWER, TT_NE: COMP_POWER, TT_LT: COMP_POWER, TT_GT: COMP_POWER, TT_LTE: COMP_POWER, TT_GTE: COMP_POWER,
+    TT_PLUS: 3, TT_MINUS: 3,
+    TT_MUL: 4, TT_DIV: 4, TT_MOD: 4,
+    TT_POW: POW_POWER,
+}
+KEYWORD_POWERS = {"AND": LOGIC_POWER, "OR": LOGIC_POWER, "XOR": LOGIC_POWER}
+
+OPERAND_NODES = {TT_INT: NumberNode, TT_FLOAT: NumberNode, TT_STRING: StringNode, TT_IDENTIFIER: VarAccessNode}
+
+# Tokens that can start an expression or a statement, so the parser can decide without trying
+EXPR_START_TYPES = {TT_INT, TT_FLOAT, TT_STRING, TT_IDENTIFIER, TT_PLUS, TT_MINUS, TT_LPAREN, TT_LBRACKET, TT_LCURLY}
+EXPR_START_KEYWORDS = {"VAR", "NOT", "IF", "FOR", "WHILE", "FN"}
+STATEMENT_START_KEYWORDS = EXPR_START_KEYWORDS | {"RETURN", "CONTINUE", "BREAK", "IMPORT"}
+
+
+def starts_expr(tok):
+    return tok.type in EXPR_START_TYPES or (tok.type == TT_KEYWORD and tok.value in EXPR_START_KEYWORDS)
+
+
+def starts_statement(tok):
+    return tok.type in EXPR_START_TYPES or (tok.type == TT_KEYWORD and tok.value in STATEMENT_START_KEYWORDS)
+
+
+def run(rule):
+    """
+    Runs a rule of the Parser to the end.
+
+    The rules are generators, which get the ParseResult of the rules they are made of through `yield from`,
+    except where the grammar can lead back to the same rule: the operands expr() does not parse itself and the
+    rest of an ELIF chain. Those rules are yielded, run here and their ParseResult sent back, so the rules being
+    parsed are kept in a list here and a deeply nested expression or a long ELIF chain takes no deeper a Python
+    stack than a single number.
+
+    :return: The ParseResult of rule
+    """
+    rules = []
+    push = rules.append
+    pop = rules.pop
+    send = rule.send
+    res = None
+
+    while True:
+        try:
+            rule = send(res)
+        except StopIteration as done:
+            if not rules:
+                return done.value
+            send = pop()
+            res = done.value
+        else:
+            push(send)
+            send = rule.send
+            res = None
 
 
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.tok_idx = -1
+        """
+        :param tokens: A list of tokens, or any iterable yielding them lazily (e.g. Lexer.iter_tokens())
+        """
+        # The parser never looks back, so tokens are pulled from the source one at a time and not kept
+        self.token_source = iter(tokens)
+        self.current_tok = None
+
+        # Source offsets of the first token of each top-level statement, and of the token right after it
+        self.statement_starts = []
+        self.statement_ends = []
         self.advance()
 
     def advance(self):
-        self.tok_idx += 1
-        self.update_current_tok()
+        # The EOF token stays current once the source is exhausted
+        self.current_tok = next(self.token_source, self.current_tok)
         return self.current_tok
 
-    def reverse(self, amount=1):
-        self.tok_idx -= amount
-        self.update_current_tok()
-        return self.current_tok
-
-    def update_current_tok(self):
-        if 0 <= self.tok_idx < len(self.tokens):
-            self.current_tok = self.tokens[self.tok_idx]
-
     def parse(self):
-        res = self.statements()
+        with gc_paused():
+            res = run(self.statements(top_level=True))
+
         if not res.error and self.current_tok.type != TT_EOF:
             return res.failure(InvalidSyntaxError(
                 "Token cannot appear after previous token",
@@ -35,7 +98,7 @@ class Parser:
 
     ###########################################################################
 
-    def statements(self):
+    def statements(self, top_level=False):
         res = ParseResult()
         statements = []
         pos_start = self.current_tok.pos_start.copy()
@@ -44,45 +107,31 @@ class Parser:
             res.register_advance()
             self.advance()
 
-        statement = res.register(self.statement())
-        if res.error:
-            return res
-        statements.append(statement)
-
-        more_statements = True
-
         while True:
+            statement_start = self.current_tok.start
+            statement = res.register((yield from self.statement()))
+            if res.error:
+                return res
+            statements.append(statement)
+            if top_level:
+                self.statement_starts.append(statement_start)
+                self.statement_ends.append(self.current_tok.start)
+
             newline_count = 0
             while self.current_tok.type == TT_NEWLINE:
                 res.register_advance()
                 self.advance()
                 newline_count += 1
 
-            if newline_count == 0:
-                more_statements = False
-
-            if not more_statements:
+            # Anything else (e.g. END, ELSE or EOF) belongs to the caller
+            if newline_count == 0 or not starts_statement(self.current_tok):
                 break
 
-            statement = res.try_register(self.statement())
-            if not statement:
-                self.reverse(res.to_reverse_count)
-                more_statements = False
-                continue
-            statements.append(statement)
-
         return res.success(ListNode(
             statements,
             pos_start, self.current_tok.pos_end.copy()
         ))
 
-    # FIXME: For future debugging: see below
-    """
-        - Errors are not being shown
-          This is possibly do to try_register returning None, and an action being done if the result is None
-          Possibly check res.error after try_register like I would after register
-    """
-
     def statement(self):
         res = ParseResult()
         pos_start = self.current_tok.pos_start.copy()
@@ -91,9 +140,11 @@ class Parser:
             res.register_advance()
             self.advance()
 
-            expr = res.try_register(self.expr())
-            if not expr:
-                self.reverse(res.to_reverse_count)
+            expr = None
+            if starts_expr(self.current_tok):
+                expr = res.register((yield from self.expr()))
+                if res.error:
+                    return res
             return res.success(ReturnNode(expr, pos_start, self.current_tok.pos_start.copy()))
 
         if self.current_tok.matches(TT_KEYWORD, "CONTINUE"):
@@ -110,12 +161,14 @@ class Parser:
             res.register_advance()
             self.advance()
 
-            expr = res.try_register(self.expr())
-            if not expr:
-                self.reverse(res.to_reverse_count)
+            expr = None
+            if starts_expr(self.current_tok):
+                expr = res.register((yield from self.expr()))
+                if res.error:
+                    return res
             return res.success(ImportNode(expr, pos_start, self.current_tok.pos_start.copy()))
 
-        expr = res.register(self.expr())
+        expr = res.register((yield from self.expr()))
         if res.error:
             return res.failure(InvalidSyntaxError(
                "Expected 'RETURN', 'IMPORT', 'CONTINUE', 'BREAK', 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
@@ -124,132 +177,198 @@ class Parser:
         return res.success(expr)
 
     def expr(self):
+        """
+        Parses an expression: an operand and the binary operators that follow it, by binding power.
+
+        Operands of unary operators, right operands of binary ones and the values of VARs are parsed here too
+        rather than by another rule, with what still waits for them kept on a stack. Each waiting item is
+        (min_power, tok, left, start) for the operand it waits for: the power of the operators that end that
+        operand, the operator (the name, for a VAR), its left operand (None for the others) and the advance
+        count where the operand started, if a failure to parse any of it is reported as a failure of the
+        operand itself (None if it is not).
+        """
         res = ParseResult()
+        min_power = 0
+        waiting = []
 
-        if self.current_tok.matches(TT_KEYWORD, "VAR"):
-            res.register_advance()
-            self.advance()
-
-            if self.current_tok.type != TT_IDENTIFIER:
-                return res.failure(InvalidSyntaxError(
-                    "Expected Identifier",
-                    self.current_tok.pos_start, self.current_tok.pos_end
-                ))
-
-            var_name = self.current_tok
-            res.register_advance()
-            self.advance()
-
-            if self.current_tok.type != TT_EQ:
-                return res.failure(InvalidSyntaxError(
-                    "Expected '='",
-                    self.current_tok.pos_start, self.current_tok.pos_end
-                ))
-
-            res.register_advance()
-            self.advance()
-            expr = res.register(self.expr())
-            if res.error:
-                return res
-
-            return res.success(VarAssignNode(var_name, expr))
+        while True:
+            tok = self.current_tok
 
-        node = res.register(self.bin_op(self.comp_expr, ((TT_KEYWORD, "AND"), (TT_KEYWORD, "OR"), (TT_KEYWORD, "XOR"))))
-        if res.error:
-            return res.failure(InvalidSyntaxError(
-                "Expected 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
-                self.current_tok.pos_start, self.current_tok.pos_end
-            ))
-        return res.success(node)
+            if tok.type == TT_PLUS or tok.type == TT_MINUS:
+                # Unary +/- binds tighter than everything but '^', so -2 ^ 2 is -(2 ^ 2)
+                res.register_advance()
+                self.advance()
+                waiting.append((min_power, tok, None, None))
+                min_power = POW_POWER
+                continue
 
-    def comp_expr(self):
-        res = ParseResult()
+            if tok.type == TT_KEYWORD:
+                if tok.value == "NOT" and min_power <= COMP_POWER:
+                    res.register_advance()
+                    self.advance()
+                    waiting.append((min_power, tok, None, res.advance_count))
+                    min_power = COMP_POWER
+                    continue
 
-        if self.current_tok.matches(TT_KEYWORD, "NOT"):
-            op_tok = self.current_tok
-            res.register_advance()
-            self.advance()
+                if tok.value == "VAR" and (not waiting or waiting[-1][1].type == TT_IDENTIFIER):
+                    # Only at the start of an expression, which the value of a VAR is too
+                    res.register_advance()
+                    self.advance()
 
-            node = res.register(self.comp_expr())
-            if res.error:
-                return res
-            return res.success(UnaryOpNode(op_tok, node))
+                    if self.current_tok.type != TT_IDENTIFIER:
+                        return res.failure(InvalidSyntaxError(
+                            "Expected Identifier",
+                            self.current_tok.pos_start, self.current_tok.pos_end
+                        ))
 
-        node = res.register(self.bin_op(self.arith_expr, (TT_EE, TT_NE, TT_LT, TT_GT, TT_LTE, TT_GTE)))
+                    var_name = self.current_tok
+                    res.register_advance()
+                    self.advance()
 
-        if res.error:
-            return res.failure(InvalidSyntaxError(
-                "Expected int, float, identifier, '+', '-', 'NOT', '[', or '('",
-                self.current_tok.pos_start, self.current_tok.pos_end
-            ))
+                    if self.current_tok.type != TT_EQ:
+                        return res.failure(InvalidSyntaxError(
+                            "Expected '='",
+                            self.current_tok.pos_start, self.current_tok.pos_end
+                        ))
 
-        return res.success(node)
+                    res.register_advance()
+                    self.advance()
+                    waiting.append((min_power, var_name, None, res.advance_count))
+                    continue
 
-    def arith_expr(self):
-        return self.bin_op(self.term, (TT_PLUS, TT_MINUS))
+            if tok.type in OPERAND_NODES:
+                # The most common operands are built here instead of going through call() and atom()
+                res.register_advance()
+                self.advance()
+                if tok.type == TT_IDENTIFIER and self.current_tok.type == TT_DUBCOL:
+                    left = res.register(self.var_access(tok))
+                else:
+                    left = OPERAND_NODES[tok.type](tok)
 
-    def term(self):
-        return self.bin_op(self.factor, (TT_MUL, TT_DIV, TT_MOD))
+                if not res.error and self.current_tok.type == TT_LPAREN:
+                    left = res.register((yield self.call_args(left)))
 
-    def factor(self):
-        res = ParseResult()
-        tok = self.current_tok
+            else:
+                left = res.register((yield self.call()))
 
-        if tok.type in [TT_PLUS, TT_MINUS]:
-            res.register_advance()
-            self.advance()
-            factor = res.register(self.factor())
             if res.error:
+                for _, tok, _, start in reversed(waiting):
+                    if start == res.advance_count:
+                        res.error = self.operand_error(tok)
+                if res.advance_count == 0:
+                    res.error = self.operand_error(None)
                 return res
-            return res.success(UnaryOpNode(tok, factor))
 
-        return self.power()
+            while True:
+                op_tok = self.current_tok
+                if op_tok.type == TT_KEYWORD:
+                    power = KEYWORD_POWERS.get(op_tok.value)
+                else:
+                    power = BINARY_POWERS.get(op_tok.type)
 
-    def power(self):
-        return self.bin_op(self.call, (TT_POW,), self.factor)
+                if power is not None and power >= min_power:
+                    res.register_advance()
+                    self.advance()
+                    if power == LOGIC_POWER:
+                        waiting.append((min_power, op_tok, left, res.advance_count))
+                        min_power = COMP_POWER
+                    else:
+                        # '^' is right associative
+                        waiting.append((min_power, op_tok, left, None))
+                        min_power = power if power == POW_POWER else power + 1
+                    break
+
+                # The operand is complete, and so is what waits for it
+                if not waiting:
+                    return res.success(left)
+                min_power, tok, operator_left, _ = waiting.pop()
+                if operator_left is not None:
+                    left = BinOpNode(operator_left, tok, left)
+                elif tok.type == TT_IDENTIFIER:
+                    left = VarAssignNode(tok, left)
+                else:
+                    left = UnaryOpNode(tok, left)
+
+    def operand_error(self, tok):
+        """
+        :param tok: What waits for the operand, as in expr(); None for the whole expression
+        :return: The error for an operand nothing of which could be parsed
+        """
+        if tok is None or tok.type == TT_IDENTIFIER:
+            return InvalidSyntaxError(
+                "Expected 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
+                self.current_tok.pos_start, self.current_tok.pos_end
+            )
+        # The operand of NOT, or the right side of AND, OR or XOR
+        return InvalidSyntaxError(
+            "Expected int, float, identifier, '+', '-', 'NOT', '[', or '('",
+            self.current_tok.pos_start, self.current_tok.pos_end
+        )
 
     def call(self):
         res = ParseResult()
-        atom = res.register(self.atom())
+        atom = res.register((yield from self.atom()))
         if res.error:
             return res
 
         if self.current_tok.type == TT_LPAREN:
+            atom = res.register((yield from self.call_args(atom)))
+            if res.error:
+                return res
+        return res.success(atom)
+
+    def call_args(self, node_to_call):
+        res = ParseResult()
+        res.register_advance()
+        self.advance()
+
+        arg_nodes = []
+
+        if self.current_tok.type == TT_RPAREN:
             res.register_advance()
             self.advance()
+        else:
+            arg_nodes.append(res.register((yield from self.expr())))
+            if res.error:
+                return res.failure(InvalidSyntaxError(
+                    "Expected ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
+                    self.current_tok.pos_start, self.current_tok.pos_end
+                ))
 
-            arg_nodes = []
-
-            if self.current_tok.type == TT_RPAREN:
+            while self.current_tok.type == TT_COMMA:
                 res.register_advance()
                 self.advance()
-            else:
-                arg_nodes.append(res.register(self.expr()))
+
+                arg_nodes.append(res.register((yield from self.expr())))
                 if res.error:
-                    return res.failure(InvalidSyntaxError(
-                        "Expected ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
-                        self.current_tok.pos_start, self.current_tok.pos_end
-                    ))
+                    return res
 
-                while self.current_tok.type == TT_COMMA:
-                    res.register_advance()
-                    self.advance()
+            if self.current_tok.type != TT_RPAREN:
+                return res.failure(InvalidSyntaxError(
+                    "Expected ',' or ')'",
+                    self.current_tok.pos_start, self.current_tok.pos_end
+                ))
 
-                    arg_nodes.append(res.register(self.expr()))
-                    if res.error:
-                        return res
+            res.register_advance()
+            self.advance()
 
-                if self.current_tok.type != TT_RPAREN:
-                    return res.failure(InvalidSyntaxError(
-                        "Expected ',' or ')'",
-                        self.current_tok.pos_start, self.current_tok.pos_end
-                    ))
+        return res.success(CallNode(node_to_call, arg_nodes))
 
-                res.register_advance()
+    def var_access(self, tok):
+        # tok is the name just consumed; 'name::member' refers to a member of an imported module
+        res = ParseResult()
+
+        if self.current_tok.type == TT_DUBCOL:
+            res.register_advance()
+            self.advance()
+            if self.current_tok.type == TT_IDENTIFIER:
+                tok.value += "::" + self.current_tok.value
                 self.advance()
 
-            return res.success(CallNode(atom, arg_nodes))
-        return res.success(atom)
+            else:
+                return res.failure(RTError("Expected identifier after '::'", tok.pos_start, self.current_tok.pos_end))
+
+        return res.success(VarAccessNode(tok))
 
     def atom(self):
         res = ParseResult()
@@ -265,26 +384,14 @@ class Parser:
             return res.success(StringNode(tok))
 
         elif tok.type == TT_IDENTIFIER:
-            pos_start = tok.pos_start
             res.register_advance()
             self.advance()
-
-            if self.current_tok.type == TT_DUBCOL:
-                res.register_advance()
-                self.advance()
-                if self.current_tok.type == TT_IDENTIFIER:
-                    tok.value += "::" + self.current_tok.value
-                    self.advance()
-
-                else:
-                    return res.failure(RTError("Expected identifier after '::'", pos_start, self.current_tok.pos_end))
-
-            return res.success(VarAccessNode(tok))
+            return self.var_access(tok)
 
         elif tok.type == TT_LPAREN:
             res.register_advance()
             self.advance()
-            expr = res.register(self.expr())
+            expr = res.register((yield from self.expr()))
             if res.error:
                 return res
             if self.current_tok.type == TT_RPAREN:
@@ -298,39 +405,39 @@ class Parser:
                 ))
 
         elif tok.type == TT_LBRACKET:
-            list_expr = res.register(self.list_expr())
+            list_expr = res.register((yield from self.list_expr()))
             if res.error:
                 return res
 
             return res.success(list_expr)
 
         elif tok.type == TT_LCURLY:
-            dict_expr = res.register(self.dict_expr())
+            dict_expr = res.register((yield from self.dict_expr()))
             if res.error:
                 return res
 
             return res.success(dict_expr)
 
         elif tok.matches(TT_KEYWORD, "IF"):
-            if_expr = res.register(self.if_expr())
+            if_expr = res.register((yield from self.if_expr()))
             if res.error:
                 return res
             return res.success(if_expr)
 
         elif tok.matches(TT_KEYWORD, "FOR"):
-            for_expr = res.register(self.for_expr())
+            for_expr = res.register((yield from self.for_expr()))
             if res.error:
                 return res
             return res.success(for_expr)
 
         elif tok.matches(TT_KEYWORD, "WHILE"):
-            while_expr = res.register(self.while_expr())
+            while_expr = res.register((yield from self.while_expr()))
             if res.error:
                 return res
             return res.success(while_expr)
 
         elif tok.matches(TT_KEYWORD, "FN"):
-            func_def = res.register(self.func_def())
+            func_def = res.register((yield from self.func_def()))
             if res.error:
                 return res
             return res.success(func_def)
@@ -359,7 +466,7 @@ class Parser:
             res.register_advance()
             self.advance()
         else:
-            element_nodes.append(res.register(self.expr()))
+            element_nodes.append(res.register((yield from self.expr())))
             if res.error:
                 return res.failure(InvalidSyntaxError(
                    "Expected ']', 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
@@ -370,7 +477,7 @@ class Parser:
                 res.register_advance()
                 self.advance()
 
-                element_nodes.append(res.register(self.expr()))
+                element_nodes.append(res.register((yield from self.expr())))
                 if res.error:
                     return res
 
@@ -406,14 +513,14 @@ class Parser:
             res.register_advance()
             self.advance()
         else:
-            k = res.register(self.expr())
+            k = res.register((yield from self.expr()))
             # res.register_advance()
             # self.advance()
 
             if self.current_tok.type == TT_COLON:
                 res.register_advance()
                 self.advance()
-                v = res.register(self.expr())
+                v = res.register((yield from self.expr()))
                 if res.error:
                     return res
 
@@ -435,14 +542,14 @@ class Parser:
                 res.register_advance()
                 self.advance()
 
-                k = res.register(self.expr())
+                k = res.register((yield from self.expr()))
                 res.register_advance()
                 self.advance()
 
                 if self.current_tok.type == TT_COLON:
                     res.register_advance()
                     self.advance()
-                    v = res.register(self.expr())
+                    v = res.register((yield from self.expr()))
                     if res.error:
                         return res
 
@@ -470,14 +577,14 @@ class Parser:
 
     def if_expr(self):
         res = ParseResult()
-        all_cases = res.register(self.if_expr_cases("IF"))
+        all_cases = res.register((yield from self.if_expr_cases("IF")))
         if res.error:
             return res
         cases, else_case = all_cases
         return res.success(IfNode(cases, else_case))
 
-    def if_expr_elif(self):
-        return self.if_expr_cases("ELIF")
+    def if_expr_elif(self, cases):
+        return self.if_expr_cases("ELIF", cases)
 
     def if_expr_else(self):
         res = ParseResult()
@@ -491,7 +598,7 @@ class Parser:
                 res.register_advance()
                 self.advance()
 
-                statements = res.register(self.statements())
+                statements = res.register((yield from self.statements()))
                 if res.error:
                     return res
                 else_case = (statements, True)
@@ -507,33 +614,37 @@ class Parser:
                         )
                     )
             else:
-                expr = res.register(self.statement())
+                expr = res.register((yield from self.statement()))
                 if res.error:
                     return res
                 else_case = (expr, False)
 
         return res.success(else_case)
 
-    def if_expr_elif_or_else(self):
+    def if_expr_elif_or_else(self, cases):
+        """
+        :param cases: The cases parsed so far, which any ELIF cases are added to
+        """
         res = ParseResult()
-        cases, else_case = [], None
+        else_case = None
 
         if self.current_tok.matches(TT_KEYWORD, "ELIF"):
-            all_cases = res.register(self.if_expr_elif())
+            # Added to the shared list, so a long ELIF chain is not copied once per link
+            all_cases = res.register((yield self.if_expr_elif(cases)))
             if res.error:
                 return res
-            cases, else_case = all_cases
+            _, else_case = all_cases
 
         else:
-            else_case = res.register(self.if_expr_else())
+            else_case = res.register((yield from self.if_expr_else()))
             if res.error:
                 return res
 
         return res.success((cases, else_case))
 
-    def if_expr_cases(self, case_keyword):
+    def if_expr_cases(self, case_keyword, cases=None):
         res = ParseResult()
-        cases = []
+        cases = [] if cases is None else cases
         else_case = None
 
         if not self.current_tok.matches(TT_KEYWORD, case_keyword):
@@ -545,7 +656,7 @@ class Parser:
         res.register_advance()
         self.advance()
 
-        condition = res.register(self.expr())
+        condition = res.register((yield from self.expr()))
         if res.error:
             return res
 
@@ -562,7 +673,7 @@ class Parser:
             res.register_advance()
             self.advance()
 
-            statements = res.register(self.statements())
+            statements = res.register((yield from self.statements()))
             if res.error:
                 return res
             cases.append((condition, statements, True))
@@ -571,23 +682,21 @@ class Parser:
                 res.register_advance()
                 self.advance()
             else:
-                all_cases = res.register(self.if_expr_elif_or_else())
+                all_cases = res.register((yield from self.if_expr_elif_or_else(cases)))
                 if res.error:
                     return res
-                new_cases, else_case = all_cases
-                cases.extend(new_cases)
+                _, else_case = all_cases
         else:
-            expr = res.register(self.statement())
+            expr = res.register((yield from self.statement()))
             if res.error:
                 return res
             cases.append((condition, expr, False))
 
-            all_cases = res.register(self.if_expr_elif_or_else())
+            all_cases = res.register((yield from self.if_expr_elif_or_else(cases)))
             if res.error:
                 return res
 
-            new_cases, else_case = all_cases
-            cases.extend(new_cases)
+            _, else_case = all_cases
 
         return res.success((cases, else_case))
 
@@ -622,7 +731,7 @@ class Parser:
         res.register_advance()
         self.advance()
 
-        start_value = res.register(self.expr())
+        start_value = res.register((yield from self.expr()))
         if res.error:
             return res
 
@@ -635,7 +744,7 @@ class Parser:
         res.register_advance()
         self.advance()
 
-        end_value = res.register(self.expr())
+        end_value = res.register((yield from self.expr()))
         if res.error:
             return res
 
@@ -643,7 +752,7 @@ class Parser:
             res.register_advance()
             self.advance()
 
-            step_value = res.register(self.expr())
+            step_value = res.register((yield from self.expr()))
             if res.error:
                 return res
         else:
@@ -662,7 +771,7 @@ class Parser:
             res.register_advance()
             self.advance()
 
-            body = res.register(self.statements())
+            body = res.register((yield from self.statements()))
             if res.error:
                 return res
 
@@ -677,7 +786,7 @@ class Parser:
 
             return res.success(ForNode(var_name, start_value, end_value, step_value, body, True))
 
-        body = res.register(self.statement())
+        body = res.register((yield from self.statement()))
         if res.error:
             return res
 
@@ -695,7 +804,7 @@ class Parser:
         res.register_advance()
         self.advance()
 
-        condition = res.register(self.expr())
+        condition = res.register((yield from self.expr()))
         if res.error:
             return res
 
@@ -712,7 +821,7 @@ class Parser:
             res.register_advance()
             self.advance()
 
-            body = res.register(self.statements())
+            body = res.register((yield from self.statements()))
             if res.error:
                 return res
 
@@ -727,7 +836,7 @@ class Parser:
 
             return res.success(WhileNode(condition, body, True))
 
-        body = res.register(self.statement())
+        body = res.register((yield from self.statement()))
         if res.error:
             return res
 
@@ -804,7 +913,7 @@ class Parser:
             res.register_advance()
             self.advance()
 
-            body = res.register(self.expr())
+            body = res.register((yield from self.expr()))
             if res.error:
                 return res
 
@@ -821,7 +930,7 @@ class Parser:
         res.register_advance()
         self.advance()
 
-        body = res.register(self.statements())
+        body = res.register((yield from self.statements()))
         if res.error:
             return res
 
@@ -838,33 +947,12 @@ class Parser:
             var_name_tok, arg_name_toks, body, False
         ))
 
-    def bin_op(self, func_a, ops, func_b=None):
-        if func_b is None:
-            func_b = func_a
-
-        res = ParseResult()
-        left = res.register(func_a())
-        if res.error:
-            return res
-
-        while self.current_tok.type in ops or (self.current_tok.type, self.current_tok.value) in ops:
-            op_tok = self.current_tok
-            res.register_advance()
-            self.advance()
-            right = res.register(func_b())
-            if res.error:
-                return res
-            left = BinOpNode(left, op_tok, right)
-
-        return res.success(left)
-
 
 class ParseResult:
     def __init__(self):
         self.error = None
         self.node = None
         self.advance_count = 0
-        self.to_reverse_count = 0
 
     def register(self, res: "ParseResult"):
         self.advance_count += res.advance_count
@@ -872,12 +960,6 @@ class ParseResult:
             self.error = res.error
         return res.node
 
-    def try_register(self, res):
-        if res.error:
-            self.to_reverse_count = res.advance_count
-            return None
-        return self.register(res)
-
     def register_advance(self):
         self.advance_count += 1
 
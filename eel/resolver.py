@@ -0,0 +1,106 @@
+"""
+Scope resolution, run over a program before the closure engine (see eel.closures) compiles it.
+
+The parameters of each function and the names it assigns (with VAR, FOR or a named FN) are its locals, and are
+given slot indices in a frame, a list made for each call. Names assigned at the top level of a program stay in
+its symbol table, with the builtins and imported `module::member` names, and are looked up by name.
+
+Scoping stays dynamic, as under the other engines: a function sees its own names, then those of the function (or
+program) that called it, and no others. A name that is not a local of the running function, or a local that has
+not been assigned yet, is looked up among the names of its caller at run time (see
+FunctionContext.get_from_caller). A name that is bound nowhere is only an error once it is read, as a script run
+with RUN or IMPORT can define it while the program runs.
+"""
+from .arena import children
+from .nodes import ForNode, FuncDefNode, VarAccessNode, VarAssignNode
+
+
+class Resolution:
+    def __init__(self):
+        # Per id of a VarAccessNode: the slot of its name in the frame of the function it is in, None if the name
+        # is not one of the function's locals or the access is at the top level
+        self.accesses = {}
+        # Per id of a VarAssignNode, ForNode or named FuncDefNode: the slot of the name it binds, None at the top
+        # level of the program
+        self.stores = {}
+        # Per id of a FuncDefNode: (number of slots, slot of each parameter, slot of each local by name)
+        self.functions = {}
+
+
+class Scope:
+    def __init__(self):
+        self.slots = {}
+
+    def declare(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.slots)
+        return slot
+
+
+def resolve(node):
+    """
+    :return: The Resolution of the program
+    """
+    resolver = Resolver()
+    resolver.resolve(node, None)
+    return resolver.resolution
+
+
+class Resolver:
+    def __init__(self):
+        self.resolution = Resolution()
+
+    def resolve(self, node, scope):
+        """
+        :param scope: The Scope of the function node is in, None at the top level
+        """
+        stack = [node]
+        while stack:
+            node = stack.pop()
+
+            if isinstance(node, VarAccessNode):
+                self.resolution.accesses[id(node)] = scope.slots.get(node.var_name_tok.value) if scope else None
+                continue
+
+            if isinstance(node, (VarAssignNode, ForNode)) or (isinstance(node, FuncDefNode) and node.var_name_tok):
+                self.resolution.stores[id(node)] = (
+                    scope.declare(binding_name(node)) if scope else None
+                )
+
+            if isinstance(node, FuncDefNode):
+                self.resolve_function(node)
+                continue
+
+            stack.extend(reversed(list(children(node))))
+
+    def resolve_function(self, node):
+        scope = Scope()
+        param_slots = [scope.declare(tok.value) for tok in node.arg_name_toks]
+        for name_node in bindings(node.body_node):
+            scope.declare(binding_name(name_node))
+
+        self.resolve(node.body_node, scope)
+        self.resolution.functions[id(node)] = (len(scope.slots), param_slots, scope.slots)
+
+
+def bindings(node):
+    """
+    :return: The nodes under node that bind a name in its scope, outside of nested function bodies
+    """
+    found = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, FuncDefNode):
+            if node.var_name_tok:
+                found.append(node)
+            continue
+        if isinstance(node, (VarAssignNode, ForNode)):
+            found.append(node)
+        stack.extend(children(node))
+    return found
+
+
+def binding_name(node):
+    return node.var_name_tok.value
@@ -0,0 +1,94 @@
+from bisect import bisect_right
+
+
+class Source:
+    def __init__(self, fn, text="", first_line=0):
+        """
+        :param first_line: Line number of the text's first line, for sources holding part of a file
+        """
+        self.fn = fn
+        self.first_line = first_line
+        self.chunks = [text] if text else []
+        self._text = text
+
+        # Offsets at which each line starts, extended lazily up to `_indexed` characters of the text
+        self._line_starts = [0]
+        self._indexed = 0
+
+    @property
+    def text(self):
+        # Chunks are only joined when the full text is needed, e.g. to render an error
+        if self._text is None:
+            self._text = "".join(self.chunks)
+            self.chunks = [self._text]
+        return self._text
+
+    @property
+    def line_starts(self):
+        line_starts = self._line_starts
+        if self._text is not None and self._indexed == len(self._text):
+            return line_starts
+
+        text = self.text
+        find = text.find
+
+        idx = find("\n", self._indexed)
+        while idx != -1:
+            line_starts.append(idx + 1)
+            idx = find("\n", idx + 1)
+
+        self._indexed = len(text)
+        return line_starts
+
+    def __getstate__(self):
+        # Pickled as just its text; the line index is rebuilt when needed
+        return {"fn": self.fn, "text": self.text, "first_line": self.first_line}
+
+    def __setstate__(self, state):
+        self.__init__(state["fn"], state["text"], state["first_line"])
+
+    def append(self, chunk):
+        self.chunks.append(chunk)
+        self._text = None
+
+    def line_of(self, idx):
+        return self.first_line + bisect_right(self.line_starts, idx) - 1
+
+    def line_start(self, ln):
+        return self.line_starts[ln - self.first_line]
+
+
+class Position:
+    """
+    An offset into a Source. Line and column are derived from the source's line index when asked for.
+    End positions are exclusive and belong to the line of the character before them.
+    """
+    __slots__ = ("idx", "source", "is_end")
+
+    def __init__(self, idx, source, is_end=False):
+        self.idx = idx
+        self.source = source
+        self.is_end = is_end
+
+    @property
+    def ln(self):
+        return self.source.line_of(self.idx - 1 if self.is_end else self.idx)
+
+    @property
+    def col(self):
+        return self.idx - self.source.line_start(self.ln)
+
+    @property
+    def fn(self):
+        return self.source.fn
+
+    @property
+    def ftxt(self):
+        return self.source.text
+
+    def copy(self):
+        # Positions are never mutated, so they can be shared
+        return self
+
+    def __reduce__(self):
+        return Position, (self.idx, self.source, self.is_end)
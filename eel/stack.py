@@ -0,0 +1,451 @@
+"""
+Explicit-stack evaluation, an engine that walks the tree without recursing in Python.
+
+The work still to be done is kept in a list of tasks, each a (step, node, context, frame) tuple, and the values
+of the nodes evaluated so far in a second list, as on the stack of eel.vm. A node is evaluated by pushing the
+step that combines its children's values and then its children, so a node nested however deep is reached by
+one more turn of the same loop, not by one more Python call. Calls of functions defined here push their body
+too, so even deep EEL recursion only grows the two lists.
+
+Each loop and call has a frame record, kept in the task that ends it. RETURN, BREAK and CONTINUE drop tasks
+down to the nearest task ending a call (RETURN) or a loop body (BREAK and CONTINUE), and the values down to
+the size the record saved. Values, contexts and errors are the ones the DirectInterpreter makes, and the
+recursion limit (see Context.recursion_limit) holds here too. Python's own recursion limit is not raised while
+this engine runs (see eel.main.execute), as it does not need it.
+"""
+import operator
+
+from eel.base import BreakSignal, ContinueSignal, ReturnSignal, RTException, RTResult, unwrap
+from eel.errors import RTError
+from eel.interpreter import Interpreter, binary_op_error, unary_op_error
+from eel.module_utils import EelVariable
+from eel.nodes import (
+    NODE_TYPES, NUMBER, STRING, LIST, DICT, BIN_OP, UNARY_OP, VAR_ASSIGN, VAR_ACCESS, IF, FOR, WHILE, FUNC_DEF,
+    CALL, RETURN, IMPORT, CONTINUE, BREAK, CONSTANT
+)
+from eel.optimizer import KEYWORD_OPERATIONS, OPERATIONS
+from eel.tokens import *
+from eel.values import Dictionary, Function, List, Null, Number, String
+
+# Steps of a task. A node's kind (see eel.nodes) is the step that evaluates it; the others come after them and
+# work on the values its children left.
+(
+    BUILD_LIST, BUILD_DICT, BINARY, UNARY, STORE, IF_TEST, MAKE_NULL, FOR_PREP, FOR_NEXT, FOR_BODY, WHILE_TEST,
+    WHILE_BODY, CALL_ARGS, CALL_END, RETURN_VALUE, IMPORT_VALUE
+) = range(len(NODE_TYPES), len(NODE_TYPES) + 16)
+
+# Tasks RETURN, BREAK and CONTINUE stop at
+CALL_ENDS = frozenset((CALL_END,))
+LOOP_BODIES = frozenset((FOR_BODY, WHILE_BODY))
+
+
+class CallFrame:
+    __slots__ = ("function", "context", "height")
+
+    def __init__(self, function, context, height):
+        """
+        :param height: Size of the value stack when the call started
+        """
+        self.function = function
+        self.context = context
+        self.height = height
+
+
+class LoopFrame:
+    __slots__ = ("elements", "height", "i", "end", "step", "condition")
+
+    def __init__(self, elements, height):
+        """
+        :param elements: The list of the values of the body, None if the loop's value is null
+        :param height: Size of the value stack when the loop started
+        """
+        self.elements = elements
+        self.height = height
+
+
+def execute(node, context):
+    """
+    :return: (value, error) of a program, as from the Interpreter
+    """
+    try:
+        return run([(node.kind, node, context, None)], []), None
+    except RTException as e:
+        return None, e.error
+    except (ReturnSignal, BreakSignal, ContinueSignal):
+        # Left over at the top level, where the Interpreter also drops them
+        return None, None
+
+
+class StackFunction(Function):
+    def call(self, args, context, pos_start, pos_end):
+        """
+        :return: The return value; errors are raised
+        """
+        tasks = []
+        enter(self, args, context, pos_start, pos_end, tasks, 0)
+        return run(tasks, [])
+
+    def execute(self, args, context, pos_start, pos_end, arg_spans=None):
+        res = RTResult()
+        try:
+            return res.success(self.call(args, context, pos_start, pos_end))
+        except RTException as e:
+            return res.failure(e.error)
+        except ContinueSignal:
+            return res.success_continue()
+        except BreakSignal:
+            return res.success_break()
+
+    def copy(self):
+        return StackFunction(self.name, self.body_node, self.arg_names, self.should_auto_return)
+
+
+def enter(function, args, context, pos_start, pos_end, tasks, height):
+    """
+    Starts a call of function from context at pos_start to pos_end, pushing the tasks that run its body and end it.
+
+    :param height: Size of the value stack when the call starts
+    """
+    exec_ctx = function.generate_new_context(context, pos_start)
+    if exec_ctx.depth > exec_ctx.recursion_limit:
+        raise RTException(function.check_depth(exec_ctx, pos_end))
+    if len(args) != len(function.arg_names):
+        raise RTException(function.check_args(function.arg_names, args, context, pos_start, pos_end).error)
+    function.populate_args(function.arg_names, args, exec_ctx)
+
+    tasks.append((CALL_END, None, None, CallFrame(function, exec_ctx, height)))
+    tasks.append((function.body_node.kind, function.body_node, exec_ctx, None))
+
+
+def loop_value(frame):
+    if frame.elements is None:
+        return Null()
+    return List(frame.elements)
+
+
+def unwind(tasks, stops):
+    """
+    Drops tasks down to the nearest one whose step is in stops.
+
+    :return: That task, also dropped, or None if there is none
+    """
+    while tasks:
+        task = tasks.pop()
+        if task[0] in stops:
+            return task
+    return None
+
+
+def run(tasks, values):
+    """
+    Runs tasks until there are none left.
+
+    :return: The value on top of values then; errors are raised, and RETURN, BREAK and CONTINUE that no task
+    catches are raised as signals
+    """
+    push = values.append
+    pop = values.pop
+    push_task = tasks.append
+    pop_task = tasks.pop
+
+    while tasks:
+        step, node, context, frame = pop_task()
+
+        try:
+            if step == VAR_ACCESS:
+                var_name = node.var_name_tok.value
+                value = context.symbol_table.get(var_name)
+                if not value:
+                    raise RTException(RTError(f"'{var_name}' is not defined", node.pos_start, node.pos_end, context))
+
+                if isinstance(value, EelVariable):
+                    value = value()
+                push(value)
+
+            elif step == NUMBER:
+                push(Number(node.tok.value))
+
+            elif step == CONSTANT:
+                push(node.value)
+
+            elif step == BIN_OP:
+                push_task((BINARY, node, context, None))
+                push_task((node.right_node.kind, node.right_node, context, None))
+                push_task((node.left_node.kind, node.left_node, context, None))
+
+            elif step == BINARY:
+                right = pop()
+                left = pop()
+                op_tok = node.op_tok
+                method = KEYWORD_OPERATIONS[op_tok.value] if op_tok.type == TT_KEYWORD else OPERATIONS[op_tok.type]
+                result, error = getattr(left, method)(right)
+                if error:
+                    raise RTException(binary_op_error(node, error, context))
+                push(result)
+
+            elif step == CALL:
+                push_task((CALL_ARGS, node, context, None))
+                for arg_node in reversed(node.arg_nodes):
+                    push_task((arg_node.kind, arg_node, context, None))
+                push_task((node.node_to_call.kind, node.node_to_call, context, None))
+
+            elif step == CALL_ARGS:
+                arg_count = len(node.arg_nodes)
+                if arg_count:
+                    args = values[-arg_count:]
+                    del values[-arg_count:]
+                else:
+                    args = []
+                value_to_call = pop()
+
+                if value_to_call.__class__ is not StackFunction:
+                    push(unwrap(value_to_call.execute(args, context, node.pos_start, node.pos_end, node.arg_spans)))
+
+                elif node.is_tail:
+                    # The value of the call is the one the call it is in returns, so it takes that call's place
+                    task = unwind(tasks, CALL_ENDS)
+                    call_frame = task[3]
+                    del values[call_frame.height:]
+
+                    if len(args) != len(value_to_call.arg_names):
+                        raise RTException(value_to_call.check_args(
+                            value_to_call.arg_names, args, context, node.pos_start, node.pos_end
+                        ).error)
+                    exec_ctx = value_to_call.generate_tail_context(call_frame.context, context)
+                    value_to_call.populate_args(value_to_call.arg_names, args, exec_ctx)
+
+                    call_frame.function = value_to_call
+                    call_frame.context = exec_ctx
+                    push_task(task)
+                    push_task((value_to_call.body_node.kind, value_to_call.body_node, exec_ctx, None))
+
+                else:
+                    enter(value_to_call, args, context, node.pos_start, node.pos_end, tasks, len(values))
+
+            elif step == CALL_END:
+                value = pop()
+                push((value if frame.function.should_auto_return else None) or Null())
+
+            elif step == LIST:
+                push_task((BUILD_LIST, node, context, None))
+                for element_node in reversed(node.element_nodes):
+                    push_task((element_node.kind, element_node, context, None))
+
+            elif step == BUILD_LIST:
+                count = len(node.element_nodes)
+                if node.is_discarded:
+                    # A block whose value is not used, see eel.optimizer
+                    if count:
+                        del values[-count:]
+                    push(Null())
+                    continue
+                if count:
+                    elements = values[-count:]
+                    del values[-count:]
+                else:
+                    elements = []
+                push(List(elements))
+
+            elif step == IF:
+                condition = node.cases[0][0]
+                push_task((IF_TEST, node, context, 0))
+                push_task((condition.kind, condition, context, None))
+
+            elif step == IF_TEST:
+                # frame is the index of the case whose condition was just evaluated
+                if pop().is_true():
+                    _, expr, should_return_null = node.cases[frame]
+                elif frame + 1 < len(node.cases):
+                    condition = node.cases[frame + 1][0]
+                    push_task((IF_TEST, node, context, frame + 1))
+                    push_task((condition.kind, condition, context, None))
+                    continue
+                elif node.else_case:
+                    expr, should_return_null = node.else_case
+                else:
+                    push(Null())
+                    continue
+
+                if should_return_null:
+                    push_task((MAKE_NULL, node, context, None))
+                push_task((expr.kind, expr, context, None))
+
+            elif step == MAKE_NULL:
+                values[-1] = Null()
+
+            elif step == VAR_ASSIGN:
+                push_task((STORE, node, context, None))
+                push_task((node.value_node.kind, node.value_node, context, None))
+
+            elif step == STORE:
+                context.symbol_table.set(node.var_name_tok.value, values[-1])
+
+            elif step == UNARY_OP:
+                push_task((UNARY, node, context, None))
+                push_task((node.node.kind, node.node, context, None))
+
+            elif step == UNARY:
+                value = pop()
+                number, error = value, None
+
+                if node.op_tok.type == TT_MINUS:
+                    number, error = value.multiplied_by(Number(-1))
+                elif node.op_tok.matches(TT_KEYWORD, "NOT"):
+                    number, error = value.notted()
+
+                if error:
+                    raise RTException(unary_op_error(node, error, context))
+                push(number)
+
+            elif step == STRING:
+                push(String(node.tok.value))
+
+            elif step == FOR:
+                push_task((FOR_PREP, node, context, None))
+                if node.step_value_node:
+                    push_task((node.step_value_node.kind, node.step_value_node, context, None))
+                push_task((node.end_value_node.kind, node.end_value_node, context, None))
+                push_task((node.start_value_node.kind, node.start_value_node, context, None))
+
+            elif step == FOR_PREP:
+                step_value = pop() if node.step_value_node else Number(1)
+                end_value = pop()
+                start_value = pop()
+
+                loop = LoopFrame(None if node.should_return_null or node.is_discarded else [], len(values))
+                loop.i = start_value.value
+                loop.end = end_value.value
+                loop.step = step_value.value
+                if loop.step > 0:
+                    loop.condition = operator.lt
+                elif loop.step < 0:
+                    loop.condition = operator.gt
+                else:
+                    loop.condition = never
+                push_task((FOR_NEXT, node, context, loop))
+
+            elif step == FOR_NEXT:
+                if not frame.condition(frame.i, frame.end):
+                    push(loop_value(frame))
+                    continue
+
+                context.symbol_table.set(node.var_name_tok.value, Number(frame.i))
+                frame.i += frame.step
+                push_task((FOR_BODY, node, context, frame))
+                push_task((node.body_node.kind, node.body_node, context, None))
+
+            elif step == FOR_BODY:
+                value = pop()
+                if frame.elements is not None:
+                    frame.elements.append(value)
+                push_task((FOR_NEXT, node, context, frame))
+
+            elif step == WHILE:
+                loop = LoopFrame(None if node.should_return_null or node.is_discarded else [], len(values))
+                push_task((WHILE_TEST, node, context, loop))
+                push_task((node.condition_node.kind, node.condition_node, context, None))
+
+            elif step == WHILE_TEST:
+                if not pop().is_true():
+                    push(loop_value(frame))
+                    continue
+
+                push_task((WHILE_BODY, node, context, frame))
+                push_task((node.body_node.kind, node.body_node, context, None))
+
+            elif step == WHILE_BODY:
+                value = pop()
+                if frame.elements is not None:
+                    frame.elements.append(value)
+                push_task((WHILE_TEST, node, context, frame))
+                push_task((node.condition_node.kind, node.condition_node, context, None))
+
+            elif step == FUNC_DEF:
+                func_name = node.var_name_tok.value if node.var_name_tok else None
+                arg_names = [arg_name.value for arg_name in node.arg_name_toks]
+                func_value = StackFunction(
+                    func_name, node.body_node, arg_names, node.should_auto_return
+                )
+
+                if node.var_name_tok:
+                    context.symbol_table.set(func_name, func_value)
+                push(func_value)
+
+            elif step == RETURN:
+                if node.node_to_return:
+                    push_task((RETURN_VALUE, node, context, None))
+                    push_task((node.node_to_return.kind, node.node_to_return, context, None))
+                else:
+                    raise ReturnSignal(Null())
+
+            elif step == RETURN_VALUE:
+                raise ReturnSignal(pop())
+
+            elif step == BREAK:
+                raise BreakSignal()
+
+            elif step == CONTINUE:
+                raise ContinueSignal()
+
+            elif step == DICT:
+                push_task((BUILD_DICT, node, context, None))
+                for k, v in reversed(node.items.items()):
+                    push_task((v.kind, v, context, None))
+                    push_task((k.kind, k, context, None))
+
+            elif step == BUILD_DICT:
+                items = {}
+                count = 2 * len(node.items)
+                if count:
+                    pairs = values[-count:]
+                    del values[-count:]
+                    for idx in range(0, count, 2):
+                        items[pairs[idx]] = pairs[idx + 1]
+                push(Dictionary(items))
+
+            elif step == IMPORT:
+                push_task((IMPORT_VALUE, node, context, None))
+                if node.fn_node:
+                    push_task((node.fn_node.kind, node.fn_node, context, None))
+                else:
+                    push(Null())
+
+            elif step == IMPORT_VALUE:
+                push(unwrap(Interpreter().import_value(pop(), node.pos_start, node.pos_end, context, "stack")))
+
+            else:
+                raise ValueError(f"Unknown step {step} for {node!r}")
+
+        # Raised by the steps above, or by a function of another engine called from here
+        except ReturnSignal as signal:
+            task = unwind(tasks, CALL_ENDS)
+            if task is None:
+                raise
+            del values[task[3].height:]
+            push(signal.value or Null())
+
+        except BreakSignal:
+            task = unwind(tasks, LOOP_BODIES)
+            if task is None:
+                raise
+            _, node, context, frame = task
+            del values[frame.height:]
+            push(loop_value(frame))
+
+        except ContinueSignal:
+            task = unwind(tasks, LOOP_BODIES)
+            if task is None:
+                raise
+            _, node, context, frame = task
+            del values[frame.height:]
+            if task[0] == FOR_BODY:
+                push_task((FOR_NEXT, node, context, frame))
+            else:
+                push_task((WHILE_TEST, node, context, frame))
+                push_task((node.condition_node.kind, node.condition_node, context, None))
+
+    return values[-1]
+
+
+def never(i, end):
+    return False
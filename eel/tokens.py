@@ -1,3 +1,5 @@
+from .source import Position
+
 TT_INT          = "TT_INT"
 TT_FLOAT        = "FLOAT"
 TT_STRING       = "STRING"
@@ -59,24 +61,32 @@ KEYWORDS = [
 
 
 class Token:
-    def __init__(self, type_, value=None, pos_start=None, pos_end=None):
+    __slots__ = ("type", "value", "start", "end", "source")
+
+    def __init__(self, type_, value, start, end, source):
         self.type = type_
         self.value = value
 
-        self.pos_start = None
-        self.pos_end = None
+        # Offsets into source; Positions are only made when a node or an error asks for them
+        self.start = start
+        self.end = end
+        self.source = source
 
-        if pos_start:
-            self.pos_start = pos_start.copy()
-            self.pos_end = pos_start.copy()
-            self.pos_end.advance()
+    @property
+    def pos_start(self):
+        return Position(self.start, self.source)
 
-        if pos_end:
-            self.pos_end = pos_end.copy()
+    @property
+    def pos_end(self):
+        return Position(self.end, self.source, True)
 
     def matches(self, type_, value):
         return self.type == type_ and self.value == value
 
+    def __reduce__(self):
+        # Pickled as constructor arguments, which is smaller and faster to load than the default slot state
+        return Token, (self.type, self.value, self.start, self.end, self.source)
+
     def __repr__(self):
         if self.value:
             return f'{self.type}:{self.value}'
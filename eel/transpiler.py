@@ -0,0 +1,759 @@
+"""
+Python backend: translates an AST into Python source, which CPython compiles and runs.
+
+Each EEL function becomes a Python function of its context, and the program one more. Operations on Numbers are
+written out inline (e.g. `a.value + b.value`), so CPython's own bytecode does the arithmetic and comparisons;
+everything else goes through the runtime helpers below, which keep EEL's semantics (String + Number,
+`^` indexing lists, errors) by calling the same value methods as the Interpreter. Variables stay in the
+context's symbol table. Loops become Python loops, BREAK and CONTINUE Python's own statements, and RETURN a
+Python return.
+
+Each line of the generated source is mapped back to the EEL line it came from. Runtime errors carry the positions
+of EEL nodes as under the Interpreter, and a Python exception escaping generated code is given a note pointing
+at the EEL line it was raised on.
+
+Programs that are too deep to translate, or that CPython cannot compile (e.g. with loops nested too deeply), run on
+the closure engine (see eel.closures) instead.
+"""
+import importlib.util
+import linecache
+import marshal
+import math
+import zlib
+
+from eel import closures
+from eel.arena import children
+from eel.base import BreakSignal, ContinueSignal, ReturnSignal, RTException, RTResult, TailCall
+from eel.bytecode import NO_SPAN, decode_spans, encode_spans
+from eel.closures import NUMBER_TYPES, boolean, load, new, number, unwrap
+from eel.interpreter import Interpreter
+from eel.nodes import (
+    BreakNode, CallNode, ContinueNode, ForNode, FuncDefNode, IfNode, ImportNode, ListNode, ReturnNode, WhileNode
+)
+from eel.optimizer import KEYWORD_OPERATIONS, OPERATIONS
+from eel.tokens import *
+from eel.values import Dictionary, Function, List, Null, Number, String, operation_error
+
+# Python operator and result maker of each operation on two Numbers
+PYTHON_OPERATORS = {
+    TT_PLUS: ("+", "number"),
+    TT_MINUS: ("-", "number"),
+    TT_MUL: ("*", "number"),
+    TT_DIV: ("/", "number"),
+    TT_MOD: ("%", "number"),
+    TT_POW: ("**", "number"),
+    TT_EE: ("==", "boolean"),
+    TT_NE: ("!=", "boolean"),
+    TT_LT: ("<", "boolean"),
+    TT_GT: (">", "boolean"),
+    TT_LTE: ("<=", "boolean"),
+    TT_GTE: (">=", "boolean"),
+    "AND": ("and", "boolean"),
+    "OR": ("or", "boolean"),
+    "XOR": (None, "boolean"),
+}
+
+# Nodes that are written as statements, so an expression containing one is split up
+STATEMENT_TYPES = (IfNode, ForNode, WhileNode, ReturnNode, BreakNode, ContinueNode)
+
+# Expressions are split up every this many levels of nesting, as CPython's parser limits how deep they go
+MAX_EXPR_DEPTH = 32
+
+
+def run(node, context):
+    """
+    :return: (value, error), as from the Interpreter
+    """
+    module = transpile(node)
+    if module is None:
+        return closures.run(node, context)
+    return module.run(context)
+
+
+def transpile(node):
+    """
+    :return: A Module, compiled and ready to run, or None if the program cannot be translated
+    """
+    try:
+        return Transpiler().transpile(node)
+    except (SyntaxError, RecursionError, MemoryError):
+        return None
+
+
+class Module:
+    def __init__(self, code, filename, line_positions, spans, consts):
+        """
+        :param code: The compiled Python source
+        :param line_positions: The EEL position each line of source came from, None for lines of no node
+        :param spans: (pos_start, pos_end) of the nodes, which the source refers to as sN and eN
+        :param consts: Values the source refers to as cN
+        """
+        self.code = code
+        self.filename = filename
+        self.line_positions = line_positions
+        self.spans = spans
+        self.consts = consts
+        self.load()
+
+    def load(self):
+        namespace = dict(RUNTIME)
+        for idx, (pos_start, pos_end) in enumerate(self.spans):
+            namespace[f"s{idx}"] = pos_start
+            namespace[f"e{idx}"] = pos_end
+        for idx, value in enumerate(self.consts):
+            namespace[f"c{idx}"] = value
+        exec(self.code, namespace)
+        self.program = namespace["_program"]
+
+    def __getstate__(self):
+        # Positions are stored as ints, as in Code (see eel.bytecode)
+        spans, sources = encode_spans(self.spans + [(pos, pos) if pos else NO_SPAN for pos in self.line_positions])
+        # Code objects only load on the Python version that made them, and compress well
+        code = zlib.compress(marshal.dumps(self.code), 1)
+        return importlib.util.MAGIC_NUMBER, code, self.filename, spans, sources, len(self.spans), self.consts
+
+    def __setstate__(self, state):
+        magic, code, self.filename, spans, sources, span_count, self.consts = state
+        if magic != importlib.util.MAGIC_NUMBER:
+            raise ValueError("Module was compiled by another version of Python")
+
+        self.code = marshal.loads(zlib.decompress(code))
+        spans = decode_spans(spans, sources)
+        self.spans = spans[:span_count]
+        self.line_positions = [pos_start for pos_start, _ in spans[span_count:]]
+        self.load()
+
+    def run(self, context):
+        try:
+            return self.program(context), None
+        except RTException as e:
+            return None, e.error
+        except (ReturnSignal, BreakSignal, ContinueSignal):
+            # Left over at the top level, where the Interpreter also drops them
+            return None, None
+        except Exception as e:
+            pos = self.eel_position(e.__traceback__)
+            if pos is not None and hasattr(e, "add_note"):
+                e.add_note(f"  (EEL) File {pos.fn}, line {pos.ln + 1}")
+            raise
+
+    def eel_position(self, tb):
+        """
+        :return: The EEL position of the innermost generated line in a traceback, or None
+        """
+        pos = None
+        while tb is not None:
+            if tb.tb_frame.f_code.co_filename == self.filename:
+                pos = self.line_positions[tb.tb_lineno - 1] or pos
+            tb = tb.tb_next
+        return pos
+
+
+class PythonFunction(Function):
+    def __init__(self, name, arg_names, should_auto_return, body):
+        """
+        :param body: The generated Python function, of the call's context
+        """
+        super().__init__(name, None, arg_names, should_auto_return)
+        self.body = body
+
+    def call(self, args, context, pos_start, pos_end):
+        """
+        :return: The return value; errors are raised
+        """
+        function = self
+        exec_ctx = self.generate_new_context(context, pos_start)
+        error = self.check_depth(exec_ctx, pos_end)
+        if error:
+            raise RTException(error)
+
+        # Tail calls the body returns (see tail_call) are made here, in place of this call
+        while True:
+            if len(args) != len(function.arg_names):
+                raise RTException(function.check_args(function.arg_names, args, context, pos_start, pos_end).error)
+            function.populate_args(function.arg_names, args, exec_ctx)
+
+            try:
+                return_value = function.body(exec_ctx) or Null()
+            except ReturnSignal as signal:
+                return_value = signal.value or Null()
+
+            if return_value.__class__ is not TailCall:
+                return return_value
+            function, args = return_value.function, return_value.args
+            context, pos_start, pos_end = return_value.context, return_value.pos_start, return_value.pos_end
+            exec_ctx = function.generate_tail_context(exec_ctx, context)
+
+    def execute(self, args, context, pos_start, pos_end, arg_spans=None):
+        res = RTResult()
+        try:
+            return res.success(self.call(args, context, pos_start, pos_end))
+        except RTException as e:
+            return res.failure(e.error)
+        except ContinueSignal:
+            return res.success_continue()
+        except BreakSignal:
+            return res.success_break()
+
+    def copy(self):
+        # A copy has exactly the same attributes
+        copy = new(PythonFunction)
+        copy.__dict__.update(self.__dict__)
+        return copy
+
+
+# region Runtime helpers, called by the generated code
+
+def binary_op(left, right, method, context, left_span, right_span):
+    """
+    :param left_span: (pos_start, pos_end) of the left operand, for errors, and right_span of the right one
+    """
+    result, error = getattr(left, method)(right)
+    if error:
+        raise RTException(operation_error(error, context, left_span, right_span))
+    return result
+
+
+def negated(value, context, operand_span):
+    result, error = value.multiplied_by(Number(-1))
+    if error:
+        # The operand also stands in for the -1, as in eel.interpreter.unary_op_error
+        raise RTException(operation_error(error, context, operand_span, operand_span))
+    return result
+
+
+def notted(value, context, operand_span):
+    result, error = value.notted()
+    if error:
+        raise RTException(operation_error(error, context, operand_span, operand_span))
+    return result
+
+
+def call(value_to_call, args, context, pos_start, pos_end, arg_spans):
+    """
+    :param arg_spans: (pos_start, pos_end) of each arg, for errors of natives (see CallNode.arg_spans)
+    """
+    if value_to_call.__class__ is PythonFunction:
+        return value_to_call.call(args, context, pos_start, pos_end)
+    return unwrap(value_to_call.execute(args, context, pos_start, pos_end, arg_spans))
+
+
+def tail_call(value_to_call, args, context, pos_start, pos_end, arg_spans):
+    """
+    call, for a call in tail position (see CallNode.is_tail), which PythonFunction.call makes if it is of a
+    PythonFunction
+    """
+    if value_to_call.__class__ is PythonFunction:
+        return TailCall(value_to_call, args, context, pos_start, pos_end)
+    return call(value_to_call, args, context, pos_start, pos_end, arg_spans)
+
+
+def import_(value, context, pos_start, pos_end):
+    return unwrap(Interpreter().import_value(value, pos_start, pos_end, context, "python"))
+
+
+RUNTIME = {
+    "number": number, "boolean": boolean, "load": load, "binary_op": binary_op, "negated": negated,
+    "notted": notted, "call": call, "tail_call": tail_call, "import_": import_, "PythonFunction": PythonFunction, "NT": NUMBER_TYPES,
+    "Number": Number, "String": String, "List": List, "Dictionary": Dictionary, "Null": Null,
+    "BreakSignal": BreakSignal, "ContinueSignal": ContinueSignal,
+}
+
+# endregion
+
+
+class Transpiler:
+    def __init__(self):
+        self.spans = []
+        self.span_names = {}
+        self.consts = []
+        self.functions = []
+        self.function_count = 0
+
+        # Of the function being written
+        self.lines = []
+        self.indent = 1
+        self.temp_count = 0
+        self.loop_depth = 0
+        self.is_function = False
+        self.pos = None
+
+        # Per node id: (contains a statement, expression height)
+        self.shapes = {}
+
+    def transpile(self, node):
+        """
+        :return: A Module, compiled and ready to run
+        """
+        source, line_positions = self.generate(node)
+        filename = f"<eel {node.pos_start.fn}>"
+        # Lets tracebacks through the generated code show its lines
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        return Module(compile(source, filename, "exec"), filename, line_positions, self.spans, self.consts)
+
+    def generate(self, node):
+        """
+        :return: (Python source of the program, EEL position of each of its lines)
+        """
+        self.write_function("_program", node, False, False)
+
+        lines, line_positions = [], []
+        for function_lines in self.functions:
+            for line, pos in function_lines:
+                lines.append(line)
+                line_positions.append(pos)
+            lines.append("")
+            line_positions.append(None)
+        return "\n".join(lines), line_positions
+
+    def write_function(self, name, body_node, is_function, should_auto_return):
+        state = self.lines, self.indent, self.temp_count, self.loop_depth, self.is_function, self.pos
+        self.lines, self.indent, self.temp_count, self.loop_depth, self.is_function = [], 1, 0, 0, is_function
+        self.pos = body_node.pos_start
+
+        self.emit("table = ctx.symbol_table")
+        self.emit("symbols = table.symbols")
+        self.emit("get = table.get")
+        if should_auto_return:
+            self.emit(f"return {self.expr(body_node)}")
+        elif is_function:
+            self.stmt(body_node)
+            self.emit("return None")
+        else:
+            # The program's value is the List of its statements' values
+            self.emit(f"return {self.expr(body_node)}")
+
+        self.indent = 0
+        self.lines.insert(0, (f"def {name}(ctx):", body_node.pos_start))
+        self.functions.append(self.lines)
+        self.lines, self.indent, self.temp_count, self.loop_depth, self.is_function, self.pos = state
+
+    def emit(self, line):
+        self.lines.append(("    " * self.indent + line, self.pos))
+
+    def temp(self):
+        self.temp_count += 1
+        return f"_t{self.temp_count}"
+
+    def span(self, node):
+        """
+        :return: Names of the node's positions in the namespace
+        """
+        key = (node.pos_start, node.pos_end)
+        names = self.span_names.get(key)
+        if names is None:
+            idx = len(self.spans)
+            names = self.span_names[key] = f"s{idx}", f"e{idx}"
+            self.spans.append(key)
+        return names
+
+    def const(self, value):
+        self.consts.append(value)
+        return f"c{len(self.consts) - 1}"
+
+    def shape(self, node):
+        """
+        :return: (whether writing the node takes statements, its height as an expression)
+        """
+        shape = self.shapes.get(id(node))
+        if shape is None:
+            statement, height = isinstance(node, STATEMENT_TYPES), 0
+            if not isinstance(node, FuncDefNode):
+                for child in children(node):
+                    child_statement, child_height = self.shape(child)
+                    statement = statement or child_statement
+                    height = max(height, child_height + 1)
+            shape = self.shapes[id(node)] = statement or height >= MAX_EXPR_DEPTH, height
+        return shape
+
+    def operands(self, nodes):
+        """
+        :return: Expressions of nodes, evaluated in order even if a later one takes statements
+        """
+        # Index of the last node that takes statements; those before it are kept in temps
+        last = max((idx for idx, node in enumerate(nodes) if self.shape(node)[0]), default=-1)
+
+        results = []
+        for idx, node in enumerate(nodes):
+            result = self.expr(node)
+            if idx < last:
+                temp = self.temp()
+                self.emit(f"{temp} = {result}")
+                result = temp
+            results.append(result)
+        return results
+
+    # region Expressions
+
+    def expr(self, node):
+        """
+        Writes the statements the node needs, if any.
+
+        :return: A Python expression of the node's value
+        """
+        pos, self.pos = self.pos, node.pos_start
+        try:
+            result = getattr(self, f"expr_{type(node).__name__}")(node)
+        finally:
+            self.pos = pos
+
+        if self.shape(node)[1] % MAX_EXPR_DEPTH == MAX_EXPR_DEPTH - 1:
+            temp = self.temp()
+            self.emit(f"{temp} = {result}")
+            return temp
+        return result
+
+    def expr_NumberNode(self, node):
+        return f"number({literal(node)})"
+
+    def expr_StringNode(self, node):
+        return f"String({node.tok.value!r})"
+
+    def expr_ConstantNode(self, node):
+        return self.const(node.value)
+
+    def expr_ListNode(self, node):
+        if node.is_discarded:
+            self.stmt(node)
+            return "Null()"
+        return f"List([{', '.join(self.operands(node.element_nodes))}])"
+
+    def expr_DictNode(self, node):
+        items = self.operands([child for item in node.items.items() for child in item])
+        pairs = ", ".join(f"{items[idx]}: {items[idx + 1]}" for idx in range(0, len(items), 2))
+        return f"Dictionary({{{pairs}}})"
+
+    def expr_BinOpNode(self, node):
+        fast, guard, slow = self.binary_op(node)
+        fast = f"{PYTHON_OPERATORS[operation_key(node.op_tok)][1]}({fast})"
+        return f"({fast} if {guard} else {slow})" if guard else fast
+
+    def binary_op(self, node):
+        """
+        :return: (Python expression of the result's value for Number operands, expression of whether that one
+            applies or None if it always does, expression of the result otherwise)
+        """
+        left_node, right_node = node.left_node, node.right_node
+        key = operation_key(node.op_tok)
+        method = KEYWORD_OPERATIONS[key] if node.op_tok.type == TT_KEYWORD else OPERATIONS[key]
+
+        # Literals and variables are used as they are, without making a Number of them. A variable on the left
+        # only when the right has no effects, so an undefined one is still reported before those.
+        right_raw = is_raw(right_node)
+        left_raw = literal(left_node) is not None or (right_raw and is_raw(left_node))
+        evaluated = self.operands([child for child, raw in ((left_node, left_raw), (right_node, right_raw)) if not raw])
+        left = self.operand(left_node, left_raw, evaluated)
+        right = self.operand(right_node, right_raw, evaluated)
+        (a, left_guard, left_slow), (b, right_guard, right_slow) = left, right
+
+        # Both operands are evaluated before either is looked at
+        guard = " & ".join(f"({guard})" for guard in (left_guard, right_guard) if guard) or None
+        if key in (TT_DIV, TT_MOD):
+            # Division by zero goes through the value method, for its error
+            guard = f"{guard} and {b} != 0" if guard else f"{b} != 0"
+
+        if key == "XOR":
+            fast = f"bool({a}) + bool({b}) == 1"
+        else:
+            fast = f"{a} {PYTHON_OPERATORS[key][0]} {b}"
+
+        (ls, le), (rs, re) = self.span(left_node), self.span(right_node)
+        slow = f"binary_op({left_slow}, {right_slow}, {method!r}, ctx, ({ls}, {le}), ({rs}, {re}))"
+        return fast, guard, slow
+
+    def operand(self, node, raw, evaluated):
+        """
+        :return: (expression of its value, of whether it is a Number or None if it always is, of it as an EEL
+            value)
+        """
+        value = literal(node)
+        if value is not None:
+            return value, None, f"number({value})"
+
+        t = self.temp()
+        if raw:
+            name = node.var_name_tok.value
+            s, e = self.span(node)
+            return f"{t}.value", f"({t} := get({name!r})).__class__ in NT", f"load({t}, {name!r}, ctx, {s}, {e})"
+        return f"{t}.value", f"({t} := {evaluated.pop(0)}).__class__ in NT", t
+
+    def condition(self, node):
+        """
+        :return: A Python expression of whether the node's value is true
+        """
+        if type(node).__name__ == "BinOpNode":
+            pos, self.pos = self.pos, node.pos_start
+            try:
+                fast, guard, slow = self.binary_op(node)
+            finally:
+                self.pos = pos
+            return f"(({fast}) if {guard} else {slow}.is_true())" if guard else f"({fast})"
+        return f"{self.expr(node)}.is_true()"
+
+    def expr_UnaryOpNode(self, node):
+        operand = self.expr(node.node)
+        operand_span = "({}, {})".format(*self.span(node.node))
+
+        if node.op_tok.type == TT_MINUS:
+            a = self.temp()
+            return f"(number({a}.value * -1) if ({a} := {operand}).__class__ in NT else negated({a}, ctx, {operand_span}))"
+        if node.op_tok.matches(TT_KEYWORD, "NOT"):
+            return f"notted({operand}, ctx, {operand_span})"
+        return operand
+
+    def expr_VarAccessNode(self, node):
+        name = node.var_name_tok.value
+        s, e = self.span(node)
+        v = self.temp()
+        return f"({v} if ({v} := get({name!r})).__class__ is Number else load({v}, {name!r}, ctx, {s}, {e}))"
+
+    def expr_VarAssignNode(self, node):
+        v = self.temp()
+        return f"({v} := {self.expr(node.value_node)}, {self.store(node.var_name_tok.value, v)})[0]"
+
+    def expr_IfNode(self, node, discard=False):
+        result = None if discard else self.temp()
+        depth = 0
+
+        for idx, (condition, expr, should_return_null) in enumerate(node.cases):
+            if idx > 0:
+                if self.shape(condition)[0]:
+                    # The condition takes statements, which go in the else of the previous case
+                    self.emit("else:")
+                    self.indent += 1
+                    depth += 1
+                    self.emit(f"if {self.condition(condition)}:")
+                else:
+                    self.emit(f"elif {self.condition(condition)}:")
+            else:
+                self.emit(f"if {self.condition(condition)}:")
+
+            self.indent += 1
+            self.case(expr, should_return_null, result)
+            self.indent -= 1
+
+        self.emit("else:")
+        self.indent += 1
+        if node.else_case:
+            self.case(*node.else_case, result)
+        elif result:
+            self.emit(f"{result} = Null()")
+        else:
+            self.emit("pass")
+        self.indent -= 1 + depth
+        return result
+
+    def case(self, expr, should_return_null, result):
+        if should_return_null or not result:
+            self.block(expr)
+            if result:
+                self.emit(f"{result} = Null()")
+        else:
+            self.emit(f"{result} = {self.expr(expr)}")
+
+    def expr_ForNode(self, node, discard=False):
+        value_nodes = [node.start_value_node, node.end_value_node, node.step_value_node]
+        evaluated = self.operands([value_node for value_node in value_nodes if value_node and literal(value_node) is None])
+        i, end, step = self.temp(), self.temp(), self.temp()
+        for name, value_node in zip((i, end, step), value_nodes):
+            if value_node is None:
+                self.emit(f"{name} = 1")
+            else:
+                self.emit(f"{name} = {literal(value_node) or evaluated.pop(0) + '.value'}")
+
+        elements = self.loop_elements(node, discard)
+        self.emit(
+            f"while ({i} < {end} if {step} > 0 else {i} > {end} if {step} < 0 else False):"
+        )
+        self.indent += 1
+        self.emit_store(node.var_name_tok.value, f"number({i})")
+        self.emit(f"{i} += {step}")
+        self.loop_body(node.body_node, elements)
+        self.indent -= 1
+
+        return self.loop_result(node, elements, discard)
+
+    def expr_WhileNode(self, node, discard=False):
+        elements = self.loop_elements(node, discard)
+        self.emit("while True:")
+        self.indent += 1
+        # Outside the try of the body: a signal raised by the condition leaves the loop, as under the Interpreter
+        self.emit(f"if not {self.condition(node.condition_node)}:")
+        self.emit("    break")
+        self.loop_body(node.body_node, elements)
+        self.indent -= 1
+
+        return self.loop_result(node, elements, discard)
+
+    def loop_elements(self, node, discard):
+        if node.should_return_null or node.is_discarded or discard:
+            return None
+        elements = self.temp()
+        self.emit(f"{elements} = []")
+        return elements
+
+    def loop_body(self, body_node, elements):
+        # BREAK and CONTINUE raised by a function called in the body are caught here
+        catches = any_node(body_node, (CallNode, ImportNode))
+        if catches:
+            self.emit("try:")
+            self.indent += 1
+
+        self.loop_depth += 1
+        if elements:
+            self.emit(f"{elements}.append({self.expr(body_node)})")
+        else:
+            self.block(body_node)
+        self.loop_depth -= 1
+
+        if catches:
+            self.indent -= 1
+            self.emit("except BreakSignal:")
+            self.emit("    break")
+            self.emit("except ContinueSignal:")
+            self.emit("    continue")
+
+    def loop_result(self, node, elements, discard):
+        if discard:
+            return None
+        if not elements:
+            return "Null()"
+        return f"List({elements})"
+
+    def expr_FuncDefNode(self, node):
+        self.function_count += 1
+        name = f"_f{self.function_count}"
+        self.write_function(name, node.body_node, True, node.should_auto_return)
+
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        arg_names = [tok.value for tok in node.arg_name_toks]
+        value = f"PythonFunction({func_name!r}, {arg_names!r}, {node.should_auto_return!r}, {name})"
+
+        if func_name:
+            v = self.temp()
+            return f"({v} := {value}, {self.store(func_name, v)})[0]"
+        return value
+
+    def store(self, name, value):
+        """
+        :param value: A temporary or a literal
+        :return: An expression setting name to value
+        """
+        if self.is_function:
+            return f"symbols.__setitem__({name!r}, {value})"
+        # The program's table may be shared with code that caches lookups in it (see SymbolTable.version)
+        return f"table.set({name!r}, {value})"
+
+    def emit_store(self, name, value):
+        if self.is_function:
+            self.emit(f"symbols[{name!r}] = {value}")
+        else:
+            self.emit(f"table.set({name!r}, {value})")
+
+    def expr_CallNode(self, node):
+        results = self.operands([node.node_to_call] + node.arg_nodes)
+        s, e = self.span(node)
+        arg_spans = "".join(f"({', '.join(self.span(arg_node))}), " for arg_node in node.arg_nodes)
+        helper = "tail_call" if node.is_tail else "call"
+        return f"{helper}({results[0]}, [{', '.join(results[1:])}], ctx, {s}, {e}, ({arg_spans}))"
+
+    def expr_ReturnNode(self, node):
+        value = self.expr(node.node_to_return) if node.node_to_return else "Null()"
+        if self.is_function:
+            self.emit(f"return {value}")
+        else:
+            # Returning from the program ends it without a value, as under the Interpreter
+            if node.node_to_return:
+                self.emit(value)
+            self.emit("return None")
+        return "None"
+
+    def expr_ContinueNode(self, node):
+        self.emit("continue" if self.loop_depth else "raise ContinueSignal()")
+        return "None"
+
+    def expr_BreakNode(self, node):
+        self.emit("break" if self.loop_depth else "raise BreakSignal()")
+        return "None"
+
+    def expr_ImportNode(self, node):
+        value = self.expr(node.fn_node) if node.fn_node else "Null()"
+        s, e = self.span(node)
+        return f"import_({value}, ctx, {s}, {e})"
+
+    # endregion
+
+    def block(self, node):
+        """
+        Writes a node whose value is not used as the body of a Python statement
+        """
+        count = len(self.lines)
+        self.stmt(node)
+        if len(self.lines) == count:
+            self.emit("pass")
+
+    def stmt(self, node):
+        """
+        Writes a node whose value is not used
+        """
+        if isinstance(node, ListNode):
+            for element_node in node.element_nodes:
+                self.stmt(element_node)
+            return
+
+        pos, self.pos = self.pos, node.pos_start
+        try:
+            if isinstance(node, (IfNode, ForNode, WhileNode)):
+                getattr(self, f"expr_{type(node).__name__}")(node, True)
+            elif type(node).__name__ == "VarAssignNode":
+                self.emit_store(node.var_name_tok.value, self.expr(node.value_node))
+            elif isinstance(node, FuncDefNode) and node.var_name_tok:
+                self.emit(self.expr(node))
+            elif type(node).__name__ in ("NumberNode", "StringNode", "ConstantNode", "FuncDefNode"):
+                # Nothing to do: making the value has no effect
+                pass
+            else:
+                result = self.expr(node)
+                if result != "None":
+                    self.emit(result)
+        finally:
+            self.pos = pos
+
+
+def operation_key(op_tok):
+    return op_tok.value if op_tok.type == TT_KEYWORD else op_tok.type
+
+
+def literal(node):
+    """
+    :return: Python literal of a Number node's value, None for other nodes
+    """
+    if type(node).__name__ == "NumberNode":
+        value = node.tok.value
+    elif type(node).__name__ == "ConstantNode" and node.value.__class__ is Number:
+        value = node.value.value
+    else:
+        return None
+
+    # inf and nan have no literal
+    if type(value) not in (int, float) or not math.isfinite(value):
+        return None
+    return f"({value!r})" if value < 0 else repr(value)
+
+
+def is_raw(node):
+    return literal(node) is not None or type(node).__name__ == "VarAccessNode"
+
+
+def any_node(node, types):
+    """
+    :return: Whether node or any node under it, outside of function bodies, is of one of types
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, types):
+            return True
+        if not isinstance(node, FuncDefNode):
+            stack.extend(children(node))
+    return False
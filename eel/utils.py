@@ -1,26 +1,67 @@
-def string_with_arrows(text, pos_start, pos_end):
-    result = ''
+import gc
+import sys
+from contextlib import contextmanager
+
 
-    # Calculate indices
-    idx_start = max(text.rfind('\n', 0, pos_start.idx), 0)
-    idx_end = text.find('\n', idx_start + 1)
-    if idx_end < 0: idx_end = len(text)
+def string_with_arrows(pos_start, pos_end):
+    source = pos_start.source
+    text = source.text
+    line_starts = source.line_starts
+    result = ''
 
-    # Generate each line
-    line_count = pos_end.ln - pos_start.ln + 1
+    # Only the lines being shown are looked at, using the source's line index
+    ln_start, ln_end = pos_start.ln, pos_end.ln
+    first = ln_start - source.first_line
+    line_count = ln_end - ln_start + 1
     for i in range(line_count):
+        # Every line but the file's first is shown with the newline that precedes it
+        k = first + i
+        if k < len(line_starts):
+            idx_end = line_starts[k + 1] - 1 if k + 1 < len(line_starts) else len(text)
+            line = text[line_starts[k]:idx_end]
+            if source.first_line + k > 0:
+                line = '\n' + line
+        else:
+            line = ''
+
         # Calculate line columns
-        line = text[idx_start:idx_end]
-        col_start = pos_start.col if i == 0 else 0
-        col_end = pos_end.col if i == line_count - 1 else len(line) - 1
+        col_start = pos_start.idx - line_starts[first] if i == 0 else 0
+        col_end = pos_end.idx - pos_end.source.line_start(ln_end) if i == line_count - 1 else len(line) - 1
 
         # Append to result
         result += line + '\n'
         result += ' ' * col_start + '^' * (col_end - col_start)
 
-        # Re-calculate indices
-        idx_start = idx_end
-        idx_end = text.find('\n', idx_start + 1)
-        if idx_end < 0: idx_end = len(text)
-
     return result.replace('\t', '')
+
+
+@contextmanager
+def gc_paused():
+    """
+    Pauses the cyclic garbage collector, e.g. while building a large tree with no reference cycles,
+    which it would otherwise rescan over and over as the tree grows
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+@contextmanager
+def recursion_limit(limit):
+    """
+    Raises Python's recursion limit to at least limit until the block ends
+    """
+    previous = sys.getrecursionlimit()
+    if limit <= previous:
+        yield
+        return
+
+    sys.setrecursionlimit(limit)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(previous)
@@ -1,24 +1,23 @@
 import os
 
-from eel.base import RTResult
+from eel.base import RTResult, TailCall
 from eel.context import SymbolTable, Context
 from eel.errors import RTError, ConversionError
+from eel.module_utils import NativeSignature
 
 
 class BaseType:
-    def __init__(self):
-        self.set_pos()
-        self.set_context()
-        self.type = "Type"
-
-    def set_context(self, context=None):
-        self.context = context
-        return self
-
-    def set_pos(self, pos_start=None, pos_end=None):
-        self.pos_start = pos_start
-        self.pos_end = pos_end
-        return self
+    """
+    Values are shared by every place that uses them: reading a variable, returning from a call or importing a
+    name gives the value itself, not a copy. Numbers, Strings, Booleans and Null never change value once made,
+    and Lists and Dictionaries are references, so LS_APPEND on one is seen through every variable holding it.
+
+    A value does not know where it was made or used: the errors of operations on it are placed by the engine at
+    the nodes it came from (see operation_error), and a function is given its call's context and position by
+    the call.
+    """
+    __slots__ = ()
+    type = "Type"
 
     def added_to(self, other):
         return None, self.illegal_operation(other)
@@ -74,49 +73,73 @@ class BaseType:
     def is_true(self):
         return False
 
+    def execute(self, args, context, pos_start, pos_end, arg_spans=None):
+        """
+        Calls the value from context at pos_start to pos_end, which only functions can be
+
+        :param arg_spans: (pos_start, pos_end) of the node each arg came from, if the caller has them
+        :return: RTResult
+        """
+        return RTResult().failure(RTError("Illegal Operation", pos_start, pos_end, context))
+
     def illegal_operation(self, other=None):
-        if not other:
-            other = self
+        return operand_error("Illegal Operation", 0, 0 if other is None else 1, self, other)
+
+
+def operand_error(details, first, last, value, other=None):
+    """
+    :return: An RTError of an operation on values, to be placed by the engine (see operation_error) from the
+             start of operand first to the end of operand last, 0 being the value the operation is on and 1 its
+             argument
+    :param value: The value the operation is on, and other its argument, kept on the error for a native that made
+                  the operation to place it at its args (see NativeSignature.call)
+    """
+    error = RTError(details, None, None)
+    error.operands = first, last
+    error.values = value, other
+    return error
 
-        return RTError(
-            "Illegal Operation",
-            self.pos_start, other.pos_end, self.context
-        )
+
+def operation_error(error, context, *spans):
+    """
+    :return: error, of an operation that failed (see operand_error), placed at the nodes its operands came from
+    :param spans: (pos_start, pos_end) of the value the operation was on, then of its argument
+    """
+    first, last = error.operands
+    error.pos_start, error.pos_end, error.context = spans[first][0], spans[last][1], context
+    return error
 
 
 class Number(BaseType):
+    __slots__ = ("value",)
+    type = "Number"
+
     def __init__(self, value: float | int):
-        super().__init__()
         self.value = value
-        self.type = "Number"
 
     def added_to(self, other):
         if isinstance(other, Number):
-            return Number(self.value + other.value).set_context(self.context), None
+            return Number(self.value + other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def subtracted_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value - other.value).set_context(self.context), None
+            return Number(self.value - other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def multiplied_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value * other.value).set_context(self.context), None
+            return Number(self.value * other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def divided_by(self, other):
         if isinstance(other, Number):
             if other.value == 0:
-                return None, RTError(
-                    "Division by zero",
-                    other.pos_start, other.pos_end,
-                    self.context
-                )
-            return Number(self.value / other.value).set_context(self.context), None
+                return None, operand_error("Division by zero", 1, 1, self, other)
+            return Number(self.value / other.value), None
 
         else:
             return None, self.illegal_operation(other)
@@ -124,127 +147,122 @@ class Number(BaseType):
     def mod_div_by(self, other):
         if isinstance(other, Number):
             if other.value == 0:
-                return None, RTError(
-                    "Division by zero",
-                    other.pos_start, other.pos_end,
-                    self.context
-                )
-            return Number(self.value % other.value).set_context(self.context), None
+                return None, operand_error("Division by zero", 1, 1, self, other)
+            return Number(self.value % other.value), None
 
         else:
             return None, self.illegal_operation(other)
 
     def powered_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value ** other.value).set_context(self.context), None
+            return Number(self.value ** other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_eq(self, other):
         if isinstance(other, Number):
-            return Boolean(self.value == other.value).set_context(self.context), None
+            return Boolean(self.value == other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_ne(self, other):
         if isinstance(other, Number):
-            return Boolean(self.value != other.value).set_context(self.context), None
+            return Boolean(self.value != other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_lt(self, other):
         if isinstance(other, Number):
-            return Boolean(self.value < other.value).set_context(self.context), None
+            return Boolean(self.value < other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_gt(self, other):
         if isinstance(other, Number):
-            return Boolean(self.value > other.value).set_context(self.context), None
+            return Boolean(self.value > other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_lte(self, other):
         if isinstance(other, Number):
-            return Boolean(self.value <= other.value).set_context(self.context), None
+            return Boolean(self.value <= other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_gte(self, other):
         if isinstance(other, Number):
-            return Boolean(self.value >= other.value).set_context(self.context), None
+            return Boolean(self.value >= other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def and_with(self, other):
         if isinstance(other, Number):
-            return Boolean(self.value and other.value).set_context(self.context), None
+            return Boolean(self.value and other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def or_with(self, other):
         if isinstance(other, Number):
-            return Boolean(self.value or other.value).set_context(self.context), None
+            return Boolean(self.value or other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def xor_with(self, other):
         if isinstance(other, Number):
-            return Boolean(bool(self.value) + bool(other.value) == 1).set_context(self.context), None
+            return Boolean(bool(self.value) + bool(other.value) == 1), None
         else:
             return None, self.illegal_operation(other)
 
     def notted(self):
-        return Boolean(True if self.value == 0 else False).set_context(self.context), None
+        return Boolean(True if self.value == 0 else False), None
 
     def is_true(self):
         return self.value != 0
 
     def copy(self):
-        copy = Number(self.value)
-        copy.set_pos(self.pos_start, self.pos_end)
-        copy.set_context(self.context)
-        return copy
+        return Number(self.value)
 
     def __repr__(self):
         return str(self.value)
 
 
 class Null(BaseType):
-    def __init__(self):
-        super().__init__()
-        self.type = "Null"
-        self.value = None
+    __slots__ = ()
+    type = "Null"
+    value = None
 
     def copy(self):
-        return Null().set_context(self.context).set_pos(self.pos_start, self.pos_end)
+        return Null()
 
     def get_comparison_eq(self, other):
-        return Boolean(True if isinstance(other, Null) else False).set_context(self.context), None
+        return Boolean(True if isinstance(other, Null) else False), None
 
     def get_comparison_ne(self, other):
-        return Boolean(True if not isinstance(other, Null) else False).set_context(self.context), None
+        return Boolean(True if not isinstance(other, Null) else False), None
 
     def __repr__(self):
         return "null"
 
 
 class Boolean(Number):
+    __slots__ = ()
+    type = "Boolean"
+
     def __init__(self, value):
-        super().__init__(bool(value))
-        self.type = "Boolean"
+        self.value = bool(value)
 
     def copy(self):
-        return Boolean(self.value).set_context(self.context).set_pos(self.pos_start, self.pos_end)
+        return Boolean(self.value)
 
     def __repr__(self):
         return str(self.value).lower()
 
 
 class File(BaseType):
+    __slots__ = ("value",)
+    type = "File"
+
     def __init__(self, value):
-        super().__init__()
-        self.type = "File"
         self.value = value
 
     def copy(self):
@@ -255,10 +273,11 @@ class File(BaseType):
 
 
 class String(BaseType):
+    __slots__ = ("value",)
+    type = "String"
+
     def __init__(self, value):
-        super().__init__()
         self.value = value
-        self.type = "String"
 
     def ord_sum(self):
         return sum([ord(c) for c in self.value])
@@ -266,57 +285,57 @@ class String(BaseType):
     def added_to(self, other):
         if isinstance(other, String) or isinstance(other, Number):
             other_val = str(other.value)
-            return String(self.value + other_val).set_context(self.context), None
+            return String(self.value + other_val), None
         else:
             return None, self.illegal_operation(other)
 
     def multiplied_by(self, other):
         if isinstance(other, Number):
-            return String(self.value * other.value).set_context(self.context), None
+            return String(self.value * other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_eq(self, other):
         if isinstance(other, String) or isinstance(other, Number):
-            return Boolean(str(self.value) == str(other.value)).set_context(self.context), None
+            return Boolean(str(self.value) == str(other.value)), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_ne(self, other):
         if isinstance(other, String) or isinstance(other, Number):
-            return Boolean(str(self.value) != str(other.value)).set_context(self.context), None
+            return Boolean(str(self.value) != str(other.value)), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_lt(self, other):
         if isinstance(other, String):
-            return Boolean(self.ord_sum() < other.ord_sum()).set_context(self.context), None
+            return Boolean(self.ord_sum() < other.ord_sum()), None
         elif isinstance(other, Number):
-            return Boolean(self.ord_sum() < other.value).set_context(self.context), None
+            return Boolean(self.ord_sum() < other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_gt(self, other):
         if isinstance(other, String):
-            return Boolean(self.ord_sum() > other.ord_sum()).set_context(self.context), None
+            return Boolean(self.ord_sum() > other.ord_sum()), None
         elif isinstance(other, Number):
-            return Boolean(self.ord_sum() > other.value).set_context(self.context), None
+            return Boolean(self.ord_sum() > other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_lte(self, other):
         if isinstance(other, String):
-            return Boolean(self.ord_sum() <= other.ord_sum()).set_context(self.context), None
+            return Boolean(self.ord_sum() <= other.ord_sum()), None
         elif isinstance(other, Number):
-            return Boolean(self.ord_sum() <= other.value).set_context(self.context), None
+            return Boolean(self.ord_sum() <= other.value), None
         else:
             return None, self.illegal_operation(other)
 
     def get_comparison_gte(self, other):
         if isinstance(other, String):
-            return Boolean(self.ord_sum() >= other.ord_sum()).set_context(self.context), None
+            return Boolean(self.ord_sum() >= other.ord_sum()), None
         elif isinstance(other, Number):
-            return Boolean(self.ord_sum() >= other.value).set_context(self.context), None
+            return Boolean(self.ord_sum() >= other.value), None
         else:
             return None, self.illegal_operation(other)
 
@@ -324,10 +343,7 @@ class String(BaseType):
         return len(self.value) > 0
 
     def copy(self):
-        copy = String(self.value)
-        copy.set_pos(self.pos_start, self.pos_end)
-        copy.set_context(self.context)
-        return copy
+        return String(self.value)
 
     def __str__(self):
         return self.value
@@ -337,10 +353,11 @@ class String(BaseType):
 
 
 class List(BaseType):
+    __slots__ = ("elements", "curr_index")
+    type = "List"
+
     def __init__(self, elements):
-        super().__init__()
         self.elements = elements
-        self.type = "List"
         self.curr_index = 0
 
     def added_to(self, other):
@@ -378,19 +395,13 @@ class List(BaseType):
             try:
                 return self.elements[other.value], None
             except IndexError:
-                return None, RTError(
-                    "Index Out of Bounds",
-                    other.pos_start, other.pos_end, self.context
-                )
+                return None, operand_error("Index Out of Bounds", 1, 1, self, other)
 
         else:
             return None, self.illegal_operation(other)
 
     def copy(self):
-        copy = List(self.elements)
-        copy.set_pos(self.pos_start, self.pos_end)
-        copy.set_context(self.context)
-        return copy
+        return List(self.elements)
 
     def __iter__(self):
         self.curr_index = 0
@@ -411,9 +422,9 @@ class List(BaseType):
 
 
 class Dictionary(BaseType):
-    def __init__(self, items: dict | None = None, keys=None, values=None):
-        super().__init__()
+    __slots__ = ("items",)
 
+    def __init__(self, items: dict | None = None, keys=None, values=None):
         if items:
             self.items = items
 
@@ -424,7 +435,7 @@ class Dictionary(BaseType):
             self.items = {k: v for k, v in zip(keys, values)}
 
     def copy(self):
-        return Dictionary(self.items).set_pos(self.pos_start, self.pos_end).set_context(self.context)
+        return Dictionary(self.items)
 
     def __str__(self):
         res = ""
@@ -444,32 +455,63 @@ class Dictionary(BaseType):
 
 
 class BaseFunction(BaseType):
+    type = "Function"
+
     def __init__(self, name):
-        super().__init__()
         self.name = name or "<anonymous>"
-        self.type = "Function"
 
-    def generate_new_context(self):
-        local_context = Context(self.name, self.context, self.pos_start)
-        local_context.symbol_table = SymbolTable(local_context.parent.symbol_table)
+    def generate_new_context(self, context, pos_start):
+        """
+        :return: The context of a call of the function from context at pos_start
+        """
+        return Context(self.name, context, pos_start, SymbolTable(context.symbol_table))
+
+    def generate_tail_context(self, replaced, context):
+        """
+        Like generate_new_context, for a tail call (see CallNode.is_tail) made from context by the call whose
+        context is replaced
+
+        The new context takes replaced's place in tracebacks and its depth, but sees the names of the function
+        that made the call like any other call does.
+        """
+        local_context = Context(
+            self.name, replaced.parent, replaced.parent_entry_pos, SymbolTable(context.symbol_table)
+        )
+        if context is replaced:
+            # Lookups never go past a table's parent, and the chain of tables the calls it replaced left would
+            # otherwise grow with every tail call
+            replaced.symbol_table.parent = None
         return local_context
 
-    def check_args(self, arg_names, args):
-        from eel.base import RTResult
+    def check_depth(self, exec_ctx, pos_end):
+        """
+        :return: An RTError if exec_ctx is deeper than Context.recursion_limit allows, None otherwise. It is placed
+                 at the call exec_ctx was made for, which ends at pos_end.
+        """
+        if exec_ctx.depth > exec_ctx.recursion_limit:
+            return RTError(
+                "Maximum recursion depth exceeded", exec_ctx.parent_entry_pos, pos_end, exec_ctx.parent
+            )
+        return None
+
+    def check_args(self, arg_names, args, context, pos_start, pos_end):
+        """
+        :return: RTResult, failed if args do not fit arg_names in a call from context at pos_start to pos_end
+        """
         res = RTResult()
 
         if len(args) > len(arg_names):
             return res.failure(RTError(
                 f"Too many args ({len(args) - len(arg_names)}) passed into '{self.name}'",
-                self.pos_start, self.pos_end,
-                self.context
+                pos_start, pos_end,
+                context
             ))
 
         if len(args) < len(arg_names):
             return res.failure(RTError(
                 f"Too few args ({len(arg_names) - len(args)}) passed into '{self.name}'",
-                self.pos_start, self.pos_end,
-                self.context
+                pos_start, pos_end,
+                context
             ))
 
         return res.success(Null())
@@ -477,19 +519,7 @@ class BaseFunction(BaseType):
     def populate_args(self, arg_names, args, exec_ctx):
         for i in range(len(args)):
             arg_name = arg_names[i]
-            arg_value = args[i]
-            arg_value.set_context(exec_ctx)
-            exec_ctx.symbol_table.set(arg_name, arg_value)
-
-    def check_and_populate_args(self, arg_names, args, exec_ctx):
-        from eel.base import RTResult
-        res = RTResult()
-        res.register(self.check_args(arg_names, args))
-        if res.should_return():
-            return res
-        self.populate_args(arg_names, args, exec_ctx)
-
-        return res.success(Null())
+            exec_ctx.symbol_table.set(arg_name, args[i])
 
     def __repr__(self):
         return f"<function '{self.name}'>"
@@ -502,104 +532,111 @@ class Function(BaseFunction):
         self.arg_names = arg_names
         self.should_auto_return = should_auto_return
 
-    def execute(self, args):
-        from eel.base import RTResult
+    def execute(self, args, context, pos_start, pos_end, arg_spans=None):
         from eel.interpreter import Interpreter
-        res = RTResult()
-        interpreter = Interpreter()
+        if len(args) != len(self.arg_names):
+            # A call too deep fails on its depth first, whatever its args
+            error = (
+                self.check_depth(self.generate_new_context(context, pos_start), pos_end)
+                or self.check_args(self.arg_names, args, context, pos_start, pos_end).error
+            )
+            return RTResult().failure(error)
+        return self.execute_at(Interpreter(), args, context, pos_start, pos_end)
+
+    def new_frame(self, args, context, pos_start):
+        """
+        Like generate_new_context plus populate_args: the new symbol table is made with the args already in it
+        """
+        return Context(
+            self.name, context, pos_start, SymbolTable(context.symbol_table, dict(zip(self.arg_names, args)))
+        )
 
-        exec_ctx = self.generate_new_context()
-        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
-        if res.should_return():
-            return res
+    def execute_at(self, interpreter, args, context, pos_start, pos_end):
+        """
+        execute, for args already checked against arg_names
+
+        :param interpreter: Runs the body; Interpreters keep no state, so a call site passes its own
+        """
+        res = RTResult()
+        exec_ctx = self.new_frame(args, context, pos_start)
+        if exec_ctx.depth > exec_ctx.recursion_limit:
+            return res.failure(self.check_depth(exec_ctx, pos_end))
 
         value = res.register(interpreter.visit(self.body_node, exec_ctx))
         if res.should_return() and res.func_return_value is None:
             return res
 
         ret_value = (value if self.should_auto_return else None) or res.func_return_value or Null()
+
+        # Tail calls the body returns are made here, one after the other, in place of this call
+        while ret_value.__class__ is TailCall:
+            function, args = ret_value.function, ret_value.args
+            if len(args) != len(function.arg_names):
+                return function.check_args(
+                    function.arg_names, args, ret_value.context, ret_value.pos_start, ret_value.pos_end
+                )
+            exec_ctx = function.generate_tail_context(exec_ctx, ret_value.context)
+            function.populate_args(function.arg_names, args, exec_ctx)
+
+            res = RTResult()
+            value = res.register(interpreter.visit(function.body_node, exec_ctx))
+            if res.should_return() and res.func_return_value is None:
+                return res
+
+            ret_value = (value if function.should_auto_return else None) or res.func_return_value or Null()
+
         return res.success(ret_value)
 
     def copy(self):
-        copy = Function(self.name, self.body_node, self.arg_names, self.should_auto_return)
-        copy.set_context(self.context)
-        copy.set_pos(self.pos_start, self.pos_end)
-        return copy
+        return Function(self.name, self.body_node, self.arg_names, self.should_auto_return)
 
 
 class BuiltInFunction(BaseFunction):
+    # The NativeSignature of each builtin's execute_* method, by name; worked out when the first builtin of a name
+    # is made and shared by its copies
+    natives = {}
+    # The names the type errors of the list builtins have always given them
+    error_names = {"ls_append": "append", "ls_pop": "pop", "ls_extend": "extend"}
+
     def __init__(self, name):
         super().__init__(name)
+        self.method = getattr(self, f"execute_{name}", None)
+        if self.method is None:
+            raise NotImplementedError(f"No 'execute_{name}' method defined")
+        self.signature = self.natives.get(name)
+        if self.signature is None:
+            self.signature = self.natives[name] = NativeSignature(self.method, name=self.error_names.get(name))
 
-    def execute(self, args):
-        res = RTResult()
-        exec_ctx = self.generate_new_context()
-
-        method_name = f"execute_{self.name}"
-        method = getattr(self, method_name, self.no_visit_method)
-
-        res.register(self.check_and_populate_args(method.arg_names, args, exec_ctx))
-        if res.should_return():
-            return res
-
-        return_value = res.register(method(exec_ctx))
-        if res.should_return():
-            return res
-
-        return res.success(return_value)
+    def execute(self, args, context, pos_start, pos_end, arg_spans=None):
+        return self.signature.call(self.name, self.method, args, context, pos_start, pos_end, arg_spans)
 
-    def no_visit_method(self, node, context):
-        raise NotImplementedError(f"No 'execute_{self.name}' method defined")
+    @staticmethod
+    def error(details):
+        """
+        :return: An RTError of the call, which NativeSignature.call places
+        """
+        return RTError(details, None, None)
 
     def copy(self):
-        copy = BuiltInFunction(self.name)
-        copy.set_context(self.context)
-        copy.set_pos(self.pos_start, self.pos_end)
-        return copy
+        return BuiltInFunction(self.name)
 
     def __repr__(self):
         return f"<built-in function {self.name}>"
 
-    @staticmethod
-    def add_builtin(arg_names: list | None = None, opt_arg_names: dict | None = None):
-        if arg_names is None:
-            arg_names = []
-
-        if opt_arg_names is None:
-            opt_arg_names = {}
-
-        def decorator(func):
-            def wrapper(exec_ctx):
-                kwargs = {name: exec_ctx.get_value(name) for name in arg_names}
-                for arg_name, default_value in opt_arg_names.items():
-                    kwargs[arg_name] = exec_ctx.symbol_table.get(arg_name, default_value)
-
-                kwargs["__exec_ctx__"] = exec_ctx
-
-                return func(**kwargs)
-
-            # Attach argument names to the function
-            func.arg_names = arg_names
-            return wrapper
-
-        return decorator
-
     ##################################################
     # Built-In Function Execute Methods
-    # Note: kwargs contains the values passed, and exec_ctx
+    # Note: the args are passed positionally, and checked against the method's signature (see NativeSignature)
     ##################################################
 
-    def execute_print(self, exec_ctx):
-        print(exec_ctx.symbol_table.get("value"))
+    def execute_print(self, value):
+        print(value)
         return RTResult().success(Null())
-    execute_print.arg_names = ["value"]
 
-    def execute_input(self, exec_ctx):
+    def execute_input(self):
         user_input = input("")
         return RTResult().success(String(user_input))
-    execute_input.arg_names = []
 
-    def execute_input_int(self, exec_ctx):
+    def execute_input_int(self):
         while True:
             try:
                 user_input = int(input())
@@ -607,9 +644,8 @@ class BuiltInFunction(BaseFunction):
             except ValueError:
                 print("Input must be an integer")
         return RTResult().success(Number(user_input))
-    execute_input_int.arg_names = []
 
-    def execute_input_float(self, exec_ctx):
+    def execute_input_float(self):
         while True:
             try:
                 user_input = float(input())
@@ -617,159 +653,68 @@ class BuiltInFunction(BaseFunction):
             except ValueError:
                 print("Input must be a float")
         return RTResult().success(Number(user_input))
-    execute_input_float.arg_names = []
 
-    def execute_clear(self, exec_ctx):
+    def execute_clear(self):
         os.system("cls" if os.name == "nt" else "clear")
         return RTResult().success(Null())
-    execute_clear.arg_names = []
-
-    def execute_is_num(self, exec_ctx):
-        return RTResult().success(Boolean(isinstance(exec_ctx.symbol_table.get("value"), Number)))
-    execute_is_num.arg_names = ["value"]
 
-    def execute_is_str(self, exec_ctx):
-        return RTResult().success(Boolean(isinstance(exec_ctx.symbol_table.get("value"), String)))
-    execute_is_str.arg_names = ["value"]
+    def execute_is_num(self, value):
+        return RTResult().success(Boolean(isinstance(value, Number)))
 
-    def execute_is_list(self, exec_ctx):
-        return RTResult().success(Boolean(isinstance(exec_ctx.symbol_table.get("value"), List)))
-    execute_is_list.arg_names = ["value"]
+    def execute_is_str(self, value):
+        return RTResult().success(Boolean(isinstance(value, String)))
 
-    def execute_is_func(self, exec_ctx):
-        return RTResult().success(Boolean(isinstance(exec_ctx.symbol_table.get("value"), BaseFunction)))
-    execute_is_func.arg_names = ["value"]
+    def execute_is_list(self, value):
+        return RTResult().success(Boolean(isinstance(value, List)))
 
-    def execute_ls_append(self, exec_ctx):
-        list_ = exec_ctx.symbol_table.get("list")
-        value = exec_ctx.symbol_table.get("value")
-        index = -1  # kwargs.get("index")
-
-        if not isinstance(list_, List):
-            return RTResult().failure(RTError(
-                "First argument of 'append' must be a list",
-                self.pos_start, self.pos_end, exec_ctx
-            ))
+    def execute_is_func(self, value):
+        return RTResult().success(Boolean(isinstance(value, BaseFunction)))
 
+    def execute_ls_append(self, list_: List, value):
         list_.elements.append(value)
-
         return RTResult().success(Null())
 
-    execute_ls_append.arg_names = ["list", "value"]
-
-    def execute_ls_pop(self, exec_ctx):
-        list_ = exec_ctx.symbol_table.get("list")
-        index = exec_ctx.symbol_table.get("index")
-
-        if not isinstance(list_, List):
-            return RTResult().failure(RTError(
-                "First argument of 'pop' must be a list",
-                self.pos_start, self.pos_end, exec_ctx
-            ))
-
-        if not isinstance(index, Number):
-            return RTResult().failure(RTError(
-                "Second argument of 'pop' must be a number",
-                self.pos_start, self.pos_end, exec_ctx
-            ))
-
+    def execute_ls_pop(self, list_: List, index: Number):
         try:
-            element = list_.elements.pop(index)
+            element = list_.elements.pop(index.value)
         except IndexError:
-            return RTResult().failure(RTError(
-                "Index out of bounds",
-                self.pos_start, self.pos_end, exec_ctx
-            ))
+            return RTResult().failure(self.error("Index out of bounds"))
 
         return RTResult().success(element)
-    execute_ls_pop.arg_names = ["list", "index"]
-
-    def execute_ls_extend(self, exec_ctx):
-        list1 = exec_ctx.symbol_table.get("list1")
-        list2 = exec_ctx.symbol_table.get("list2")
-
-        if not isinstance(list1, List):
-            return RTResult().failure(RTError(
-                "First argument of 'extend' must be a list",
-                self.pos_start, self.pos_end, exec_ctx
-            ))
-
-        if not isinstance(list2, List):
-            return RTResult().failure(RTError(
-                "Second argument of 'extend' must be a list",
-                self.pos_start, self.pos_end, exec_ctx
-            ))
 
+    def execute_ls_extend(self, list1: List, list2: List):
         list1.elements.extend(list2.elements)
         return RTResult().success(Null())
 
-    execute_ls_extend.arg_names = ["list1", "list2"]
-
-    def execute_dict_get(self, exec_ctx):
-        dict_ = exec_ctx.symbol_table.get("dict")
-        key = exec_ctx.symbol_table.get("key")
+    def execute_dict_get(self, dict_: Dictionary, key):
         # TODO: When I add optional args, add optional default value
-
         for k in dict_.items:
             if k.value == key.value:
                 return RTResult().success(dict_.items[k])
 
-        return RTResult().failure(RTError(
-            f"Key '{key}' is not in dictionary",
-            self.pos_start, self.pos_end, exec_ctx
-        ))
-
-    execute_dict_get.arg_names = ["dict", "key"]
-
-    def execute_len(self, exec_ctx):
-        item = exec_ctx.symbol_table.get("item")
+        return RTResult().failure(self.error(lambda: f"Key '{key}' is not in dictionary"))
 
+    def execute_len(self, item: List | Dictionary):
         if isinstance(item, List):
             return RTResult().success(Number(len(item.elements)))
+        return RTResult().success(Number(len(item.items.keys())))
 
-        elif isinstance(item, Dictionary):
-            return RTResult().success(Number(len(item.items.keys())))
-
-        else:
-            return RTResult().failure(RTError(
-                "Argument must be list or dictionary",
-                self.pos_start, self.pos_end, exec_ctx
-            ))
-
-    execute_len.arg_names = ["item"]
-
-    def execute_run(self, exec_ctx):  # TODO: Use this as a basis for import
-        fn = exec_ctx.symbol_table.get("fn")
-
-        if not isinstance(fn, String):
-            return RTResult().failure(RTError(
-                "Argument must be string",
-                self.pos_start, self.pos_end, exec_ctx
-            ))
-
+    def execute_run(self, fn: String):  # TODO: Use this as a basis for import
         fn = fn.value
 
+        from eel.main import run_file
         try:
-            with open(fn, "r") as f:
-                script = f.read()
-        except Exception as e:
-            return RTResult().failure(RTError(
-                f"Failed to load script \"{fn}\"\n" + str(e),
-                self.pos_start, self.pos_end, exec_ctx
-            ))
+            _, error = run_file(fn)
+        except (OSError, UnicodeDecodeError) as e:
+            return RTResult().failure(self.error(f"Failed to load script \"{fn}\"\n" + str(e)))
 
-        from eel.main import run
-        _, error = run(fn, script)
         if error:
-            return RTResult().failure(RTError(
-                f"Failed to finish executing script \"{fn}\"\n" + error.as_string(),
-                self.pos_start, self.pos_end, exec_ctx
+            return RTResult().failure(self.error(
+                lambda: f"Failed to finish executing script \"{fn}\"\n" + error.as_string()
             ))
 
         return RTResult().success(Null())
 
-    execute_run.arg_names = ["fn"]
-
 
 BuiltInFunction.print =         BuiltInFunction("print")
 BuiltInFunction.input =         BuiltInFunction("input")
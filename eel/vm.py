@@ -0,0 +1,317 @@
+"""
+Stack-based virtual machine, running the Code objects of eel.bytecode.
+
+Each call of a function runs its Code in a new context, with its own value stack and stack of the loops it is in.
+As in eel.closures, errors are raised as RTExceptions, and BREAK and CONTINUE outside any loop of the running code
+are raised as signals, which the loop the call was made from (if any) catches.
+"""
+import operator
+
+from eel.base import BreakSignal, ContinueSignal, ReturnSignal, RTException, RTResult, TailCall
+from eel.bytecode import *
+from eel.closures import FAST_KEYWORD_OPERATIONS, FAST_OPERATIONS, NUMBER_TYPES, never, new, number, unwrap
+from eel.errors import RTError
+from eel.interpreter import Interpreter
+from eel.module_utils import EelVariable
+from eel.optimizer import KEYWORD_OPERATIONS, OPERATIONS
+from eel.tokens import *
+from eel.values import Dictionary, Function, List, Null, Number, operation_error
+
+# Value method, result maker, function of the values and whether a zero right operand needs the method, per
+# BINARY_OP argument
+BINARY_OPERATIONS = [
+    (KEYWORD_OPERATIONS[op], *FAST_KEYWORD_OPERATIONS[op], False) if op in KEYWORD_OPERATIONS else
+    (OPERATIONS[op], *FAST_OPERATIONS[op], op in (TT_DIV, TT_MOD))
+    for op in OPERATORS
+]
+
+
+def execute(code, context):
+    """
+    :return: (value, error) of a program, as from the Interpreter
+    """
+    try:
+        return run(code, context), None
+    except RTException as e:
+        return None, e.error
+    except (ReturnSignal, BreakSignal, ContinueSignal):
+        # Left over at the top level, where the Interpreter also drops them
+        return None, None
+
+
+class BytecodeFunction(Function):
+    def __init__(self, name, arg_names, should_auto_return, code):
+        super().__init__(name, None, arg_names, should_auto_return)
+        self.code = code
+
+    def call(self, args, context, pos_start, pos_end):
+        """
+        :return: The return value; errors are raised
+        """
+        function = self
+        exec_ctx = self.generate_new_context(context, pos_start)
+        error = self.check_depth(exec_ctx, pos_end)
+        if error:
+            raise RTException(error)
+
+        # Tail calls the code returns (see CALL_TAIL) are made here, in place of this call
+        while True:
+            if len(args) != len(function.arg_names):
+                raise RTException(function.check_args(function.arg_names, args, context, pos_start, pos_end).error)
+            function.populate_args(function.arg_names, args, exec_ctx)
+
+            try:
+                return_value = run(function.code, exec_ctx) or Null()
+            except ReturnSignal as signal:
+                return_value = signal.value or Null()
+
+            if return_value.__class__ is not TailCall:
+                return return_value
+            function, args = return_value.function, return_value.args
+            context, pos_start, pos_end = return_value.context, return_value.pos_start, return_value.pos_end
+            exec_ctx = function.generate_tail_context(exec_ctx, context)
+
+    def execute(self, args, context, pos_start, pos_end, arg_spans=None):
+        res = RTResult()
+        try:
+            return res.success(self.call(args, context, pos_start, pos_end))
+        except RTException as e:
+            return res.failure(e.error)
+        except ContinueSignal:
+            return res.success_continue()
+        except BreakSignal:
+            return res.success_break()
+
+    def copy(self):
+        # A copy has exactly the same attributes
+        copy = new(BytecodeFunction)
+        copy.__dict__.update(self.__dict__)
+        return copy
+
+
+def run(code, context):
+    """
+    Runs code in context.
+
+    :return: The value it returns, None if it returns without one
+    """
+    ops, args, spans, consts, names = code.ops, code.args, code.spans, code.consts, code.names
+    table = context.symbol_table
+    get = table.get
+    symbols = table.symbols
+
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    # (break target, stack size, continue target) of each loop the code is in
+    blocks = []
+    ip = 0
+
+    while True:
+        try:
+            while True:
+                op = ops[ip]
+                arg = args[ip]
+                ip += 1
+
+                if op == LOAD_NAME:
+                    value = get(names[arg])
+                    if value.__class__ is Number:
+                        push(value)
+                        continue
+
+                    if not value:
+                        pos_start, pos_end = spans[ip - 1]
+                        raise RTException(RTError(f"'{names[arg]}' is not defined", pos_start, pos_end, context))
+
+                    if isinstance(value, EelVariable):
+                        value = value()
+                    push(value)
+
+                elif op == LOAD_CONST:
+                    push(consts[arg])
+
+                elif op == BINARY_OP:
+                    right = pop()
+                    left = pop()
+                    method, make, function, checks_zero = BINARY_OPERATIONS[arg]
+
+                    if (
+                        left.__class__ in NUMBER_TYPES and right.__class__ in NUMBER_TYPES
+                        and not (checks_zero and right.value == 0)
+                    ):
+                        push(make(function(left.value, right.value)))
+                        continue
+
+                    result, error = getattr(left, method)(right)
+                    if error:
+                        raise RTException(operation_error(error, context, *code.operand_spans[ip - 1]))
+                    push(result)
+
+                elif op == STORE_NAME:
+                    name = names[arg]
+                    if name in table.watched or name not in symbols:
+                        table.version += 1
+                    symbols[name] = stack[-1]
+
+                elif op == POP_TOP:
+                    pop()
+
+                elif op == POP_JUMP_IF_FALSE:
+                    if not pop().is_true():
+                        ip = arg
+
+                elif op == JUMP:
+                    ip = arg
+
+                elif op == FOR_ITER:
+                    state = stack[-1]
+                    i = state[0]
+                    if state[3](i, state[1]):
+                        push(number(i))
+                        state[0] = i + state[2]
+                    else:
+                        ip = arg
+
+                elif op == LIST_APPEND:
+                    value = pop()
+                    stack[-arg].append(value)
+
+                elif op == CALL:
+                    if arg:
+                        call_args = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        call_args = []
+                    value_to_call = pop()
+                    pos_start, pos_end = spans[ip - 1]
+
+                    if value_to_call.__class__ is BytecodeFunction:
+                        push(value_to_call.call(call_args, context, pos_start, pos_end))
+                    else:
+                        arg_spans = code.operand_spans[ip - 1]
+                        push(unwrap(value_to_call.execute(call_args, context, pos_start, pos_end, arg_spans)))
+
+                elif op == CALL_TAIL:
+                    value_to_call = stack[-arg - 1]
+                    if value_to_call.__class__ is BytecodeFunction:
+                        call_args = stack[-arg:] if arg else []
+                        pos_start, pos_end = spans[ip - 1]
+                        return TailCall(value_to_call, call_args, context, pos_start, pos_end)
+
+                elif op == RETURN_VALUE:
+                    return pop()
+
+                elif op == RETURN_NONE:
+                    return None
+
+                elif op == LOAD_NULL:
+                    push(Null())
+
+                elif op == UNARY_NEGATIVE:
+                    value = pop()
+                    if value.__class__ in NUMBER_TYPES:
+                        push(number(value.value * -1))
+                        continue
+
+                    result, error = value.multiplied_by(Number(-1))
+                    if error:
+                        # The operand also stands in for the -1, as in eel.interpreter.unary_op_error
+                        operand_span = code.operand_spans[ip - 1][0]
+                        raise RTException(operation_error(error, context, operand_span, operand_span))
+                    push(result)
+
+                elif op == UNARY_NOT:
+                    value = pop()
+                    result, error = value.notted()
+                    if error:
+                        operand_span = code.operand_spans[ip - 1][0]
+                        raise RTException(operation_error(error, context, operand_span, operand_span))
+                    push(result)
+
+                elif op == UNARY_POSITIVE:
+                    # Leaves the value as it is
+                    pass
+
+                elif op == BUILD_LIST:
+                    if arg:
+                        elements = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        elements = []
+                    push(List(elements))
+
+                elif op == BUILD_DICT:
+                    items = {}
+                    if arg:
+                        pairs = stack[-2 * arg:]
+                        del stack[-2 * arg:]
+                        for idx in range(0, len(pairs), 2):
+                            items[pairs[idx]] = pairs[idx + 1]
+                    push(Dictionary(items))
+
+                elif op == FOR_PREP:
+                    step_value = pop()
+                    end_value = pop()
+                    start_value = pop()
+
+                    if step_value.value > 0:
+                        condition = operator.lt
+                    elif step_value.value < 0:
+                        condition = operator.gt
+                    else:
+                        condition = never
+
+                    push([] if arg else None)
+                    push([start_value.value, end_value.value, step_value.value, condition])
+
+                elif op == NEW_ELEMENTS:
+                    push([] if arg else None)
+
+                elif op == SETUP_LOOP:
+                    blocks.append((arg, len(stack), ip))
+
+                elif op == POP_BLOCK:
+                    blocks.pop()
+
+                elif op == END_LOOP:
+                    elements = pop()
+                    push(Null() if elements is None else List(elements))
+
+                elif op == BREAK:
+                    if not blocks:
+                        raise BreakSignal()
+                    ip, depth, _ = blocks[-1]
+                    del stack[depth:]
+
+                elif op == CONTINUE:
+                    if not blocks:
+                        raise ContinueSignal()
+                    _, depth, ip = blocks[-1]
+                    del stack[depth:]
+
+                elif op == MAKE_FUNCTION:
+                    function_code = consts[arg]
+                    push(BytecodeFunction(
+                        function_code.name, function_code.arg_names, function_code.should_auto_return, function_code
+                    ))
+
+                elif op == IMPORT:
+                    pos_start, pos_end = spans[ip - 1]
+                    push(unwrap(Interpreter().import_value(pop(), pos_start, pos_end, context, "bytecode")))
+
+                else:
+                    raise ValueError(f"Unknown opcode {op} at {ip - 1} in {code!r}")
+
+        except BreakSignal:
+            # From a function called in a loop of this code
+            if not blocks:
+                raise
+            ip, depth, _ = blocks[-1]
+            del stack[depth:]
+
+        except ContinueSignal:
+            if not blocks:
+                raise
+            _, depth, ip = blocks[-1]
+            del stack[depth:]
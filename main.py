@@ -8,6 +8,6 @@ if "-shell" in sys_arguments or "-s" in sys_arguments:
 
 else:
     FILENAME = "examples/example.eel"
-    _, error = eel.run(FILENAME, open(FILENAME).read())
+    _, error = eel.run_file(FILENAME)
     if error:
         print(error.as_string())
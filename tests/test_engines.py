@@ -0,0 +1,800 @@
+"""
+Runs the examples and a set of edge cases on every engine in eel.main.ENGINES. Each engine must print, return
+and fail exactly as the tree engine does on the examples, and as recorded in PROGRAMS on the edge cases.
+
+    python -m unittest discover tests
+"""
+import contextlib
+import io
+import os
+import re
+import unittest
+
+from eel import cache, main
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+# Opens a window and waits for it to be closed
+SKIPPED_EXAMPLES = {"graphics_test.eel"}
+# Addresses in the reprs of Python objects, e.g. a database connection, which differ between runs
+ADDRESS = re.compile(r" at 0x[0-9a-f]+")
+
+# Each program with what it prints, its value and its error, as the baseline tree interpreter gave them, but for
+# the programs marked where it failed or has deliberately changed since
+PROGRAMS = [
+    # Errors of operations, placed at their operands
+    (
+        'VAR a = "x"\nVAR b = 2\na - b',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            'Runtime Error: Illegal Operation\n'
+            '\n'
+            '\n'
+            'a - b\n'
+            '^^^^^'
+        )),
+    ),
+    (
+        'VAR a = 0\n10 / a',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            'Runtime Error: Division by zero\n'
+            '\n'
+            '\n'
+            '10 / a\n'
+            '     ^'
+        )),
+    ),
+    (
+        'VAR z = 0\nFN f(x) -> x / z\nf(3)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            '  File <test>, line 2, in f\n'
+            'Runtime Error: Division by zero\n'
+            '\n'
+            '\n'
+            'FN f(x) -> x / z\n'
+            '               ^'
+        )),
+    ),
+    (
+        'VAR a = "s"\n-a',
+        ('', '[s, ]', None),
+    ),
+    (
+        'VAR a = "s"\nNOT a',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            'Runtime Error: Illegal Operation\n'
+            '\n'
+            '\n'
+            'NOT a\n'
+            '    ^'
+        )),
+    ),
+    (
+        'VAR l = [1,2]\nl ^ 5',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            'Runtime Error: Index Out of Bounds\n'
+            '\n'
+            '\n'
+            'l ^ 5\n'
+            '    ^'
+        )),
+    ),
+    (
+        'FN g() -> 0\n4 % g()',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            'Runtime Error: Division by zero\n'
+            '\n'
+            '\n'
+            '4 % g()\n'
+            '    ^'
+        )),
+    ),
+    (
+        'FN g() -> "q"\ng() * g()',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            'Runtime Error: Illegal Operation\n'
+            '\n'
+            '\n'
+            'g() * g()\n'
+            '^^^^^^^'
+        )),
+    ),
+    (
+        'VAR d = {"a": 1}\nd + 1',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            'Runtime Error: Illegal Operation\n'
+            '\n'
+            '\n'
+            'd + 1\n'
+            '^^^^^'
+        )),
+    ),
+    # Made with a tail call, which takes the place of its caller in tracebacks
+    (
+        'FN f(a) -> a / 0\nFN g(b) -> f(b)\ng(1)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            '  File <test>, line 1, in f\n'
+            'Runtime Error: Division by zero\n'
+            '\n'
+            'FN f(a) -> a / 0\n'
+            '               ^'
+        )),
+    ),
+    # Failed with a Python exception under the baseline
+    (
+        '-{1: 2}',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            'Runtime Error: Illegal Operation\n'
+            '\n'
+            '-{1: 2}\n'
+            ' ^^^^^^^'
+        )),
+    ),
+    (
+        '"a" / 0',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            'Runtime Error: Illegal Operation\n'
+            '\n'
+            '"a" / 0\n'
+            '^^^^^^^'
+        )),
+    ),
+    (
+        'FN f(x) -> -x\nf([1])',
+        ('', "[<function 'f'>, 1]", None),
+    ),
+    # Failed with a Python exception under the baseline
+    (
+        'VAR a = 5\na(1)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            'Runtime Error: Illegal Operation\n'
+            '\n'
+            '\n'
+            'a(1)\n'
+            '^^^'
+        )),
+    ),
+    (
+        'undefined_thing',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            "Runtime Error: 'undefined_thing' is not defined\n"
+            '\n'
+            'undefined_thing\n'
+            '^^^^^^^^^^^^^^^'
+        )),
+    ),
+
+    # Values are shared, not copied
+    (
+        'VAR a = [1]\nVAR b = a\nLS_APPEND(b, 2)\na',
+        ('', '[1, 2, 1, 2, null, 1, 2]', None),
+    ),
+    (
+        'VAR a = 5\nVAR b = a\nVAR b = b + 1\n[a, b]',
+        ('', '[5, 5, 6, 5, 6]', None),
+    ),
+    (
+        'VAR s = "ab"\nVAR k = s * 2\n[s, k]',
+        ('', '[ab, abab, ab, abab]', None),
+    ),
+    (
+        'FN a() -> [1]\nFN f() -> a()\nVAR q = f()\nLS_APPEND(q, 2)\n[q, f()]',
+        ('', "[<function 'a'>, <function 'f'>, 1, 2, null, 1, 2, 1]", None),
+    ),
+
+    # Calls, arity and dynamic scoping
+    (
+        'FN f(n) -> n\nVAR h = f\nh(1, 2)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            "Runtime Error: Too many args (1) passed into 'f'\n"
+            '\n'
+            '\n'
+            'h(1, 2)\n'
+            '^^^^^^'
+        )),
+    ),
+    (
+        'FN h(a) -> a\nh()',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            "Runtime Error: Too few args (1) passed into 'h'\n"
+            '\n'
+            '\n'
+            'h()\n'
+            '^'
+        )),
+    ),
+    (
+        'VAR f = FN (a) -> a + 1\nf(2)',
+        ('', "[<function '<anonymous>'>, 3]", None),
+    ),
+    (
+        'FN k()\nRETURN\nEND\nk()',
+        ('', "[<function 'k'>, null]", None),
+    ),
+    (
+        'VAR x = 1\nFN f() -> x\nf()',
+        ('', "[1, <function 'f'>, 1]", None),
+    ),
+    (
+        'FN g() -> x\nFN h()\nVAR x = 5\nRETURN g()\nEND\nh()',
+        ('', "[<function 'g'>, <function 'h'>, 5]", None),
+    ),
+    (
+        'VAR x = 1\nFN g() -> x\nFN h()\nVAR x = 5\nRETURN g()\nEND\n[h(), g()]',
+        ('', "[1, <function 'g'>, <function 'h'>, 5, 1]", None),
+    ),
+    (
+        'FN inner() -> x\nFN outer(x) -> inner()\nouter(5)',
+        ('', "[<function 'inner'>, <function 'outer'>, 5]", None),
+    ),
+    (
+        'FN inner(a) -> a + y\nFN outer(y)\nRETURN inner(1)\nEND\nouter(2)',
+        ('', "[<function 'inner'>, <function 'outer'>, 3]", None),
+    ),
+    (
+        'FN a()\nVAR z = 3\nFN b() -> z\nRETURN b()\nEND\na()',
+        ('', "[<function 'a'>, 3]", None),
+    ),
+    (
+        'FN c() -> q\nFN d(q) -> c()\nd(9)',
+        ('', "[<function 'c'>, <function 'd'>, 9]", None),
+    ),
+    # Made with a tail call, which takes the place of its caller in tracebacks
+    (
+        'FN p(f) -> f()\nFN w()\nVAR v = 11\nFN r() -> v\nRETURN p(r)\nEND\nw()',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 7, in <program>\n'
+            '  File <test>, line 4, in r\n'
+            "Runtime Error: 'v' is not defined\n"
+            '\n'
+            '\n'
+            'FN r() -> v\n'
+            '          ^'
+        )),
+    ),
+    (
+        'PRINT("start")\nIF 0 THEN PRINT(nope)',
+        ('start\n', '[null, null]', None),
+    ),
+    (
+        'PRINT("start")\nPRINT(nope)',
+        ('start\n', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            "Runtime Error: 'nope' is not defined\n"
+            '\n'
+            '\n'
+            'PRINT(nope)\n'
+            '      ^^^^'
+        )),
+    ),
+
+    # Tail calls
+    # Failed with a Python exception under the baseline
+    (
+        'FN cnt(n, f) -> IF n == 0 THEN "done" ELSE f(n - 1, f)\ncnt(20000, cnt)',
+        ('', "[<function 'cnt'>, done]", None),
+    ),
+    # Made with a tail call, which takes the place of its caller in tracebacks
+    (
+        'FN f(n, y) -> IF n == 0 THEN y ELSE f(n - 1, y + 1)\nf(5, 0)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            '  File <test>, line 1, in f\n'
+            "Runtime Error: 'f' is not defined\n"
+            '\n'
+            'FN f(n, y) -> IF n == 0 THEN y ELSE f(n - 1, y + 1)\n'
+            '                                    ^'
+        )),
+    ),
+    (
+        'FN g(a) -> a * 2\nFN f(a) -> IF a > 1 THEN g(a) ELSE g(a, a)\nf(0)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            '  File <test>, line 2, in f\n'
+            "Runtime Error: Too many args (1) passed into 'g'\n"
+            '\n'
+            '\n'
+            'FN f(a) -> IF a > 1 THEN g(a) ELSE g(a, a)\n'
+            '                                   ^^^^^^'
+        )),
+    ),
+    # Made with a tail call, which takes the place of its caller in tracebacks
+    (
+        'FN g() -> 1 / 0\nFN f() -> g()\nf()',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            '  File <test>, line 1, in g\n'
+            'Runtime Error: Division by zero\n'
+            '\n'
+            'FN g() -> 1 / 0\n'
+            '              ^'
+        )),
+    ),
+    (
+        'FN g(h) -> h()\nFN k() -> 7\nFN f() -> g(k)\nf()',
+        ('', "[<function 'g'>, <function 'k'>, <function 'f'>, 7]", None),
+    ),
+    # Made with a tail call, which takes the place of its caller in tracebacks
+    (
+        'FN e(n, o) -> IF n == 0 THEN true ELSE o(n - 1, e)\n'
+        'FN o(n, e) -> IF n == 0 THEN false ELSE e(n - 1, o)\ne(1, o)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            '  File <test>, line 2, in o\n'
+            "Runtime Error: 'false' is not defined\n"
+            '\n'
+            '\n'
+            'FN o(n, e) -> IF n == 0 THEN false ELSE e(n - 1, o)\n'
+            '                             ^^^^^'
+        )),
+    ),
+    # Failed with a Python exception under the baseline
+    (
+        'FN g() -> (FN () -> 3)\nFN f() -> (g())()\nf()',
+        ('', "[<function 'g'>, <function 'f'>, 3]", None),
+    ),
+
+    # RETURN, BREAK and CONTINUE, also made from inside a called function
+    (
+        'FN stop()\nBREAK\nEND\nVAR r = FOR i = 0 TO 5 THEN\nIF i == 2 THEN stop()\ni\nEND\nr',
+        ('', "[<function 'stop'>, null, null]", None),
+    ),
+    (
+        'FN skip() -> CONTINUE\nFOR i = 0 TO 5 THEN\nIF i % 2 == 0 THEN skip()\nPRINT(i)\nEND',
+        ('', 'None', (
+            "ERROR: Invalid Syntax: Expected 'VAR', 'IF', 'FOR', 'WHILE', 'FN', int, float, identifier, '+', '-', '(', '[' or 'NOT'\n"
+            'File: <test>, line: 1\n'
+            '\n'
+            'FN skip() -> CONTINUE\n'
+            '             ^^^^^^^^'
+        )),
+    ),
+    (
+        'FN f(n)\nFOR i = 0 TO 10 THEN\nWHILE true THEN\nIF i == n THEN RETURN i * 10\nBREAK\nEND\nEND\nRETURN -1\nEND\n'
+        '[f(3), f(20)]',
+        ('', "[<function 'f'>, 30, -1]", None),
+    ),
+    (
+        'VAR x = 1\nRETURN 5\nVAR x = 2',
+        ('', 'None', None),
+    ),
+    (
+        'VAR l = FOR i = 0 TO 4 THEN IF i == 2 THEN CONTINUE ELSE i\nl',
+        ('', '[0, 1, 3, 0, 1, 3]', None),
+    ),
+    (
+        'FOR i = 0 TO 3 THEN\nFOR j = 0 TO 3 THEN\nIF j == 1 THEN BREAK\nPRINT(i * 10 + j)\nEND\nEND',
+        ((
+            '0\n'
+            '10\n'
+            '20\n'
+        ), '[null]', None),
+    ),
+
+    # FOR loops, including a zero STEP, which runs the body no times
+    (
+        'FOR i = 0 TO 5 THEN 1\ni',
+        ('', '[1, 1, 1, 1, 1, 4]', None),
+    ),
+    (
+        'VAR i = 9\nFOR i = 0 TO 0 THEN 1\ni',
+        ('', '[9, , 9]', None),
+    ),
+    (
+        'FOR i = 10 TO 0 STEP -3 THEN 2\ni',
+        ('', '[2, 2, 2, 2, 1]', None),
+    ),
+    (
+        'FOR i = 0 TO 1 STEP 0.25 THEN i',
+        ('', '[0, 0.25, 0.5, 0.75]', None),
+    ),
+    (
+        'FOR i = 0 TO 5 STEP 0 THEN 1',
+        ('', '[]', None),
+    ),
+    (
+        'VAR n = 0\nFOR i = 0 TO 5 STEP 0 THEN\nVAR n = n + 1\nEND\nn',
+        ('', '[0, null, 0]', None),
+    ),
+    (
+        'FOR i = 0.5 TO 5 STEP 0.0 THEN PRINT(i)',
+        ('', '[]', None),
+    ),
+    (
+        'FOR i = 0 TO 5 THEN VAR i = 99\ni',
+        ('', '[99, 99, 99, 99, 99, 99]', None),
+    ),
+    (
+        'FN f() -> i\nFOR i = 0 TO 3 THEN f()',
+        ('', "[<function 'f'>, 0, 1, 2]", None),
+    ),
+    (
+        'FOR i = 0 TO 5 THEN 1 / (i - 3)\ni',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            'Runtime Error: Division by zero\n'
+            '\n'
+            'FOR i = 0 TO 5 THEN 1 / (i - 3)\n'
+            '                         ^^^^^'
+        )),
+    ),
+    (
+        'FOR i = true TO 3 THEN 1\ni',
+        ('', '[1, 1, 2]', None),
+    ),
+    (
+        'FN g(n)\n FOR i = 0 TO n THEN\n  IF i == 2 THEN RETURN i\n END\nEND\ng(5)',
+        ('', "[<function 'g'>, 2]", None),
+    ),
+
+    # Loops and blocks whose value is dropped
+    (
+        'VAR x = 0\nWHILE x < 5 THEN\nVAR x = x + 1\n[PRINT(x), PRINT(x * 2)]\nEND',
+        ((
+            '1\n'
+            '2\n'
+            '2\n'
+            '4\n'
+            '3\n'
+            '6\n'
+            '4\n'
+            '8\n'
+            '5\n'
+            '10\n'
+        ), '[0, null]', None),
+    ),
+    (
+        'VAR x = 0\nVAR l = FOR i = 0 TO 3 THEN FOR j = 0 TO 2 THEN i * j\nl',
+        ('', '[0, 0, 0, 0, 1, 0, 2, 0, 0, 0, 1, 0, 2]', None),
+    ),
+    (
+        'FN f()\nFOR i = 0 TO 3 THEN PRINT(i)\nWHILE false THEN 1\n[1, [PRINT("a")]]\nEND\nf()',
+        ((
+            '0\n'
+            '1\n'
+            '2\n'
+            'a\n'
+        ), "[<function 'f'>, null]", None),
+    ),
+    (
+        'FN h(n) -> IF n THEN FOR i = 0 TO n THEN i ELSE [n, n]\n[h(2), h(0)]',
+        ('', "[<function 'h'>, 0, 1, 0, 0]", None),
+    ),
+    (
+        '[FOR i = 0 TO 2 THEN i, WHILE false THEN 0]',
+        ('', '[0, 1, ]', None),
+    ),
+    (
+        'VAR y = 0\nWHILE y < 3 THEN\nVAR y = y + 1\n[1 / (2 - y)]\nEND',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 4, in <program>\n'
+            'Runtime Error: Division by zero\n'
+            '\n'
+            '\n'
+            '[1 / (2 - y)]\n'
+            '      ^^^^^'
+        )),
+    ),
+    (
+        'FN m(l)\n[PRINT(l)]\nEND\nm(FOR i = 0 TO 3 THEN i)',
+        ('0, 1, 2\n', "[<function 'm'>, null]", None),
+    ),
+
+    # Constants, which the bytecode keeps in a pool
+    (
+        'PRINT(0.0)\nPRINT(-0.0)\nPRINT(1)\nPRINT(1.0)\nPRINT(true)\nPRINT(0 * -1.0)\nPRINT([0.0, -0.0, 1, 1.0, "1"])',
+        ((
+            '0.0\n'
+            '-0.0\n'
+            '1\n'
+            '1.0\n'
+            '1\n'
+            '-0.0\n'
+            '0.0, -0.0, 1, 1.0, 1\n'
+        ), '[null, null, null, null, null, null, null]', None),
+    ),
+
+    # Builtins and library functions, and the errors of the operations they make on their args
+    (
+        'LEN(5)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            '  File <test>, line 1, in len\n'
+            'Runtime Error: Argument must be list or dictionary\n'
+            '\n'
+            'LEN(5)\n'
+            '^^^^^'
+        )),
+    ),
+    (
+        'LEN([1, 2, 3]) + LEN({1: 2})',
+        ('', '[4]', None),
+    ),
+    # Failed with a Python exception under the baseline
+    (
+        'LS_POP([1, 2], 1)',
+        ('', '[2]', None),
+    ),
+    # Failed with a Python exception under the baseline
+    (
+        'LS_POP([1, 2], 5)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            '  File <test>, line 1, in ls_pop\n'
+            'Runtime Error: Index out of bounds\n'
+            '\n'
+            'LS_POP([1, 2], 5)\n'
+            '^^^^^^^^^^^^^^^^'
+        )),
+    ),
+    (
+        'LS_POP([1], "a")',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            '  File <test>, line 1, in ls_pop\n'
+            "Runtime Error: Second argument of 'pop' must be a number\n"
+            '\n'
+            'LS_POP([1], "a")\n'
+            '^^^^^^^^^^^^^^^'
+        )),
+    ),
+    (
+        'DICT_GET({1: 2}, 3)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            '  File <test>, line 1, in dict_get\n'
+            "Runtime Error: Key '3' is not in dictionary\n"
+            '\n'
+            'DICT_GET({1: 2}, 3)\n'
+            '^^^^^^^^^^^^^^^^^^'
+        )),
+    ),
+    (
+        'PRINT()',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            "Runtime Error: Too few args (1) passed into 'print'\n"
+            '\n'
+            'PRINT()\n'
+            '^^^^^'
+        )),
+    ),
+    (
+        'RUN(1)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 1, in <program>\n'
+            '  File <test>, line 1, in run\n'
+            'Runtime Error: Argument must be string\n'
+            '\n'
+            'RUN(1)\n'
+            '^^^^^'
+        )),
+    ),
+    (
+        'FN f(x) -> LEN(x)\nf(3)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            '  File <test>, line 1, in f\n'
+            '  File <test>, line 1, in len\n'
+            'Runtime Error: Argument must be list or dictionary\n'
+            '\n'
+            'FN f(x) -> LEN(x)\n'
+            '           ^^^^^'
+        )),
+    ),
+    (
+        'IMPORT "math"\nmath::sqrt(16)',
+        ('', '[math, 4.0]', None),
+    ),
+    # Failed with a Python exception under the baseline
+    (
+        'IMPORT "math"\nmath::sqrt("x")',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            '  File <test>, line 2, in sqrt\n'
+            'Runtime Error: Argument must be number\n'
+            '\n'
+            '\n'
+            'math::sqrt("x")\n'
+            '^^^^^^^^^^^^^^'
+        )),
+    ),
+    # Failed with a Python exception under the baseline
+    (
+        'IMPORT "math"\nmath::atan2(1)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            "Runtime Error: Too few args (1) passed into 'atan2'\n"
+            '\n'
+            '\n'
+            'math::atan2(1)\n'
+            '^^^^^^^^^^^^^'
+        )),
+    ),
+    # Failed with a Python exception under the baseline
+    (
+        'IMPORT "math"\nmath::hypot(3, 4)',
+        ('', '[math, 5.0]', None),
+    ),
+    (
+        'IMPORT "operator"\noperator::lt([1], 2)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            'Runtime Error: Illegal Operation\n'
+            '\n'
+            '\n'
+            'operator::lt([1], 2)\n'
+            '             ^^^^^^'
+        )),
+    ),
+    (
+        'IMPORT "operator"\nVAR a = [1]\nVAR r = operator::add(a,   "x")',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            "Runtime Error: 'operator::add' is not defined\n"
+            '\n'
+            '\n'
+            'VAR r = operator::add(a,   "x")\n'
+            '        ^^^^^^^^'
+        )),
+    ),
+    (
+        'IMPORT "operator"\nVAR d = {1: 2}\noperator::mul(d, 2)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            "Runtime Error: 'operator::mul' is not defined\n"
+            '\n'
+            '\n'
+            'operator::mul(d, 2)\n'
+            '^^^^^^^^'
+        )),
+    ),
+    (
+        'IMPORT "operator"\nVAR f = operator::lt\nf([1], 2)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 3, in <program>\n'
+            'Runtime Error: Illegal Operation\n'
+            '\n'
+            '\n'
+            'f([1], 2)\n'
+            '  ^^^^^^'
+        )),
+    ),
+    (
+        'IMPORT "operator"\noperator::div(1, 0)',
+        ('', 'None', (
+            'Traceback (most recent call last):\n'
+            '  File <test>, line 2, in <program>\n'
+            "Runtime Error: 'operator::div' is not defined\n"
+            '\n'
+            '\n'
+            'operator::div(1, 0)\n'
+            '^^^^^^^^'
+        )),
+    ),
+    (
+        'VAR d = {"a": 1, "b": [1, 2]}\nPRINT(d)\nIMPORT "csv"\ncsv::write([[1, 2]])',
+        ('', 'None', (
+            "ERROR: Invalid Syntax: Expected ':'\n"
+            'File: <test>, line: 1\n'
+            '\n'
+            'VAR d = {"a": 1, "b": [1, 2]}\n'
+            '        ^^^^^^^^^^^^^^^'
+        )),
+    ),
+]
+
+
+def run(engine, fn, text):
+    """
+    :return: What the program printed, its value and its error, run from a copy of the global symbol table
+    """
+    symbols = dict(main.global_symbol_table.symbols)
+    out = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(out):
+            value, error = main.run(fn, text, engine=engine)
+    finally:
+        main.global_symbol_table.symbols = symbols
+    return ADDRESS.sub("", out.getvalue()), ADDRESS.sub("", repr(value)), error.as_string() if error else None
+
+
+class EngineTests(unittest.TestCase):
+    def setUp(self):
+        self.cache_enabled = cache.enabled
+        cache.enabled = False
+
+    def tearDown(self):
+        cache.enabled = self.cache_enabled
+
+    def assertSameAsTree(self, fn, text):
+        expected = run("tree", fn, text)
+        for engine in main.ENGINES:
+            with self.subTest(engine=engine, program=text):
+                self.assertEqual(run(engine, fn, text), expected)
+
+    def test_examples(self):
+        cwd = os.getcwd()
+        os.chdir(EXAMPLES)
+        try:
+            for name in sorted(os.listdir(EXAMPLES)):
+                if not name.endswith(".eel") or name in SKIPPED_EXAMPLES:
+                    continue
+                with open(name) as f:
+                    text = f.read()
+                # example.eel prints the time and sleeps; neither can be compared between runs
+                text = text.replace("PRINT(time::curr_time)", "PRINT(time::curr_time > 0)")
+                text = text.replace("time::pause(2)", "time::pause(0)")
+                self.assertSameAsTree(os.path.join(EXAMPLES, name), text)
+        finally:
+            os.chdir(cwd)
+
+    def test_programs(self):
+        for text, expected in PROGRAMS:
+            for engine in main.ENGINES:
+                with self.subTest(engine=engine, program=text):
+                    self.assertEqual(run(engine, "<test>", text), expected)
+
+    def test_deep_expression(self):
+        # Far deeper than Python's recursion limit, which only the stack engine is not bound by
+        depth = 60000
+        value, error = main.run("<test>", "VAR x = 1\n" + "x + (" * depth + "x" + ")" * depth, engine="stack")
+        self.assertIsNone(error)
+        self.assertEqual(value.elements[-1].value, depth + 1)
+
+        _, error = main.run("<test>", 'VAR y = "a" - (' + "1 + (" * depth + "1" + ")" * depth + ")", engine="stack")
+        self.assertEqual(error.details, "Illegal Operation")
+        self.assertEqual(error.pos_start.ln, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Checks that a Document gives the same AST positions and errors as a full parse of its text (see eel.main.parse).
+
+    python -m unittest discover tests
+"""
+import io
+import unittest
+
+from eel import main
+from eel.incremental import Document
+
+
+def full_parse(text):
+    return main.parse("<d>", io.BytesIO(text.encode()))
+
+
+def span(node):
+    return node.pos_start.ln, node.pos_start.col, node.pos_end.ln, node.pos_end.col
+
+
+class DocumentTests(unittest.TestCase):
+    def assertSameError(self, error, text):
+        _, expected = full_parse(text)
+        self.assertEqual(error.as_string(), expected.as_string())
+
+    def test_lexing_error_after_parse_error(self):
+        text = "VAR a = 1\nPRINT(a b)\nVAR c = $\n"
+        self.assertSameError(Document("<d>", text).error, text)
+
+        doc = Document("<d>", "VAR a = 1\n")
+        _, error = doc.edit(10, 0, "PRINT(a b)\nVAR c = $\n")
+        self.assertSameError(error, text)
+
+    def test_root_spans_whole_text(self):
+        text = "\nVAR a = 1\nPRINT(a)\n# done\n"
+        doc = Document("<d>", text)
+        node, _ = full_parse(text)
+        self.assertEqual(span(doc.ast), span(node))
+
+        ast, _ = doc.edit(len(text), 0, "VAR b = 2")
+        node, _ = full_parse(text + "VAR b = 2")
+        self.assertEqual(span(ast), span(node))
+
+    def test_ast_outlives_edit(self):
+        doc = Document("<d>", "VAR a = 1\nVAR b = 2\n")
+        ast = doc.ast
+        doc.edit(0, 9, "PRINT(3)")
+        self.assertEqual([node.var_name_tok.value for node in ast.element_nodes], ["a", "b"])
+        self.assertEqual(len(doc.ast.element_nodes), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()